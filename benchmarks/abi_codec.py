@@ -0,0 +1,73 @@
+"""
+Benchmark encoding a call and decoding its result, per request.
+
+Compares the web3 Contract path the generated methods used to take (resolve
+the function by name, encode through the ABI, decode and normalize the
+result) with the precompiled MethodCodec path, with no node round trip.
+
+    PYTHONPATH=. python benchmarks/abi_codec.py --number 2000
+"""
+import argparse
+import timeit
+from eth_abi import decode, encode
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.runtime.codec import MethodCodec
+
+OWNER = Web3.to_checksum_address("0x" + "ab" * 20)
+
+BALANCE_OF = {
+    "type": "function", "name": "balanceOf", "stateMutability": "view",
+    "inputs": [{"name": "account", "type": "address"}],
+    "outputs": [{"name": "", "type": "uint256"}],
+}
+# A struct and an array in, an array of structs out
+QUOTE = {
+    "type": "function", "name": "quote", "stateMutability": "view",
+    "inputs": [{"name": "order", "type": "tuple", "components": [
+        {"name": "maker", "type": "address"}, {"name": "salt", "type": "bytes32"},
+        {"name": "amounts", "type": "uint256[]"},
+    ]}, {"name": "ids", "type": "uint256[]"}],
+    "outputs": [{"name": "", "type": "tuple[]", "components": [
+        {"name": "owner", "type": "address"}, {"name": "amount", "type": "uint256"},
+    ]}],
+}
+
+CASES = {
+    "balanceOf": (BALANCE_OF, [OWNER], encode(["uint256"], [10**18])),
+    "quote": (QUOTE, [(OWNER, b"\x01" * 32, list(range(8))), list(range(8))],
+              encode(["(address,uint256)[]"], [[(OWNER, i) for i in range(16)]])),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    contract = Web3().eth.contract(abi=[BALANCE_OF, QUOTE])
+    print(f"{'Function':<12} {'web3 (us)':>10} {'codec (us)':>11} {'Speedup':>8}")
+    for name, (abi, call_args, return_data) in CASES.items():
+        function = ABIAnalyzer([abi]).analyze()["functions"][0]
+        codec = MethodCodec(function.signature, function.selector, abi["inputs"], abi["outputs"])
+
+        def web3_path():
+            contract_function = getattr(contract.functions, name)(*call_args)
+            contract_function._encode_transaction_data()
+            output_types = get_abi_output_types(contract_function.abi)
+            return map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decode(output_types, return_data))
+
+        def codec_path():
+            codec.encode(call_args)
+            return codec.decode(return_data)
+
+        timings = []
+        for run in (web3_path, codec_path):
+            seconds = min(timeit.repeat(run, number=args.number, repeat=args.repeat))
+            timings.append(seconds / args.number * 1e6)
+        print(f"{name:<12} {timings[0]:>10.1f} {timings[1]:>11.1f} {timings[0] / timings[1]:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark loading ABIs out of a large multi-contract build-info file.
+
+Compares json.load of the whole file with the streaming loader, reporting
+wall time (untraced) and peak traced memory.
+
+    PYTHONPATH=. python benchmarks/artifact_loading.py --contracts 50 --bytecode-kb 200
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from mcp_server.artifact_loader import read_contracts
+from generation import synthetic_abi
+
+def build_info(contracts: int, bytecode_kb: int) -> dict:
+    output = {}
+    for i in range(contracts):
+        output[f"src/C{i}.sol"] = {f"C{i}": {
+            "abi": synthetic_abi(20),
+            "evm": {"bytecode": {"object": "60" * (bytecode_kb * 512), "sourceMap": "1:2:3;" * 2000}},
+        }}
+    return {
+        "id": "benchmark",
+        "input": {"sources": {f"src/C{i}.sol": {"content": "contract C {}\n" * 2000} for i in range(contracts)}},
+        "output": {"contracts": output,
+                   "sources": {f"src/C{i}.sol": {"ast": {"nodes": [{"id": n} for n in range(500)]}}
+                               for i in range(contracts)}},
+    }
+
+def measure(load):
+    """Time an untraced run, then measure peak memory in a traced one."""
+    start = time.perf_counter()
+    count = load()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        load()
+        return seconds, tracemalloc.get_traced_memory()[1], count
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contracts", type=int, default=50)
+    parser.add_argument("--bytecode-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "build-info.json"
+        path.write_text(json.dumps(build_info(args.contracts, args.bytecode_kb)))
+        print(f"Artifact size: {path.stat().st_size / 2**20:.1f} MiB")
+
+        def json_load():
+            with open(path) as f:
+                data = json.load(f)
+            return sum(len(c) for c in data["output"]["contracts"].values())
+
+        print(f"{'Loader':<12} {'Seconds':>9} {'Peak MiB':>9} {'Contracts':>10}")
+        for name, load in (("json.load", json_load), ("streaming", lambda: len(read_contracts(path)))):
+            seconds, peak, count = measure(load)
+            print(f"{name:<12} {seconds:>9.3f} {peak / 2**20:>9.1f} {count:>10}")
+
+if __name__ == "__main__":
+    main()
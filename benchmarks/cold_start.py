@@ -0,0 +1,72 @@
+"""
+Benchmark the cold start of a generated server: import plus first request.
+
+A server for a synthetic contract is generated offline (stub LLM backend) in
+bundle mode, then each run starts a fresh interpreter that imports either
+server.py (one module per method) or bundle.py (one precompiled module) and
+serves its first request. The node is never contacted.
+
+    PYTHONPATH=. python benchmarks/cold_start.py --functions 200 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.llm_backends import StubBackend
+from mcp_server.mcp_generator import MCPGenerator
+from generation import synthetic_abi
+
+# Run in a fresh interpreter; prints seconds to import and to answer the first request
+PROBE = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+server = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+response = TestClient(server.app).get("/cache/stats")
+assert response.status_code == 200
+print(json.dumps({"import": imported - start, "first_request": time.perf_counter() - start}))
+'''
+
+def generate(output_dir: Path, functions: int):
+    generator = MCPGenerator(
+        analysis=ABIAnalyzer({"abi": synthetic_abi(functions)}).analyze(),
+        output_dir=output_dir,
+        contract_name="Benchmark",
+        openai_api_key=None,
+        llm_backend=StubBackend(),
+        bundle=True
+    )
+    asyncio.run(generator.generate())
+    # Bytecode for the per-method layout, as a deployment would ship it
+    subprocess.run([sys.executable, "-m", "compileall", "-q", str(output_dir)], check=True)
+
+def probe(output_dir: Path, module: str) -> dict:
+    env = {**os.environ, "CONTRACT_ADDRESS": "0x" + "11" * 20, "PYTHONPATH": str(output_dir)}
+    output = subprocess.run([sys.executable, "-c", PROBE, module], cwd=output_dir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_dir = Path(directory)
+        generate(output_dir, args.functions)
+        print(f"{'Layout':<8} {'Import (s)':>11} {'First request (s)':>18}")
+        for module in ("server", "bundle"):
+            runs = [probe(output_dir, module) for _ in range(args.runs)]
+            print(f"{module:<8} {statistics.median(r['import'] for r in runs):>11.3f} "
+                  f"{statistics.median(r['first_request'] for r in runs):>18.3f}")
+
+if __name__ == "__main__":
+    main()
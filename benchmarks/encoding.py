@@ -0,0 +1,51 @@
+"""
+Benchmark encoding a large array result the way generated servers respond.
+
+Compares FastAPI's response_model path (pydantic validation, jsonable_encoder
+and the stdlib encoder) with the pre-encoded ResultEncoder path. The
+balances are uint256 values beyond orjson's native 64-bit range, which the
+"number" encoding writes through orjson.Fragment (orjson 3.9+).
+
+    PYTHONPATH=. python benchmarks/encoding.py --items 10000
+"""
+import argparse
+import json
+import timeit
+from typing import Any, Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from mcp_server.runtime.encoding import ResultEncoder
+
+class MCPResponse(BaseModel):
+    result: Any
+    context: Optional[Dict[str, Any]] = None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # e.g. a getter returning (owner, balance, data) structs
+    result = {"result": [("0x" + "ab" * 20, 2**255 + i, b"\x00" * 32) for i in range(args.items)]}
+    context = {"agent_id": "agent-1"}
+
+    def response_model():
+        model = MCPResponse(result={**result, "result": [(o, b, "0x" + d.hex()) for o, b, d in result["result"]]},
+                            context=context)
+        return json.dumps(jsonable_encoder(model)).encode()
+
+    encoders = {"number": ResultEncoder(), "string": ResultEncoder(integers="string")}
+    runs = {"response_model": response_model}
+    for name, encoder in encoders.items():
+        runs[f"encoder ({name})"] = (
+            lambda encoder=encoder: encoder.encode({"result": encoder.convert(result), "context": context})
+        )
+
+    print(f"{'Path':<20} {'ms/response':>12}")
+    for name, run in runs.items():
+        seconds = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"{name:<20} {seconds * 1000:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark the event log store: ingesting decoded logs and serving filtered history.
+
+Fills a LogStore with synthetic Transfer logs between a pool of accounts,
+then times the queries the /events endpoint runs: the latest page of an
+event, and a page filtered on an indexed argument.
+
+    PYTHONPATH=. python benchmarks/event_queries.py --logs 200000
+"""
+import time
+import random
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+from eth_abi import encode
+from eth_hash.auto import keccak
+from mcp_server.runtime.events import EventDecoder
+from mcp_server.runtime.indexer import LogIndexer, LogStore
+
+SIGNATURE = "Transfer(address,address,uint256)"
+TOPIC = "0x" + keccak(SIGNATURE.encode()).hex()
+TRANSFER = EventDecoder(SIGNATURE, TOPIC, [
+    {"name": "from", "type": "address", "indexed": True},
+    {"name": "to", "type": "address", "indexed": True},
+    {"name": "value", "type": "uint256", "indexed": False},
+])
+
+def synthetic_logs(count: int, accounts: int, logs_per_block: int = 20):
+    rng = random.Random(0)
+    topics = ["0x" + encode(["address"], [f"0x{i + 1:040x}"]).hex() for i in range(accounts)]
+    return [
+        {
+            "blockNumber": hex(i // logs_per_block), "logIndex": hex(i % logs_per_block),
+            "transactionHash": "0x" + keccak(i.to_bytes(8, "big")).hex(),
+            "topics": [TOPIC, rng.choice(topics), rng.choice(topics)],
+            "data": "0x" + encode(["uint256"], [rng.randrange(10**24)]).hex(),
+        }
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logs", type=int, default=200000)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    logs = synthetic_logs(args.logs, args.accounts)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LogStore(Path(directory) / "events.sqlite3", "0x" + "00" * 20, [TOPIC])
+        indexer = LogIndexer(store, {TOPIC: TRANSFER}, None, None)
+        started = time.perf_counter()
+        for start in range(0, len(logs), 10000):
+            chunk = logs[start:start + 10000]
+            store.add(indexer._rows(chunk), int(chunk[-1]["blockNumber"], 16))
+        elapsed = time.perf_counter() - started
+        print(f"Ingested {len(logs)} logs in {elapsed:.2f}s ({len(logs) / elapsed:,.0f} logs/s, decoding included)")
+
+        topic = bytes.fromhex(TOPIC[2:])
+        account = bytes.fromhex(logs[0]["topics"][2][2:])
+        queries = {
+            "latest 100": lambda: store.query(topic, limit=100, descending=True),
+            "to=<account>, 100": lambda: store.query(topic, {2: [account]}, limit=100),
+            "to=<account>, range": lambda: store.query(topic, {2: [account]}, from_block=2000, to_block=6000),
+        }
+        print(f"{'Query':<22} {'ms':>8} {'rows':>6}")
+        for name, query in queries.items():
+            seconds = min(timeit.repeat(query, number=args.number, repeat=3)) / args.number
+            print(f"{name:<22} {seconds * 1e3:>8.3f} {len(query()):>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark the MCPGenerator.generate pipeline offline.
+
+Generation runs against the stub LLM backend with a simulated per-request
+latency, so the numbers are reproducible on an air-gapped machine. The
+overhead column is the wall time our own code adds on top of the ideal time
+spent waiting for the (simulated) LLM.
+
+    PYTHONPATH=. python benchmarks/generation.py --functions 200 --latency 0.5 --batch-size 8
+"""
+import argparse
+import asyncio
+import math
+import tempfile
+import time
+from pathlib import Path
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.llm_backends import StubBackend
+from mcp_server.mcp_generator import MCPGenerator
+
+def synthetic_abi(functions: int):
+    abi = []
+    for i in range(functions):
+        view = i % 2 == 0
+        abi.append({
+            "type": "function",
+            "name": f"function{i}",
+            "inputs": [{"name": "account", "type": "address"}, {"name": "amount", "type": "uint256"}][:i % 3],
+            "outputs": [{"name": "", "type": "uint256"}] if view else [],
+            "stateMutability": "view" if view else "nonpayable"
+        })
+        abi.append({"type": "event", "name": f"Event{i}", "anonymous": False,
+                    "inputs": [{"name": "value", "type": "uint256", "indexed": False}]})
+    return abi
+
+def run(analysis, output_dir: Path, args) -> dict:
+    backend = StubBackend(latency=args.latency, max_concurrency=args.concurrency)
+    generator = MCPGenerator(
+        analysis=analysis,
+        output_dir=output_dir,
+        contract_name="Benchmark",
+        openai_api_key=None,
+        max_workers=args.workers,
+        batch_size=args.batch_size,
+        llm_backend=backend
+    )
+    start = time.perf_counter()
+    asyncio.run(generator.generate())
+    elapsed = time.perf_counter() - start
+    requests = generator.llm_generator.meter.total_requests
+    ideal = math.ceil(requests / min(args.concurrency, args.workers)) * args.latency
+    return {
+        "seconds": elapsed,
+        "requests": requests,
+        "tokens": generator.llm_generator.meter.total_tokens,
+        "overhead": elapsed - ideal
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per LLM request.")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM requests in flight.")
+    args = parser.parse_args()
+
+    analysis = ABIAnalyzer({"abi": synthetic_abi(args.functions)}).analyze()
+    with tempfile.TemporaryDirectory() as directory:
+        output_dir = Path(directory)
+        print(f"{'Run':<12} {'Seconds':>9} {'Requests':>9} {'Tokens':>9} {'Overhead':>9}")
+        for label in ("cold", "incremental", "cache-warm"):
+            if label == "cache-warm":
+                # Forget the previous outputs but keep the method cache
+                (output_dir / "mcp_manifest.json").unlink()
+            result = run(analysis, output_dir, args)
+            print(f"{label:<12} {result['seconds']:>9.3f} {result['requests']:>9} "
+                  f"{result['tokens']:>9} {result['overhead']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
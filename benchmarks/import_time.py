@@ -0,0 +1,58 @@
+"""
+Measure the import time of the CLI and core modules against a budget.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and the
+median cumulative time of the module itself is compared with its budget.
+Exits with status 1 when a module is over budget or pulls in a heavy
+dependency, so it can guard CI.
+
+    PYTHONPATH=. python benchmarks/import_time.py --runs 5
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+# Module -> budget in milliseconds
+BUDGETS = {
+    "mcp_server": 5,
+    "mcp_server.abi_analyzer": 40,
+    "mcp_server.cli": 250,
+}
+
+# Only loaded by the code paths that need them
+HEAVY_MODULES = ("openai", "web3", "fastapi", "pydantic", "aiohttp", "eth_abi")
+
+_IMPORT_TIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$")
+
+def measure(module: str):
+    """Return the cumulative import time of ``module`` (ms) and every module it loaded."""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1000
+    return times[module], set(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<26} {'Median (ms)':>12} {'Budget (ms)':>12}  Heavy imports")
+    for module, budget in BUDGETS.items():
+        runs = [measure(module) for _ in range(args.runs)]
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = sorted(name for name in runs[0][1] if name in HEAVY_MODULES)
+        failed |= median > budget or bool(heavy)
+        print(f"{module:<26} {median:>12.1f} {budget:>12}  {', '.join(heavy) or '-'}")
+    if failed:
+        print("Import time budget exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,24 @@
 MCP Server Generator for Smart Contracts
 """
 
-from .cli import cli
-from .abi_analyzer import ABIAnalyzer
-from .mcp_generator import MCPGenerator
+import importlib
 
-__version__ = "0.1.0" 
\ No newline at end of file
+__version__ = "0.1.0"
+
+# Public names, imported on first access so that importing one submodule
+# (or running a quick CLI command) doesn't load the whole package
+_LAZY_ATTRIBUTES = {
+    "cli": ".cli",
+    "ABIAnalyzer": ".abi_analyzer",
+    "MCPGenerator": ".mcp_generator",
+}
+
+__all__ = ["ABIAnalyzer", "MCPGenerator", "cli"]
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        # Importing the submodule bound it to the package; the attribute wins, as it did eagerly
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
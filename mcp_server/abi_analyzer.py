@@ -1,8 +1,9 @@
-from typing import Dict, List, Optional, Union
-import json
+from typing import Dict, List, Optional, Tuple, Union
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from .artifact_loader import artifact_hash, load_contracts, select_contract
 
 class FunctionType(Enum):
     VIEW = "view"
@@ -16,6 +17,14 @@ class FunctionParameter:
     type: str
     components: Optional[List['FunctionParameter']] = None
 
+    @property
+    def canonical_type(self) -> str:
+        """The canonical ABI type, with tuples expanded (e.g. ``(uint256,address)[]``)."""
+        if self.type.startswith('tuple') and self.components is not None:
+            inner = ",".join(c.canonical_type for c in self.components)
+            return f"({inner}){self.type[len('tuple'):]}"
+        return self.type
+
 @dataclass
 class FunctionDefinition:
     name: str
@@ -23,65 +32,103 @@ class FunctionDefinition:
     outputs: List[FunctionParameter]
     state_mutability: FunctionType
     is_constructor: bool = False
+    # Set by ABIAnalyzer when other functions share this name
+    overloaded: bool = False
+
+    @property
+    def signature(self) -> str:
+        """The canonical function signature, e.g. ``transfer(address,uint256)``."""
+        return f"{self.name}({','.join(p.canonical_type for p in self.inputs)})"
+
+    @property
+    def selector(self) -> str:
+        """The 4-byte function selector, e.g. ``0xa9059cbb``."""
+        # Imported on first use to keep the analyzer cheap to import
+        from eth_hash.auto import keccak
+        return "0x" + keccak(self.signature.encode())[:4].hex()
+
+    @property
+    def method_name(self) -> str:
+        """Name of the generated method: the function name, plus the selector when overloaded."""
+        if self.overloaded:
+            return f"{self.name}_{self.selector[2:]}"
+        return self.name
+
+# Analyses of artifact files, keyed by content hash and contract
+ANALYSIS_CACHE_SIZE = 64
+_analysis_cache: "OrderedDict[Tuple[str, Optional[str]], Dict]" = OrderedDict()
 
 class ABIAnalyzer:
-    def __init__(self, abi_input: Union[str, Dict]):
-        """Initialize the ABI analyzer with either a path to an ABI file or a dictionary."""
+    def __init__(self, abi_input: Union[str, Path, Dict, List], contract: Optional[str] = None):
+        """
+        Initialize the ABI analyzer with either a path to an artifact file or a dictionary.
+
+        Artifact files are streamed, so only their ABI is ever loaded (see
+        ``artifact_loader``). ``contract`` (a name or ``source:Name``) picks
+        one contract out of solc output or build-info files holding several.
+        Analyses of files are cached by content hash; treat them as read-only.
+        """
+        self.artifact_hash = None
+        self._cache_key = None
         if isinstance(abi_input, (str, Path)):
-            with open(abi_input, 'r') as f:
-                data = json.load(f)
-                self.abi = data.get('abi', data)
+            self.artifact_hash = artifact_hash(abi_input)
+            self._cache_key = (self.artifact_hash, contract)
+            cached = _analysis_cache.get(self._cache_key)
+            if cached is not None:
+                _analysis_cache.move_to_end(self._cache_key)
+                self.abi = cached['abi']
+                return
+            contracts = load_contracts(abi_input, digest=self.artifact_hash)
+            self.abi = select_contract(contracts, contract, abi_input).abi
+        elif isinstance(abi_input, list):
+            self.abi = abi_input
         else:
             self.abi = abi_input.get('abi', abi_input)
             
     def analyze(self) -> Dict:
-        """Analyze the ABI and return a structured representation."""
-        analysis = {
-            'abi': self.abi,
-            'functions': self._get_functions(),
-            'events': self._get_events(),
-            'state_variables': self._get_state_variables(),
-            'constructor': self._get_constructor()
-        }
-        return analysis
-    
-    def _get_functions(self) -> List[FunctionDefinition]:
-        """Extract all functions from the ABI."""
+        """Analyze the ABI, in a single pass, and return a structured representation."""
+        if self._cache_key in _analysis_cache:
+            return _analysis_cache[self._cache_key]
         functions = []
+        events = []
+        state_variables = []
+        constructor = None
         for item in self.abi:
-            if item['type'] == 'function':
-                func = FunctionDefinition(
+            kind = item.get('type', 'function')
+            if kind == 'function':
+                functions.append(FunctionDefinition(
                     name=item['name'],
                     inputs=[self._parse_parameter(p) for p in item.get('inputs', [])],
                     outputs=[self._parse_parameter(p) for p in item.get('outputs', [])],
                     state_mutability=FunctionType(item.get('stateMutability', 'nonpayable'))
-                )
-                functions.append(func)
-        return functions
-    
-    def _get_events(self) -> List[Dict]:
-        """Extract all events from the ABI."""
-        return [item for item in self.abi if item['type'] == 'event']
-    
-    def _get_state_variables(self) -> List[Dict]:
-        """Extract state variables from view functions."""
-        state_vars = []
-        for item in self.abi:
-            if (item['type'] == 'function' and 
-                item.get('stateMutability') == 'view' and 
-                len(item.get('inputs', [])) == 0):
-                state_vars.append({
-                    'name': item['name'],
-                    'type': item['outputs'][0]['type'] if item.get('outputs') else 'unknown'
-                })
-        return state_vars
-    
-    def _get_constructor(self) -> Optional[Dict]:
-        """Extract the constructor from the ABI."""
-        for item in self.abi:
-            if item['type'] == 'constructor':
-                return item
-        return None
+                ))
+                # Getters without arguments double as state variables
+                if item.get('stateMutability') == 'view' and not item.get('inputs'):
+                    state_variables.append({
+                        'name': item['name'],
+                        'type': item['outputs'][0]['type'] if item.get('outputs') else 'unknown'
+                    })
+            elif kind == 'event':
+                events.append(item)
+            elif kind == 'constructor' and constructor is None:
+                constructor = item
+        names = Counter(function.name for function in functions)
+        for function in functions:
+            function.overloaded = names[function.name] > 1
+        analysis = {
+            'abi': self.abi,
+            'functions': functions,
+            # 4-byte selector -> function, for dispatch on selectors and calldata
+            'selectors': {function.selector: function for function in functions},
+            'events': events,
+            'state_variables': state_variables,
+            'constructor': constructor
+        }
+        if self._cache_key is not None:
+            _analysis_cache[self._cache_key] = analysis
+            while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
+        return analysis
     
     def _parse_parameter(self, param: Dict) -> FunctionParameter:
         """Parse a parameter definition."""
@@ -93,4 +140,4 @@ class ABIAnalyzer:
             name=param.get('name', ''),
             type=param['type'],
             components=components
-        ) 
\ No newline at end of file
+        )
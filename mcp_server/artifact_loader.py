@@ -0,0 +1,251 @@
+import re
+import json
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+CHUNK_SIZE = 1 << 16
+
+# Parsed contracts of recently loaded artifacts, keyed by content hash
+CONTRACTS_CACHE_SIZE = 8
+_contracts_cache: "OrderedDict[Tuple[str, bool], List[ContractArtifact]]" = OrderedDict()
+
+_ANY = None
+_CONTRACT_KEYS = ("abi", "storageLayout")
+# Where contract ABIs live: Hardhat/Foundry artifacts, solc standard JSON
+# output and build-info files (solc input and output together)
+_PATTERNS = (
+    ("abi",), ("storageLayout",), ("contractName",), ("sourceName",),
+    *(("contracts", _ANY, _ANY, key) for key in _CONTRACT_KEYS),
+    *(("output", "contracts", _ANY, _ANY, key) for key in _CONTRACT_KEYS),
+)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# Everything up to the next bracket, including complete strings
+_TO_BRACKET = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_SCALAR = re.compile(r"[^,\]}\s]*")
+
+@dataclass
+class ContractArtifact:
+    """The ABI (and optionally storage layout) of one contract in an artifact."""
+    name: Optional[str]
+    source: Optional[str]
+    abi: List[Dict]
+    storage_layout: Optional[Dict] = None
+
+    @property
+    def qualified_name(self) -> Optional[str]:
+        """``source:Name``, as solc names contracts, or just the name."""
+        if self.source and self.name:
+            return f"{self.source}:{self.name}"
+        return self.name
+
+class _JSONStream:
+    """
+    Reads a JSON document in chunks, decoding only the values asked for.
+
+    Skipped values are scanned with regular expressions and never decoded,
+    and consumed text is dropped as new chunks are read, so memory use is
+    bounded by the chunk size and the largest value actually decoded.
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        # Start of a value being decoded, kept across reads
+        self._mark: Optional[int] = None
+
+    def _more(self) -> bool:
+        """Read another chunk, dropping consumed text; False at end of file."""
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        keep = self._pos if self._mark is None else self._mark
+        self._buffer = self._buffer[keep:] + chunk
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark = 0
+        return True
+
+    def _need_more(self):
+        if not self._more():
+            raise ValueError("Unexpected end of JSON document")
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._need_more()
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {self._buffer[self._pos]!r}")
+        self._pos += 1
+
+    def _skip_string(self):
+        self._pos += 1
+        while True:
+            self._pos = _STRING_BODY.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) and self._buffer[self._pos] == '"':
+                self._pos += 1
+                return
+            # The string (or an escape sequence) continues in the next chunk
+            self._need_more()
+
+    def skip_value(self):
+        """Consume the next value without decoding it."""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in "[{":
+            depth = 0
+            while True:
+                self._pos = _TO_BRACKET.match(self._buffer, self._pos).end()
+                if self._pos == len(self._buffer):
+                    self._need_more()
+                    continue
+                token = self._buffer[self._pos]
+                if token == '"':
+                    # A string continuing in the next chunk
+                    self._skip_string()
+                    continue
+                self._pos += 1
+                depth += 1 if token in "[{" else -1
+                if depth == 0:
+                    return
+        else:
+            while True:
+                self._pos = _SCALAR.match(self._buffer, self._pos).end()
+                if self._pos < len(self._buffer) or not self._more():
+                    return
+
+    def read_value(self):
+        """Consume and decode the next value."""
+        self.peek()
+        self._mark = self._pos
+        try:
+            self.skip_value()
+            return json.loads(self._buffer[self._mark:self._pos])
+        finally:
+            self._mark = None
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the object at the current position.
+
+        The caller must consume each key's value (``skip_value``,
+        ``read_value`` or ``keys``) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("Expected an object key in JSON document")
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON document, found {char!r}")
+
+def _walk(stream: _JSONStream, path: Tuple[str, ...], patterns) -> Iterator[Tuple[Tuple[str, ...], object]]:
+    """Yield (path, value) for every value matching a pattern, skipping the rest."""
+    for key in stream.keys():
+        child = path + (key,)
+        matching = [p for p in patterns if len(p) >= len(child)
+                    and all(part is _ANY or part == k for part, k in zip(p, child))]
+        if any(len(p) == len(child) for p in matching):
+            yield child, stream.read_value()
+        elif matching and stream.peek() == "{":
+            yield from _walk(stream, child, matching)
+        else:
+            stream.skip_value()
+
+def artifact_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of an artifact file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_contracts(path: Union[str, Path], storage_layout: bool = False,
+                   chunk_size: int = CHUNK_SIZE) -> List[ContractArtifact]:
+    """
+    Stream the contracts out of an artifact file.
+
+    Understands plain ABI files, Hardhat and Foundry artifacts, solc
+    standard JSON output and build-info files. Only ABIs (and, with
+    ``storage_layout``, storage layouts) are decoded; bytecode, source maps,
+    ASTs and sources are skipped without being materialized.
+    """
+    patterns = [p for p in _PATTERNS if storage_layout or p[-1] != "storageLayout"]
+    with open(path, encoding="utf-8") as f:
+        stream = _JSONStream(f, chunk_size)
+        if stream.peek() == "[":
+            return [ContractArtifact(name=None, source=None, abi=stream.read_value())]
+        values = dict(_walk(stream, (), patterns))
+
+    contracts: "OrderedDict[Tuple[str, ...], ContractArtifact]" = OrderedDict()
+    for key, value in values.items():
+        prefix, field = key[:-1], key[-1]
+        if field not in _CONTRACT_KEYS:
+            continue
+        if prefix not in contracts:
+            if prefix:
+                name, source = prefix[-1], prefix[-2]
+            else:
+                name, source = values.get(("contractName",)), values.get(("sourceName",))
+            contracts[prefix] = ContractArtifact(name=name, source=source, abi=[])
+        if field == "abi":
+            contracts[prefix].abi = value
+        else:
+            contracts[prefix].storage_layout = value
+    return list(contracts.values())
+
+def load_contracts(path: Union[str, Path], storage_layout: bool = False,
+                   digest: Optional[str] = None) -> List[ContractArtifact]:
+    """``read_contracts``, cached by artifact content hash (pass ``digest`` if already known)."""
+    key = (digest or artifact_hash(path), storage_layout)
+    contracts = _contracts_cache.get(key)
+    if contracts is None:
+        contracts = read_contracts(path, storage_layout=storage_layout)
+        _contracts_cache[key] = contracts
+        while len(_contracts_cache) > CONTRACTS_CACHE_SIZE:
+            _contracts_cache.popitem(last=False)
+    else:
+        _contracts_cache.move_to_end(key)
+    return contracts
+
+def select_contract(contracts: List[ContractArtifact], contract: Optional[str] = None,
+                    artifact: Union[str, Path] = "artifact") -> ContractArtifact:
+    """
+    Pick one contract by name or ``source:Name``.
+
+    Without a name, the artifact must hold exactly one contract.
+    """
+    if not contracts:
+        raise ValueError(f"{artifact} does not contain an ABI")
+    if contract is None or (len(contracts) == 1 and contracts[0].name is None):
+        if len(contracts) == 1:
+            return contracts[0]
+    else:
+        matches = [c for c in contracts if contract in (c.name, c.qualified_name)]
+        if len(matches) == 1:
+            return matches[0]
+    names = ", ".join(c.qualified_name or "?" for c in contracts)
+    if contract is None:
+        raise ValueError(f"{artifact} contains {len(contracts)} contracts; choose one of: {names}")
+    raise ValueError(f"Contract {contract!r} not found (or ambiguous) in {artifact}; choose one of: {names}")
@@ -1,49 +1,239 @@
 import click
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from .abi_analyzer import ABIAnalyzer
-import json
 import asyncio
-from .mcp_generator import MCPGenerator
+from .mcp_generator import MCPGenerator, MethodGenerationError
+from .rate_limiter import TokenBucket, SharedTokenBucket
+from .generate_all import SUMMARY_NAME, discover_artifacts, generate_all, plan_jobs, write_summary
+from .method_cache import MethodCache
+from .method_library import LIBRARY_ENV_VAR
+from .llm_backends import BACKENDS as LLM_BACKENDS, create_backend
+from datetime import datetime
+import time
 
 @click.group()
 def cli():
     """MCP Server Generator CLI"""
     pass
 
+def llm_backend_options(command):
+    """Options selecting and tuning the LLM backend, shared by the generate commands."""
+    options = [
+        click.option('--llm-backend', type=click.Choice(LLM_BACKENDS), default='openai', show_default=True,
+                     help='LLM backend. "stub" answers offline from the templates; "replay" answers '
+                          'from --llm-recording.'),
+        click.option('--llm-model', default=None, help='Model name (gpt-4 by default).'),
+        click.option('--llm-base-url', envvar='OPENAI_BASE_URL', default=None,
+                     help='Base URL of an OpenAI-compatible endpoint. Defaults to $OPENAI_BASE_URL.'),
+        click.option('--llm-concurrency', type=click.IntRange(min=1), default=None,
+                     help='Maximum LLM requests in flight.'),
+        click.option('--llm-timeout', type=click.FloatRange(min=0, min_open=True), default=None,
+                     help='Timeout of each LLM request in seconds.'),
+        click.option('--llm-recording', type=click.Path(dir_okay=False), default=None,
+                     help='Record completions to this file, or replay them with --llm-backend replay.'),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+def _llm_backend_settings(llm_options) -> dict:
+    """Translate the --llm-* options into ``create_backend`` settings."""
+    settings = {
+        'kind': llm_options['llm_backend'],
+        'model': llm_options['llm_model'],
+        'base_url': llm_options['llm_base_url'],
+        'max_concurrency': llm_options['llm_concurrency'],
+        'timeout': llm_options['llm_timeout'],
+        'recording': Path(llm_options['llm_recording']) if llm_options['llm_recording'] else None
+    }
+    if settings['kind'] == 'replay' and settings['recording'] is None:
+        raise click.UsageError("--llm-backend replay requires --llm-recording")
+    return settings
+
 @cli.command()
 @click.argument('abi_file', type=click.Path(exists=True))
 @click.argument('output_dir', type=click.Path())
 @click.argument('contract_name')
-def generate(abi_file: str, output_dir: str, contract_name: str):
+@click.option('--workers', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Maximum number of methods generated concurrently.')
+@click.option('--requests-per-minute', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Steady-state LLM request budget shared by all workers.')
+@click.option('--backend', type=click.Choice(MCPGenerator.BACKENDS), default='llm', show_default=True,
+              help='Code generation backend. "template" renders standard functions offline '
+                   'and only uses the LLM for functions it cannot handle.')
+@click.option('--contract', default=None, metavar='NAME',
+              help='Contract to use (name or source:Name) when ABI_FILE is solc output or a '
+                   'build-info file holding several contracts.')
+@click.option('--immutable', 'immutable_methods', multiple=True, metavar='METHOD',
+              help='View method whose result never changes (e.g. name, symbol, decimals); '
+                   'the server caches it without expiry (least recently used first out). Repeatable.')
+@click.option('--library', type=click.Path(file_okay=False), envvar=LIBRARY_ENV_VAR, default=None,
+              help='Shared method library used instead of OUTPUT_DIR/cache, pre-warmed with '
+                   f'standard token functions. Defaults to ${LIBRARY_ENV_VAR}.')
+@click.option('--batch-size', default=1, show_default=True, type=click.IntRange(min=1),
+              help='Number of functions generated per LLM request.')
+@click.option('--bundle', is_flag=True, default=False,
+              help='Also write bundle.py, a single precompiled module with every method, '
+                   'for faster server cold starts.')
+@click.option('--profile', type=click.Choice(MCPGenerator.PROFILES), default='development',
+              show_default=True,
+              help='Runtime profile of the generated server. "production" logs at WARNING '
+                   '(MCP_LOG_LEVEL overrides), keeps debug logging off the request path and '
+                   'runs one uvicorn worker per core (MCP_WORKERS overrides).')
+@llm_backend_options
+def generate(abi_file: str, output_dir: str, contract_name: str, workers: int,
+             requests_per_minute: Optional[float], backend: str, contract: Optional[str],
+             immutable_methods: Tuple[str, ...], library: Optional[str], batch_size: int, bundle: bool, profile: str,
+             **llm_options):
     """Generate an MCP server from a contract ABI."""
-    # Check for OpenAI API key
+    llm_settings = _llm_backend_settings(llm_options)
+    # Check for OpenAI API key (the template backend and the library only need it for misses)
     openai_api_key = os.getenv('OPENAI_API_KEY')
-    if not openai_api_key:
+    if not openai_api_key and backend == 'llm' and not library and llm_settings['kind'] == 'openai':
         click.echo("Error: OPENAI_API_KEY environment variable is not set", err=True)
         return
         
-    # Load ABI
-    with open(abi_file) as f:
-        abi = json.load(f)
-        
-    # Analyze ABI
-    analyzer = ABIAnalyzer(abi)
+    # Load and analyze the ABI (large artifacts are streamed)
+    try:
+        analyzer = ABIAnalyzer(abi_file, contract=contract)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'ABI_FILE' / '--contract'")
     analysis = analyzer.analyze()
     
+    # Only view methods can be cached for the life of the process
+    try:
+        MCPGenerator.resolve_immutable_methods(analysis['functions'], list(immutable_methods))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--immutable'")
+    
     # Create generator
-    generator = MCPGenerator(
-        analysis=analysis,
-        output_dir=Path(output_dir),
-        contract_name=contract_name,
-        openai_api_key=openai_api_key
-    )
+    try:
+        generator = MCPGenerator(
+            analysis=analysis,
+            output_dir=Path(output_dir),
+            contract_name=contract_name,
+            openai_api_key=openai_api_key,
+            max_workers=workers,
+            rate_limiter=TokenBucket.per_minute(requests_per_minute, capacity=workers),
+            backend=backend,
+            immutable_methods=list(immutable_methods),
+            library_dir=Path(library).expanduser() if library else None,
+            batch_size=batch_size,
+            bundle=bundle,
+            profile=profile,
+            llm_backend=create_backend(api_key=openai_api_key, **llm_settings)
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
     
     # Generate server
-    asyncio.run(generator.generate())
+    try:
+        asyncio.run(generator.generate())
+    except MethodGenerationError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
     
-    click.echo(f"MCP server generated in {output_dir}")
+    stats = generator.build_stats
+    click.echo(f"MCP server generated in {output_dir} "
+               f"({stats['methods_generated']} methods generated, {stats['methods_skipped']} unchanged; "
+               f"{stats['written']} files written, {stats['removed']} removed)")
+    meter = generator.llm_generator.meter
+    if meter.total_requests:
+        click.echo(f"LLM usage: {meter.total_requests} requests, {meter.total_tokens} tokens "
+                   f"(~{meter.tokens_saved} tokens saved)")
+
+@cli.command('generate-all')
+@click.argument('source')
+@click.argument('output_root', type=click.Path(file_okay=False))
+@click.option('--processes', type=click.IntRange(min=1), default=None,
+              help='Number of worker processes. Defaults to the number of CPUs.')
+@click.option('--workers', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Maximum number of methods generated concurrently per contract.')
+@click.option('--requests-per-minute', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Steady-state LLM request budget shared by all processes.')
+@click.option('--backend', type=click.Choice(MCPGenerator.BACKENDS), default='llm', show_default=True,
+              help='Code generation backend (see generate).')
+@click.option('--cache-dir', type=click.Path(file_okay=False), default=None,
+              help='Method cache shared by all contracts. Defaults to OUTPUT_ROOT/cache.')
+@click.option('--library', type=click.Path(file_okay=False), envvar=LIBRARY_ENV_VAR, default=None,
+              help='Shared method library used instead of the cache directory, pre-warmed with '
+                   f'standard token functions. Defaults to ${LIBRARY_ENV_VAR}.')
+@click.option('--batch-size', default=1, show_default=True, type=click.IntRange(min=1),
+              help='Number of functions generated per LLM request.')
+@click.option('--bundle', is_flag=True, default=False,
+              help='Also write bundle.py, a single precompiled module with every method, '
+                   'for faster server cold starts.')
+@click.option('--profile', type=click.Choice(MCPGenerator.PROFILES), default='development',
+              show_default=True,
+              help='Runtime profile of the generated server. "production" logs at WARNING '
+                   '(MCP_LOG_LEVEL overrides), keeps debug logging off the request path and '
+                   'runs one uvicorn worker per core (MCP_WORKERS overrides).')
+@llm_backend_options
+def generate_all_command(source: str, output_root: str, processes: Optional[int], workers: int,
+                         requests_per_minute: Optional[float], backend: str, cache_dir: Optional[str],
+                         library: Optional[str], batch_size: int, bundle: bool,
+                         profile: str, **llm_options):
+    """
+    Generate MCP servers for every artifact in SOURCE.
+
+    SOURCE is a directory (searched recursively for *.json artifacts) or a
+    glob pattern. Each contract is written to OUTPUT_ROOT/<contract name>.
+    """
+    llm_settings = _llm_backend_settings(llm_options)
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    if not openai_api_key and backend == 'llm' and not library and llm_settings['kind'] == 'openai':
+        click.echo("Error: OPENAI_API_KEY environment variable is not set", err=True)
+        return
+    if cache_dir and library:
+        raise click.UsageError("--cache-dir and --library are mutually exclusive")
+        
+    artifacts = discover_artifacts(source)
+    if not artifacts:
+        click.echo(f"Error: no artifacts found in {source}", err=True)
+        raise SystemExit(1)
+        
+    root = Path(output_root)
+    root.mkdir(parents=True, exist_ok=True)
+    jobs = plan_jobs(artifacts, root)
+    click.echo(f"Generating {len(jobs)} contracts...")
+    
+    start = time.monotonic()
+    library_dir = Path(library).expanduser() if library else None
+    results = generate_all(
+        jobs,
+        cache_dir=None if library_dir else Path(cache_dir) if cache_dir else root / 'cache',
+        library_dir=library_dir,
+        batch_size=batch_size,
+        bundle=bundle,
+        profile=profile,
+        llm_backend=llm_settings,
+        openai_api_key=openai_api_key,
+        backend=backend,
+        processes=processes,
+        workers=workers,
+        rate_limiter=SharedTokenBucket.per_minute(requests_per_minute, capacity=workers)
+    )
+    elapsed = time.monotonic() - start
+    
+    # Per-contract summary
+    click.echo(f"{'Contract':<32} {'Status':<8} {'Seconds':>8} {'Generated':>9} {'Unchanged':>9} "
+               f"{'Cache hits':>10} {'LLM calls':>9}")
+    for result in results:
+        click.echo(f"{result.contract_name[:32]:<32} {result.status:<8} {result.seconds:>8.2f} "
+                   f"{result.methods_generated:>9} {result.methods_skipped:>9} "
+                   f"{result.cache_hits:>10} {result.llm_requests:>9}")
+        for name, error in result.failures.items():
+            click.echo(f"    {name}: {error}", err=True)
+            
+    summary_path = root / SUMMARY_NAME
+    write_summary(results, summary_path)
+    failed = sum(1 for r in results if r.status != "ok")
+    click.echo(f"Generated {len(results) - failed}/{len(results)} contracts in {elapsed:.2f}s; "
+               f"summary written to {summary_path}")
+    if failed:
+        raise SystemExit(1)
 
 @cli.command()
 @click.argument('cache_dir', type=click.Path(exists=True))
@@ -54,11 +244,54 @@ def clear_cache(cache_dir: str):
         click.echo("Cache directory does not exist")
         return
         
-    # Remove all .py files in cache directory
-    for file in cache_path.glob("*.py"):
-        file.unlink()
+    cache = MethodCache(cache_path)
+    removed = cache.clear()
+    cache.close()
         
-    click.echo("Cache cleared")
+    click.echo(f"Cache cleared ({removed} entries removed)")
+
+@cli.group()
+def cache():
+    """Inspect and manage the method implementation cache."""
+    pass
+
+@cache.command()
+@click.argument('cache_dir', type=click.Path(exists=True, file_okay=False))
+def stats(cache_dir: str):
+    """Show method cache statistics."""
+    method_cache = MethodCache(Path(cache_dir))
+    cache_stats = method_cache.stats()
+    method_cache.close()
+    
+    click.echo(f"Entries:     {cache_stats['entries']}")
+    click.echo(f"Total size:  {cache_stats['total_bytes']} bytes")
+    click.echo(f"Total hits:  {cache_stats['total_hits']}")
+    for label, key in (("Oldest:", "oldest_created_at"), ("Newest:", "newest_created_at")):
+        if cache_stats[key] is not None:
+            click.echo(f"{label:<12} {datetime.fromtimestamp(cache_stats[key]).isoformat(timespec='seconds')}")
+
+@cache.command()
+@click.argument('cache_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--max-entries', type=click.IntRange(min=0), default=None,
+              help='Keep at most this many entries, evicting the least recently used.')
+@click.option('--max-bytes', type=click.IntRange(min=0), default=None,
+              help='Keep at most this many bytes of implementations.')
+@click.option('--max-age-days', type=click.FloatRange(min=0), default=None,
+              help='Remove entries not used for this many days.')
+def prune(cache_dir: str, max_entries: Optional[int], max_bytes: Optional[int], max_age_days: Optional[float]):
+    """Evict method cache entries by age, count or total size."""
+    if max_entries is None and max_bytes is None and max_age_days is None:
+        raise click.UsageError("Specify at least one of --max-entries, --max-bytes or --max-age-days")
+        
+    method_cache = MethodCache(Path(cache_dir))
+    removed = method_cache.prune(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        max_age=max_age_days * 86400 if max_age_days is not None else None
+    )
+    method_cache.close()
+    
+    click.echo(f"Removed {removed} entries")
 
 if __name__ == '__main__':
     cli() 
\ No newline at end of file
@@ -0,0 +1,188 @@
+import os
+import glob
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .abi_analyzer import ABIAnalyzer
+from .artifact_loader import load_contracts
+from .llm_backends import create_backend
+from .mcp_generator import MCPGenerator, MethodGenerationError
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NAME = 'generate-all-summary.json'
+
+@dataclass
+class GenerationJob:
+    """One contract artifact to generate a server for."""
+    artifact: str
+    contract_name: str
+    output_dir: str
+    # ``source:Name`` of the contract in artifacts holding several
+    contract: Optional[str] = None
+
+@dataclass
+class GenerationResult:
+    """Per-contract outcome of a ``generate-all`` run."""
+    contract_name: str
+    artifact: str
+    output_dir: str
+    status: str = "ok"
+    seconds: float = 0.0
+    methods_generated: int = 0
+    methods_skipped: int = 0
+    methods_from_template: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    llm_requests: int = 0
+    llm_tokens: int = 0
+    llm_tokens_saved: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+
+def discover_artifacts(source: str) -> List[Path]:
+    """
+    Find contract artifacts in a directory (recursively) or matching a glob.
+
+    Hardhat debug files (``*.dbg.json``) are ignored.
+    """
+    path = Path(source)
+    if path.is_dir():
+        candidates = path.rglob('*.json')
+    else:
+        candidates = (Path(p) for p in glob.glob(source, recursive=True))
+    return sorted(p for p in candidates if p.is_file() and not p.name.endswith('.dbg.json'))
+
+def _artifact_contracts(artifact: Path) -> List[Tuple[str, Optional[str]]]:
+    """(contract name, contract selector) of each contract in an artifact."""
+    try:
+        contracts = load_contracts(artifact)
+    except (OSError, ValueError):
+        # Reported when the job runs
+        return [(artifact.stem, None)]
+    if len(contracts) <= 1:
+        name = contracts[0].name if contracts else None
+        return [(name if isinstance(name, str) else artifact.stem, None)]
+    # Solc output and build-info files: every contract with a non-empty ABI
+    return [(c.name, c.qualified_name) for c in contracts if c.abi]
+
+def plan_jobs(artifacts: List[Path], output_root: Path) -> List[GenerationJob]:
+    """
+    Name each artifact's contracts and their output directories.
+
+    The contract name comes from the artifact's ``contractName`` when present
+    and from the file name otherwise; solc output and build-info files yield
+    one job per contract. Duplicates get a numeric suffix. Artifacts are
+    streamed, so planning stays cheap for large build-info files.
+    """
+    jobs = []
+    used = set()
+    for artifact in artifacts:
+        for contract_name, contract in _artifact_contracts(artifact):
+            name = contract_name
+            suffix = 2
+            while name in used:
+                name = f"{contract_name}_{suffix}"
+                suffix += 1
+            used.add(name)
+            jobs.append(GenerationJob(artifact=str(artifact), contract_name=name,
+                                      output_dir=str(output_root / name), contract=contract))
+    return jobs
+
+# Settings shared by every job in a worker process, set by _init_worker
+_worker_settings: Dict = {}
+
+def _init_worker(settings: Dict):
+    _worker_settings.update(settings)
+
+def _generate_contract(job: GenerationJob) -> GenerationResult:
+    """Analyze one artifact and generate its server. Runs in a worker process."""
+    settings = _worker_settings
+    result = GenerationResult(contract_name=job.contract_name, artifact=job.artifact, output_dir=job.output_dir)
+    start = time.monotonic()
+    generator = None
+    try:
+        analyzer = ABIAnalyzer(job.artifact, contract=job.contract)
+        if not isinstance(analyzer.abi, list):
+            raise ValueError("artifact does not contain an ABI")
+        output_dir = Path(job.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        generator = MCPGenerator(
+            analysis=analyzer.analyze(),
+            output_dir=output_dir,
+            contract_name=job.contract_name,
+            openai_api_key=settings['openai_api_key'],
+            max_workers=settings['workers'],
+            rate_limiter=settings['rate_limiter'],
+            backend=settings['backend'],
+            cache_dir=settings['cache_dir'],
+            library_dir=settings['library_dir'],
+            batch_size=settings['batch_size'],
+            bundle=settings['bundle'],
+            profile=settings['profile'],
+            llm_backend=create_backend(api_key=settings['openai_api_key'], **settings['llm_backend']),
+            # Contracts are already spread across processes
+            validation_processes=1
+        )
+        asyncio.run(generator.generate())
+    except MethodGenerationError as e:
+        result.status = "partial"
+        result.failures = {name: str(error) for name, error in e.failures.items()}
+    except Exception as e:
+        result.status = "failed"
+        result.failures = {"*": str(e)}
+    result.seconds = round(time.monotonic() - start, 3)
+
+    if generator is not None:
+        stats = generator.build_stats
+        result.methods_generated = stats['methods_generated']
+        result.methods_skipped = stats['methods_skipped']
+        result.methods_from_template = stats['methods_from_template']
+        llm = generator.llm_generator
+        result.cache_hits = llm.cache.hits
+        result.cache_misses = llm.cache.misses
+        result.llm_requests = llm.meter.total_requests
+        result.llm_tokens = llm.meter.total_tokens
+        result.llm_tokens_saved = llm.meter.tokens_saved
+        llm.cache.close()
+    return result
+
+def generate_all(jobs: List[GenerationJob], cache_dir: Optional[Path], openai_api_key: Optional[str],
+                 backend: str = "llm", processes: Optional[int] = None, workers: int = 8,
+                 rate_limiter=None, library_dir: Optional[Path] = None,
+                 batch_size: int = 1, llm_backend: Optional[Dict] = None,
+                 bundle: bool = False, profile: str = "development") -> List[GenerationResult]:
+    """
+    Generate servers for many contracts across a process pool.
+
+    Every process shares the method cache in ``cache_dir`` and the
+    ``rate_limiter`` (a ``SharedTokenBucket``), so the LLM budget applies to
+    the whole fleet rather than to each contract. Pass ``library_dir``
+    instead of ``cache_dir`` to share a pre-warmed method library.
+    ``llm_backend`` holds ``create_backend`` settings for the backend each
+    process builds. ``bundle`` also writes each server as a single module
+    and ``profile`` selects its runtime profile (see ``MCPGenerator``). Results are returned in job order.
+    """
+    settings = {
+        'openai_api_key': openai_api_key,
+        'backend': backend,
+        'workers': workers,
+        'cache_dir': cache_dir,
+        'library_dir': library_dir,
+        'batch_size': batch_size,
+        'bundle': bundle,
+        'profile': profile,
+        'llm_backend': llm_backend or {},
+        'rate_limiter': rate_limiter
+    }
+    processes = max(1, min(processes or os.cpu_count() or 1, len(jobs) or 1))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(settings,)) as pool:
+        return list(pool.map(_generate_contract, jobs))
+
+def write_summary(results: List[GenerationResult], path: Path):
+    """Write the per-contract results as JSON."""
+    path.write_text(json.dumps([asdict(r) for r in results], indent=2) + '\n')
@@ -0,0 +1,221 @@
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol
+from .rate_limiter import parse_retry_after
+
+BACKENDS = ("openai", "stub", "replay")
+
+@dataclass
+class Completion:
+    """A chat completion: the response text and the tokens it cost."""
+    content: str
+    total_tokens: int
+
+class RateLimitError(Exception):
+    """The endpoint asked us to slow down; ``retry_after`` is its hint in seconds."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMBackend(Protocol):
+    """
+    Something that answers chat completion requests.
+
+    ``model`` is part of the method cache key, ``max_concurrency`` bounds
+    the requests in flight and ``timeout`` bounds each request (seconds).
+    ``available`` is False when the backend cannot send requests at all,
+    e.g. for lack of an API key.
+    """
+    name: str
+    model: str
+    max_concurrency: int
+    timeout: float
+    available: bool
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> Completion:
+        ...
+
+    async def close(self):
+        ...
+
+class OpenAIBackend:
+    """OpenAI, or any endpoint speaking the OpenAI chat completions API (``base_url``)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str], model: str = "gpt-4", base_url: Optional[str] = None,
+                 max_concurrency: int = 8, timeout: float = 120.0):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> Completion:
+        # Imported on first use: the SDK is slow to import and most commands never need it
+        import openai
+        if self._client is None:
+            # Retries are ours to make, through the shared rate limiter
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                              timeout=self.timeout, max_retries=0)
+        try:
+            response = await self._client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature
+            )
+        except openai.RateLimitError as e:
+            raise RateLimitError(str(e), parse_retry_after(e)) from e
+        return Completion(content=response.choices[0].message.content or "",
+                          total_tokens=response.usage.total_tokens if response.usage else 0)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+# Template sections of single-function and batched prompts
+_PROMPT_TEMPLATE = re.compile(
+    r"(?:^Function (f\d+): \S+\n)?Template:\n(async def .*?)\n(?=\nFunction details:|Function ABI:)",
+    re.MULTILINE | re.DOTALL
+)
+_TEMPLATE_SIGNATURE = re.compile(r"^async def (\w+)\(state: State((?:, \w+: [^,)]+)*)\)")
+
+class StubBackend:
+    """
+    Deterministic offline backend that fills in the templates in the prompt.
+
+    Answers like a model that follows the instructions exactly, after an
+    optional simulated ``latency``, so the whole generation pipeline can be
+    run and benchmarked without network access.
+    """
+
+    name = "stub"
+    available = True
+
+    def __init__(self, model: str = "stub", latency: float = 0.0, max_concurrency: int = 64,
+                 timeout: float = 30.0):
+        self.model = model
+        self.latency = latency
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    @staticmethod
+    def fill_template(template: str) -> str:
+        """Replace the placeholders using the names in the template's signature."""
+        match = _TEMPLATE_SIGNATURE.match(template)
+        if not match:
+            raise ValueError("Template does not start with a method signature")
+        params = ", ".join(p.split(":")[0] for p in match.group(2).split(", ") if p)
+        return (template.replace("<function_name>", match.group(1))
+                .replace("<params>", params)
+                .replace("<str(e)>", "{str(e)}"))
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> Completion:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        sections = _PROMPT_TEMPLATE.findall(prompt)
+        if not sections:
+            raise ValueError("Prompt does not contain a method template")
+        if sections[0][0]:
+            content = json.dumps({key: self.fill_template(template) for key, template in sections})
+        else:
+            content = self.fill_template(sections[0][1])
+        text = "".join(m["content"] for m in messages) + content
+        return Completion(content=content, total_tokens=(len(text) + 3) // 4)
+
+    async def close(self):
+        pass
+
+class ReplayBackend:
+    """
+    Answers from a recording of earlier completions.
+
+    Recordings are JSON lines keyed by a hash of the model and messages.
+    Given a ``record`` backend, misses are forwarded to it and the answers
+    appended to the recording; without one, a miss is an error, which keeps
+    replayed runs reproducible.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Path, record: Optional[LLMBackend] = None, model: str = "gpt-4",
+                 max_concurrency: int = 64, timeout: float = 30.0):
+        self.path = Path(path)
+        self.record = record
+        self.model = record.model if record else model
+        self.max_concurrency = record.max_concurrency if record else max_concurrency
+        self.timeout = record.timeout if record else timeout
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    @property
+    def available(self) -> bool:
+        return bool(self._entries) or (self.record is not None and self.record.available)
+
+    def _key(self, messages: List[Dict[str, str]]) -> str:
+        return hashlib.sha256(json.dumps([self.model, messages], sort_keys=True).encode()).hexdigest()
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> Completion:
+        key = self._key(messages)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return Completion(content=entry["content"], total_tokens=entry["total_tokens"])
+        if self.record is None:
+            raise ValueError(f"No recorded completion for request {key[:12]} in {self.path}")
+        completion = await self.record.complete(messages, temperature)
+        entry = {"key": key, "content": completion.content, "total_tokens": completion.total_tokens,
+                 "recorded_at": time.time()}
+        self._entries[key] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return completion
+
+    async def close(self):
+        if self.record is not None:
+            await self.record.close()
+
+def create_backend(kind: str = "openai", api_key: Optional[str] = None, model: Optional[str] = None,
+                   base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                   timeout: Optional[float] = None, recording: Optional[Path] = None) -> LLMBackend:
+    """
+    Build a backend from plain settings (usable across processes).
+
+    ``recording`` wraps the backend in a ``ReplayBackend``: for ``replay``
+    it is required and answers come only from it; for the other kinds new
+    completions are recorded to it.
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {kind!r}, expected one of {', '.join(BACKENDS)}")
+    limits = {k: v for k, v in (("max_concurrency", max_concurrency), ("timeout", timeout)) if v is not None}
+    if kind == "replay":
+        if recording is None:
+            raise ValueError("The replay backend needs a recording")
+        return ReplayBackend(recording, model=model or "gpt-4", **limits)
+    if kind == "stub":
+        backend = StubBackend(model=model or "stub", **limits)
+    else:
+        backend = OpenAIBackend(api_key=api_key, model=model or "gpt-4", base_url=base_url, **limits)
+    if recording is not None:
+        return ReplayBackend(recording, record=backend)
+    return backend
@@ -1,32 +1,78 @@
 import json
+import hashlib
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
-import openai
 import asyncio
-from .method_cache import MethodCache, MethodValidator, LLMMeter
+from .llm_backends import LLMBackend, OpenAIBackend, RateLimitError
+from .method_cache import MethodCache, MethodValidator, LLMMeter, estimate_tokens
 from .abi_analyzer import FunctionDefinition
-import web3
+from .rate_limiter import TokenBucket
+from .template_engine import build_method_template
+
+def _canonical_abi_type(item: Dict) -> str:
+    if item['type'].startswith('tuple'):
+        inner = ",".join(_canonical_abi_type(c) for c in item.get('components', []))
+        return f"({inner}){item['type'][len('tuple'):]}"
+    return item['type']
+
+def abi_slice(function: FunctionDefinition, contract_abi: List[Dict]) -> List[Dict]:
+    """The ABI entries a function's implementation needs: just its own entry."""
+    return [
+        item for item in contract_abi
+        if item.get('type') == 'function' and item.get('name') == function.name
+        and f"{function.name}({','.join(_canonical_abi_type(p) for p in item.get('inputs', []))})" == function.signature
+    ]
+
+def _compact_json(value) -> str:
+    return json.dumps(value, separators=(',', ':'))
+
+def _strip_code_fence(content: str) -> str:
+    """The LLM might wrap its answer in markdown; keep only the code."""
+    if "```python" in content:
+        content = content.split("```python")[1].split("```")[0]
+    elif "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return content.strip()
 
 class LLMMethodGenerator:
-    def __init__(self, cache_dir: str, openai_api_key: str):
+    def __init__(self, cache_dir: str, openai_api_key: Optional[str], rate_limiter: Optional[TokenBucket] = None,
+                 model: str = "gpt-4", backend: Optional[LLMBackend] = None):
+        """
+        ``backend`` answers the completion requests; by default OpenAI's API
+        with ``openai_api_key`` and ``model``.
+        """
         self.cache = MethodCache(Path(cache_dir))
+        self.backend = backend or OpenAIBackend(api_key=openai_api_key, model=model)
+        self.model = self.backend.model
         self.validator = MethodValidator()
         self.meter = LLMMeter()
         self.logger = logging.getLogger(__name__)
-        
-        # Initialize OpenAI client
-        openai.api_key = openai_api_key
+        # Shared by all concurrent generations so rate limit hints throttle every worker
+        self.rate_limiter = rate_limiter or TokenBucket()
+        # Bounds the requests in flight to the backend's concurrency; created lazily
+        # so it binds to the loop that uses it (Python < 3.10)
+        self._request_slots: Optional[asyncio.Semaphore] = None
         
     async def generate_method(self, function: FunctionDefinition, contract_abi: Dict) -> str:
         """
         Generate a method implementation, using cache if available.
         """
         # Check cache first
-        cached = self.cache.get_cached_implementation(function)
+        fingerprint = self._codegen_fingerprint(function)
+        cached = self.cache.get_cached_implementation(function, fingerprint)
         if cached:
             return cached
             
+        return await self._generate_and_cache(function, contract_abi, fingerprint)
+        
+    async def _generate_and_cache(self, function: FunctionDefinition, contract_abi: List[Dict],
+                                  fingerprint: str) -> str:
+        if not self.backend.available:
+            raise ValueError(f"The {self.backend.name} LLM backend is not configured; cannot generate {function.name}")
+            
         # Generate implementation using LLM
         implementation = await self._generate_with_llm(function, contract_abi)
         
@@ -36,63 +82,204 @@ class LLMMethodGenerator:
             raise ValueError(f"Invalid implementation generated: {error}")
             
         # Cache the implementation
-        self.cache.cache_implementation(function, implementation)
+        self.cache.cache_implementation(function, implementation, fingerprint)
         
         return implementation
         
-    async def _generate_with_llm(self, function: FunctionDefinition, contract_abi: Dict) -> str:
+    async def generate_methods(self, functions: Sequence[FunctionDefinition], contract_abi: List[Dict],
+                               batch_size: int = 8, max_concurrency: int = 8) -> Dict[str, Union[str, Exception]]:
+        """
+        Generate several methods, asking for up to ``batch_size`` per LLM request.
+
+        Cache hits are served first; the misses are sent in batches of up to
+        ``max_concurrency`` concurrent requests. Each implementation in a batch
+        response is validated and cached on its own, and functions missing
+        from the response or failing validation are retried with a
+        single-function request. Returns an implementation or the exception
+        raised for each function signature.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        results: Dict[str, Union[str, Exception]] = {}
+        pending = []
+        for function in functions:
+            fingerprint = self._codegen_fingerprint(function)
+            cached = self.cache.get_cached_implementation(function, fingerprint)
+            if cached:
+                results[function.signature] = cached
+            else:
+                pending.append((function, fingerprint))
+                
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(batch: List[Tuple[FunctionDefinition, str]]):
+            async with semaphore:
+                implementations = {}
+                if len(batch) > 1 and self.backend.available:
+                    try:
+                        implementations = await self._generate_batch_with_llm([f for f, _ in batch], contract_abi)
+                    except Exception as e:
+                        self.logger.warning(f"Batched generation failed, falling back to single requests: {e}")
+                for function, fingerprint in batch:
+                    implementation = implementations.get(function.signature)
+                    if implementation is not None:
+                        is_valid, error = self.validator.validate_implementation(function, implementation)
+                        if is_valid:
+                            self.cache.cache_implementation(function, implementation, fingerprint)
+                            results[function.signature] = implementation
+                            continue
+                        self.logger.warning(f"Invalid batched implementation of {function.name}: {error}")
+                    try:
+                        results[function.signature] = await self._generate_and_cache(function, contract_abi, fingerprint)
+                    except Exception as e:
+                        results[function.signature] = e
+                        
+        await asyncio.gather(*(run(pending[i:i + batch_size]) for i in range(0, len(pending), batch_size)))
+        return results
+        
+    def seed_implementation(self, function: FunctionDefinition, implementation: str) -> bool:
+        """
+        Store a known-good implementation as if it had been generated.
+
+        Existing entries are kept. Returns True if the implementation was added.
+        """
+        fingerprint = self._codegen_fingerprint(function)
+        if self.cache.contains(function, fingerprint):
+            return False
+        is_valid, error = self.validator.validate_implementation(function, implementation)
+        if not is_valid:
+            raise ValueError(f"Invalid implementation for {function.name}: {error}")
+        self.cache.cache_implementation(function, implementation, fingerprint)
+        return True
+        
+    def _codegen_fingerprint(self, function: FunctionDefinition) -> str:
         """
-        Generate method implementation using OpenAI's API.
+        Hash everything besides the ABI that shapes a function's implementation.
+
+        The template is hashed per function, so a template change only
+        invalidates the cache entries for the function kinds it touches.
+        """
+        return hashlib.sha256(json.dumps({
+            'template': build_method_template(function),
+            'system_prompt': self._get_system_prompt(),
+            'model': self.model,
+            'validator': MethodValidator.RULES_VERSION
+        }, sort_keys=True).encode()).hexdigest()
+        
+    async def _generate_with_llm(self, function: FunctionDefinition, contract_abi: List[Dict]) -> str:
+        """
+        Generate method implementation using the LLM backend.
         """
         prompt = self._create_prompt(function, contract_abi)
+        content = await self._complete(
+            [
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            tokens_saved=lambda content: (
+                self._unbatched_tokens(function, contract_abi, content)
+                - estimate_tokens(self._get_system_prompt() + prompt + content)
+            )
+        )
+        return _strip_code_fence(content)
+        
+    async def _generate_batch_with_llm(self, functions: Sequence[FunctionDefinition],
+                                       contract_abi: List[Dict]) -> Dict[str, str]:
+        """
+        Generate several implementations with one request.
+
+        Returns the implementations found in the response by function signature.
+        """
+        system_prompt = self._get_system_prompt() + "\n\n" + self._get_batch_instructions()
+        prompt = self._create_batch_prompt(functions, contract_abi)
+
+        def tokens_saved(content: str) -> int:
+            # Compared with one request per function, each with the whole ABI
+            implementations = self._split_batch_response(functions, content)
+            unbatched = sum(
+                self._unbatched_tokens(function, contract_abi, implementations[function.signature])
+                for function in functions if function.signature in implementations
+            )
+            return unbatched - estimate_tokens(system_prompt + prompt + content)
+
+        content = await self._complete(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            tokens_saved=tokens_saved
+        )
+        return self._split_batch_response(functions, content)
+        
+    def _split_batch_response(self, functions: Sequence[FunctionDefinition], content: str) -> Dict[str, str]:
+        """Map a batch response (a JSON object of id -> code) back to function signatures."""
+        try:
+            answers = json.loads(_strip_code_fence(content))
+        except ValueError:
+            self.logger.warning("Batch response is not valid JSON")
+            return {}
+        if not isinstance(answers, dict):
+            return {}
+        implementations = {}
+        for index, function in enumerate(functions):
+            implementation = answers.get(f"f{index}")
+            if isinstance(implementation, str):
+                implementations[function.signature] = _strip_code_fence(implementation)
+        return implementations
         
+    async def _complete(self, messages: List[Dict], tokens_saved=None) -> str:
+        """
+        Send a chat completion request to the backend through the shared
+        rate limiter, within the backend's concurrency and timeout limits.
+
+        ``tokens_saved`` maps the response to the estimated number of tokens
+        it saved compared with unbatched, whole-ABI prompts, for the meter.
+        """
         max_retries = 3
         retry_delay = 5  # Initial delay in seconds
+        if self._request_slots is None:
+            self._request_slots = asyncio.Semaphore(self.backend.max_concurrency)
         
         for attempt in range(max_retries):
+            await self.rate_limiter.acquire()
             try:
-                response = await openai.ChatCompletion.acreate(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": self._get_system_prompt()},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1  # Low temperature for more deterministic output
-                )
+                async with self._request_slots:
+                    completion = await asyncio.wait_for(
+                        # Low temperature for more deterministic output
+                        self.backend.complete(messages, temperature=0.1),
+                        self.backend.timeout
+                    )
                 
                 # Record usage
-                self.meter.record_usage(response.usage.total_tokens)
-                
-                implementation = response.choices[0].message.content
+                self.meter.record_usage(completion.total_tokens,
+                                        tokens_saved=tokens_saved(completion.content) if tokens_saved else 0)
+                return completion.content
                 
-                # Extract just the function implementation
-                # The LLM might include markdown or other formatting
-                if "```python" in implementation:
-                    implementation = implementation.split("```python")[1].split("```")[0]
-                elif "```" in implementation:
-                    implementation = implementation.split("```")[1].split("```")[0]
-                    
-                return implementation.strip()
-                
-            except openai.error.RateLimitError as e:
+            except RateLimitError as e:
                 if attempt == max_retries - 1:
                     raise  # Re-raise on last attempt
                     
-                # Extract wait time from error message if available
-                import re
-                wait_time = retry_delay
-                match = re.search(r"Please try again in (\d+\.\d+)s", str(e))
-                if match:
-                    wait_time = float(match.group(1))
+                # Use the wait time suggested by the endpoint if available
+                wait_time = e.retry_after or retry_delay
                     
                 self.logger.warning(f"Rate limit hit, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                await asyncio.sleep(wait_time)
+                # Pause the shared limiter; the next acquire() waits it out
+                self.rate_limiter.pause(wait_time)
                 retry_delay *= 2  # Exponential backoff
                 
+            except asyncio.TimeoutError:
+                self.logger.error(f"LLM request timed out after {self.backend.timeout}s")
+                raise
+                
             except Exception as e:
                 self.logger.error(f"LLM generation failed: {str(e)}")
                 raise
             
+    async def close(self):
+        """Release the backend's connections."""
+        await self.backend.close()
+        self._request_slots = None
+            
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the LLM."""
         return """You are a smart contract developer specializing in Web3.py implementations.
@@ -114,40 +301,12 @@ IMPORTANT:
 
 Your response should be a complete, valid Python function that can be used directly."""
         
-    def _create_prompt(self, function: FunctionDefinition, contract_abi: Dict) -> str:
+    def _create_prompt(self, function: FunctionDefinition, contract_abi: List[Dict],
+                       abi_text: Optional[str] = None) -> str:
         """Create the prompt for the LLM."""
-        # Create parameter string
-        params = ["state: State"]
-        for param in function.inputs:
-            params.append(f"{param.name}: {param.type}")
-        param_str = ", ".join(params)
-        
-        # Create return type annotation
-        return_type = "Dict"  # All functions return Dict
-        
-        # Create template based on function type
-        if function.state_mutability.value == "view":
-            template = f"""async def {function.name}({param_str}) -> {return_type}:
-    try:
-        contract = web3.eth.contract(address=state.contract_address, abi=state.abi)
-        result = await contract.functions.<function_name>(<params>).call()
-        return {{"result": result}}
-    except Exception as e:
-        raise ValueError(f"Failed to execute {function.name}: <str(e)>")"""
-        else:
-            template = f"""async def {function.name}({param_str}) -> {return_type}:
-    try:
-        contract = web3.eth.contract(address=state.contract_address, abi=state.abi)
-        tx = await contract.functions.<function_name>(<params>).build_transaction({{
-            "from": state.account,
-            "gas": await contract.functions.<function_name>(<params>).estimate_gas()
-        }})
-        return {{
-            "type": "transaction_to_sign",
-            "transaction": tx
-        }}
-    except Exception as e:
-        raise ValueError(f"Failed to build {function.name} transaction: <str(e)>")"""
+        template = build_method_template(function)
+        if abi_text is None:
+            abi_text = _compact_json(abi_slice(function, contract_abi))
         
         # Create the prompt
         return f"""Fill in the following template for the {function.name} function:
@@ -161,6 +320,25 @@ Function details:
 - Inputs: {[f"{p.name}: {p.type}" for p in function.inputs]}
 - Outputs: {[f"{p.name}: {p.type}" for p in function.outputs]}
 
-Contract ABI: {json.dumps(contract_abi)}
+Function ABI: {abi_text}
+
+Replace the placeholders in the template with the appropriate values. Your response should be a complete, valid Python function."""
+
+    def _get_batch_instructions(self) -> str:
+        """Response format for batched requests, appended to the system prompt."""
+        return """You may be asked for several functions at once. In that case, respond with a single JSON object that maps each function id (f0, f1, ...) to its filled-in template as a string, for example {"f0": "async def ...", "f1": "async def ..."}. Do not include any other text."""
+
+    def _create_batch_prompt(self, functions: Sequence[FunctionDefinition], contract_abi: List[Dict]) -> str:
+        """Create one prompt asking for several functions, each with only its own ABI entry."""
+        sections = []
+        for index, function in enumerate(functions):
+            sections.append(f"""Function f{index}: {function.signature}
+Template:
+{build_method_template(function)}
+Function ABI: {_compact_json(abi_slice(function, contract_abi))}""")
+        return "Fill in the template for each of the following functions.\n\n" + "\n\n".join(sections)
 
-Replace the placeholders in the template with the appropriate values. Your response should be a complete, valid Python function.""" 
\ No newline at end of file
+    def _unbatched_tokens(self, function: FunctionDefinition, contract_abi: List[Dict], implementation: str) -> int:
+        """Estimated tokens of a single-function request embedding the whole ABI."""
+        prompt = self._create_prompt(function, contract_abi, abi_text=json.dumps(contract_abi))
+        return estimate_tokens(self._get_system_prompt() + prompt + implementation)
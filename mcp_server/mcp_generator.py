@@ -2,43 +2,280 @@ from typing import Dict, List
 from pathlib import Path
 import os
 import json
+import asyncio
+import hashlib
+import importlib.util
 from .abi_analyzer import FunctionDefinition, FunctionParameter, FunctionType
+from .llm_backends import LLMBackend
 from .llm_generator import LLMMethodGenerator
+from .method_cache import MethodValidator, validate_implementations
+from .method_library import prewarm_library
+from .rate_limiter import TokenBucket
+from .solidity_types import parse_type, python_type, validator_source
+from .template_engine import TemplateMethodGenerator
 import logging
-import sys
-import importlib.util
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
+# Prepended to every generated method file so it can be executed on its own.
+# Annotations are not evaluated, since parameters are annotated with Solidity types.
+METHOD_MODULE_HEADER = '''from __future__ import annotations
+from typing import Dict
+from state import State
+from state.codecs import CODECS
+
+
+'''
+
+# Single-module server written in bundle mode
+BUNDLE_NAME = 'bundle.py'
+
+# Records input and output hashes of the last generation for incremental rebuilds
+MANIFEST_NAME = 'mcp_manifest.json'
+MANIFEST_VERSION = 1
+
+class MethodGenerationError(RuntimeError):
+    """Raised when one or more method implementations could not be generated."""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        details = "; ".join(f"{name}: {error}" for name, error in failures.items())
+        super().__init__(f"Failed to generate {len(failures)} method(s): {details}")
+
 class MCPGenerator:
-    def __init__(self, analysis: Dict, output_dir: Path, contract_name: str, openai_api_key: str):
-        """Initialize the MCP generator with ABI analysis results."""
+    # Code generation backends: "llm" sends every function to the LLM,
+    # "template" renders standard functions offline and only falls back to
+    # the LLM for functions the template engine can't express.
+    BACKENDS = ("llm", "template")
+
+    # Runtime profiles of the generated server: "development" logs at DEBUG
+    # and runs one worker; "production" logs at WARNING, keeps debug logging
+    # off the request path and runs a worker per available core.
+    PROFILES = ("development", "production")
+
+    # Attributes of the generated State that contract variables must not shadow
+    RESERVED_STATE_NAMES = {"contract_address", "abi", "account", "node_url", "web3", "contract",
+                            "connect", "http_session", "close"}
+
+    def __init__(self, analysis: Dict, output_dir: Path, contract_name: str, openai_api_key: Optional[str],
+                 max_workers: int = 8, rate_limiter: Optional[TokenBucket] = None, backend: str = "llm",
+                 immutable_methods: Optional[List[str]] = None, cache_dir: Optional[Path] = None,
+                 library_dir: Optional[Path] = None, batch_size: int = 1,
+                 llm_backend: Optional[LLMBackend] = None, validation_processes: Optional[int] = None,
+                 bundle: bool = False, profile: str = "development"):
+        """
+        Initialize the MCP generator with ABI analysis results.
+
+        ``immutable_methods`` names view methods (such as ``name`` or
+        ``decimals``) whose results the generated server may cache for the
+        life of the process; an overloaded name covers every view overload. ``cache_dir`` overrides the method cache
+        location (``output_dir / 'cache'`` by default) so several
+        generations can share one cache. ``library_dir`` instead points the
+        method cache at a shared method library, pre-warmed with the standard
+        ERC-20/721/1155/4626 functions. With a ``batch_size`` above 1, cache
+        misses are sent to the LLM that many functions per request.
+        ``llm_backend`` replaces the default OpenAI backend (see
+        ``llm_backends``). ``validation_processes`` sizes the pool that
+        validates large contracts (1 validates in this process). With
+        ``bundle``, a single precompiled ``bundle.py`` containing every method
+        is written alongside ``server.py`` for faster cold starts.
+        ``profile`` selects the runtime profile of the generated server (see
+        ``PROFILES``).
+        ``rate_limiter`` may be a
+        ``TokenBucket`` or, across processes, a ``SharedTokenBucket``.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(self.BACKENDS)}")
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}, expected one of {', '.join(self.PROFILES)}")
+        if cache_dir is not None and library_dir is not None:
+            raise ValueError("cache_dir and library_dir are mutually exclusive")
         self.analysis = analysis
         self.output_dir = output_dir
         self.contract_name = contract_name
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.validation_processes = validation_processes
+        self.bundle = bundle
+        self.profile = profile
+        self.logger = logging.getLogger(__name__)
+        self.immutable_methods = self.resolve_immutable_methods(analysis['functions'], immutable_methods or [])
         self.llm_generator = LLMMethodGenerator(
-            cache_dir=str(output_dir / 'cache'),
-            openai_api_key=openai_api_key
+            cache_dir=str(cache_dir or library_dir or output_dir / 'cache'),
+            openai_api_key=openai_api_key,
+            rate_limiter=rate_limiter or TokenBucket(capacity=max_workers),
+            backend=llm_backend
         )
+        if library_dir is not None:
+            prewarm_library(self.llm_generator)
+        self.template_generator = None
+        if backend == "template":
+            self.template_generator = TemplateMethodGenerator(analysis['functions'])
+        self._previous_manifest = self._empty_manifest()
+        self._manifest = self._empty_manifest()
+        # Implementations (or errors) from batched LLM requests, by signature
+        self._batched_implementations: Dict[str, object] = {}
+        # Counters for the last generate() run
+        self.build_stats = {'written': 0, 'unchanged': 0, 'removed': 0,
+                            'methods_generated': 0, 'methods_skipped': 0, 'methods_from_template': 0}
         
     async def generate(self):
-        """Generate the MCP server implementation."""
+        """
+        Generate the MCP server implementation.
+
+        Generation is incremental: a manifest of input and output hashes from
+        the previous run lets unchanged methods be skipped, and files whose
+        content would not change are never rewritten.
+        """
+        self._previous_manifest = self._load_manifest()
+        self._manifest = self._empty_manifest()
+        self.build_stats = dict.fromkeys(self.build_stats, 0)
+        
         # Create output directory structure
         self._create_directory_structure()
         
         # Generate state variables first since server.py depends on it
         self._generate_state_variables()
         
+        # Copy runtime support modules used by server.py
+        self._generate_runtime()
+        
         # Generate main server file
         self._generate_server_file()
         
-        # Generate method implementations
-        await self._generate_methods()
-        
         # Generate documentation
         self._generate_documentation()
         
+        # Generate method implementations
+        try:
+            await self._generate_methods()
+        finally:
+            await self.llm_generator.close()
+            self._keep_failed_outputs()
+            if self.bundle:
+                self._generate_bundle()
+            self._remove_stale_outputs()
+            self._write_manifest()
+            
+    def _load_manifest(self) -> Dict:
+        """Load the manifest of the previous generation, if compatible."""
+        try:
+            manifest = json.loads((self.output_dir / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return self._empty_manifest()
+        if manifest.get('version') != MANIFEST_VERSION:
+            return self._empty_manifest()
+        return manifest
+        
+    @staticmethod
+    def _empty_manifest() -> Dict:
+        return {'version': MANIFEST_VERSION, 'files': {}, 'functions': {}}
+        
+    def _write_manifest(self):
+        content = json.dumps(self._manifest, indent=2, sort_keys=True) + '\n'
+        path = self.output_dir / MANIFEST_NAME
+        if not path.exists() or path.read_text() != content:
+            path.write_text(content)
+            
+    @staticmethod
+    def resolve_immutable_methods(functions: List[FunctionDefinition], names: List[str]) -> List[str]:
+        """
+        Resolve method names, ids or signatures to the ids of the view methods they name.
+
+        Raises ``ValueError`` listing the names that match no view function.
+        """
+        views = [f for f in functions if f.state_mutability.value in ("view", "pure")]
+        immutable, unknown = set(), set()
+        for name in names:
+            ids = {f.method_name for f in views if name in (f.name, f.method_name, f.signature)}
+            immutable |= ids
+            if not ids:
+                unknown.add(name)
+        if unknown:
+            raise ValueError(f"Immutable methods must be view functions: {', '.join(sorted(unknown))}")
+        return sorted(immutable)
+        
+    def _write_file(self, relative_path: str, content) -> bool:
+        """Write a generated file unless it already has exactly this content; return whether it was written."""
+        data = content.encode() if isinstance(content, str) else content
+        path = self.output_dir / relative_path
+        self._manifest['files'][relative_path] = hashlib.sha256(data).hexdigest()
+        try:
+            if path.read_bytes() == data:
+                self.build_stats['unchanged'] += 1
+                return False
+        except FileNotFoundError:
+            pass
+        path.write_bytes(data)
+        self.build_stats['written'] += 1
+        return True
+        
+    def _precompile(self, relative_path: str, written: bool):
+        """Byte-compile a generated module, unless it is unchanged and its bytecode already exists."""
+        path = self.output_dir / relative_path
+        if written or not Path(importlib.util.cache_from_source(str(path))).exists():
+            MethodValidator.precompile(path)
+        
+    def _keep_failed_outputs(self):
+        """Keep the previous output of functions that failed to regenerate."""
+        previous = self._previous_manifest
+        for function in self.analysis['functions']:
+            record = previous['functions'].get(function.signature)
+            if function.signature not in self._manifest['functions'] and record:
+                self._manifest['functions'][function.signature] = record
+                if record['output'] in previous['files']:
+                    self._manifest['files'][record['output']] = previous['files'][record['output']]
+                    
+    def _remove_stale_outputs(self):
+        """Delete outputs of the previous run that this run no longer produces."""
+        previous = self._previous_manifest
+        for relative_path in set(previous['files']) - set(self._manifest['files']):
+            path = self.output_dir / relative_path
+            if path.exists():
+                path.unlink()
+                self.build_stats['removed'] += 1
+            if path.suffix == '.py':
+                # Its precompiled bytecode, for any interpreter version
+                for bytecode in (path.parent / '__pycache__').glob(f'{path.stem}.*.pyc'):
+                    bytecode.unlink()
+                
+    def _method_output(self, function: FunctionDefinition) -> str:
+        return f'methods/{function.method_name}.py'
+        
+    def _method_input_hash(self, function: FunctionDefinition) -> str:
+        """Hash every input that determines a method file's content."""
+        if self.template_generator and self.template_generator.supports(function):
+            source = 'template'
+        else:
+            source = 'llm'
+        cache_key = self.llm_generator.cache._get_cache_key(
+            function, self.llm_generator._codegen_fingerprint(function)
+        )
+        return hashlib.sha256(json.dumps({
+            'source': source,
+            'cache_key': cache_key,
+            'header': METHOD_MODULE_HEADER
+        }, sort_keys=True).encode()).hexdigest()
+        
+    def _is_method_up_to_date(self, function: FunctionDefinition) -> bool:
+        """Return whether the previous run's output for a function can be reused as is."""
+        record = self._previous_manifest['functions'].get(function.signature)
+        output = self._method_output(function)
+        if not record or record['output'] != output or record['input'] != self._method_input_hash(function):
+            return False
+        expected_hash = self._previous_manifest['files'].get(output)
+        try:
+            if hashlib.sha256((self.output_dir / output).read_bytes()).hexdigest() != expected_hash:
+                return False
+        except FileNotFoundError:
+            return False
+        self._manifest['functions'][function.signature] = record
+        self._manifest['files'][output] = expected_hash
+        return True
+        
     def _create_directory_structure(self):
         """Create the necessary directory structure for the MCP server."""
         directories = [
@@ -47,7 +284,8 @@ class MCPGenerator:
             self.output_dir / 'state',
             self.output_dir / 'tests',
             self.output_dir / 'docs',
-            self.output_dir / 'cache'
+            self.output_dir / 'cache',
+            self.output_dir / 'runtime'
         ]
         
         for directory in directories:
@@ -64,33 +302,49 @@ class MCPGenerator:
         if not root_init.exists():
             root_init.touch()
             
-    def _generate_server_file(self):
-        """Generate the main MCP server file."""
-        template = '''from fastapi import FastAPI, HTTPException
+    def _generate_runtime(self):
+        """Copy the runtime support modules into the generated server."""
+        runtime_dir = Path(__file__).parent / 'runtime'
+        for module in sorted(runtime_dir.glob('*.py')):
+            self._write_file(f'runtime/{module.name}', module.read_bytes())
+            
+    def _server_sections(self) -> Dict[str, str]:
+        """
+        Sections of the generated server module.
+
+        ``prelude`` imports State and the runtime, ``core`` creates the app,
+        state and read path, ``dispatch`` loads the method files and
+        ``endpoints`` defines the routes and ``main`` runs uvicorn. Bundles
+        reuse every section but ``dispatch``.
+        """
+        sections = {
+            'prelude': '''from fastapi import FastAPI, HTTPException, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import json
 import logging
+import os
 import sys
 import importlib.util
 from pathlib import Path
+from types import MappingProxyType
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; MCP_LOG_LEVEL overrides the profile's default level
+LOG_LEVEL = os.getenv("MCP_LOG_LEVEL", "{log_level}").upper()
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
+logger.setLevel(LOG_LEVEL)
+
+# Decided once at startup, so per-request debug logging costs nothing when disabled
+LOG_REQUESTS = logger.isEnabledFor(logging.DEBUG)
 
 # Add the current directory to Python path
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 logger.debug("Added %s to Python path", current_dir)
 
-try:
-    from methods import *
-    logger.debug("Successfully imported methods")
-except ImportError as e:
-    logger.error("Failed to import methods: %s", e)
-    raise
-
 try:
     from state import State
     logger.debug("Successfully imported State")
@@ -98,7 +352,20 @@ except ImportError as e:
     logger.error("Failed to import State: %s", e)
     raise
 
-app = FastAPI(
+from runtime.read_cache import BlockTracker, ReadCache, request_key
+from runtime.single_flight import SingleFlight
+from runtime.batch import BatchCallError, encode_view_call, eth_call_raw, execute_json_rpc_batch, execute_multicall
+from runtime.encoding import ResultEncoder
+from runtime.indexer import LogIndexer, LogStore, fetch_logs
+from runtime.subscriptions import EventHub, TooManySubscribers
+from runtime.validation import ParamError
+from runtime.codec import pinned_block
+from state.codecs import CODECS
+from state.events import EVENTS
+from state.validators import VALIDATORS
+
+''',
+            'core': '''app = FastAPI(
     title="{contract_name} MCP Server",
     description="Model Context Protocol server for {contract_name} smart contract",
     version="1.0.0"
@@ -115,6 +382,59 @@ class MCPResponse(BaseModel):
     result: Any
     context: Optional[Dict[str, Any]] = None
 
+class MCPError(BaseModel):
+    """Error for a single item of a batch."""
+    status_code: int
+    detail: str
+
+class MCPBatchItem(BaseModel):
+    """Result or error for a single item of a batch."""
+    result: Any = None
+    error: Optional[MCPError] = None
+    context: Optional[Dict[str, Any]] = None
+
+class MCPBatchResponse(BaseModel):
+    """Batch results, in request order."""
+    results: List[MCPBatchItem]
+
+class MCPRawCall(BaseModel):
+    """ABI-encoded calldata for a view function."""
+    data: str
+    context: Optional[Dict[str, Any]] = None
+
+class MCPRawResponse(BaseModel):
+    """Raw ABI-encoded return data."""
+    result: str
+    method: str
+    context: Optional[Dict[str, Any]] = None
+
+class MCPEvent(BaseModel):
+    """A decoded event log."""
+    block_number: int
+    log_index: int
+    transaction_hash: str
+    args: Dict[str, Any]
+
+class MCPEventsResponse(BaseModel):
+    """A page of an event's indexed history."""
+    event: str
+    events: List[MCPEvent]
+    # Pass as ``after`` to fetch the next page; None on the last page
+    next: Optional[str] = None
+    # Last block whose logs are all indexed
+    indexed_to: Optional[int] = None
+
+# Responses are encoded straight to JSON bytes; the models above only document the API.
+# MCP_INTEGER_ENCODING=string or hex keeps uint256 values exact for JavaScript clients.
+result_encoder = ResultEncoder(
+    integers=os.getenv("MCP_INTEGER_ENCODING", "number"),
+    bytes_encoding=os.getenv("MCP_BYTES_ENCODING", "hex")
+)
+
+def json_response(payload: Any) -> Response:
+    """Return a pre-encoded JSON response, bypassing response model validation."""
+    return Response(content=result_encoder.encode(payload), media_type="application/json")
+
 # Initialize contract state
 try:
     state = State()
@@ -123,26 +443,299 @@ except Exception as e:
     logger.error("Failed to initialize State: %s", e)
     raise
 
-def load_method(method_name: str):
-    """Dynamically load a method implementation."""
-    logger.debug("Loading method %s", method_name)
-    method_path = Path(__file__).parent / 'methods' / f'{{method_name}}.py'
+# Read-only methods whose results may be cached
+VIEW_METHODS = frozenset({view_methods})
+# View methods whose results never change and are cached for the life of the process
+IMMUTABLE_METHODS = frozenset({immutable_methods})
 
-    if not method_path.exists():
-        logger.error("Method file not found: %s", method_path)
-        raise HTTPException(status_code=404, detail=f"Method {{method_name}} not found")
+# Method id -> canonical signature. Methods are named after their function,
+# plus the selector when the function is overloaded (e.g. safeTransferFrom_42842e0e).
+METHOD_SIGNATURES = MappingProxyType({method_signatures})
+# Method id -> parameter names, used to pick an overload by the request's params
+METHOD_PARAMS = MappingProxyType({method_params})
+# 4-byte selector -> method id
+SELECTORS = MappingProxyType({selectors})
+# Overloaded function name -> method ids of its overloads
+OVERLOADS = MappingProxyType({overloads})
+_SIGNATURE_INDEX = {{signature: method_id for method_id, signature in METHOD_SIGNATURES.items()}}
+# Method id -> precompiled codec, used to encode batched view calls
+METHOD_CODECS = MappingProxyType({{method_id: CODECS[signature] for method_id, signature in METHOD_SIGNATURES.items()}})
+# Method id -> generated parameter validator
+METHOD_VALIDATORS = MappingProxyType({{
+    method_id: VALIDATORS[signature] for method_id, signature in METHOD_SIGNATURES.items() if signature in VALIDATORS
+}})
 
+def validate_params(method_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check and coerce a request's params against the method's Solidity types.
+
+    Runs before any node call; bad input fails with 422. Addresses come back
+    checksummed, integers parsed from decimal or hex strings and keyword
+    parameters renamed (``from`` -> ``from_``).
+    """
+    validator = METHOD_VALIDATORS.get(method_id)
+    if validator is None:
+        return params
     try:
-        spec = importlib.util.spec_from_file_location(method_name, str(method_path))
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[method_name] = module
-        spec.loader.exec_module(module)
-        method = getattr(module, method_name)
-        logger.debug("Successfully loaded method %s", method_name)
+        return validator(params)
+    except ParamError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _matches_params(method_id: str, params: Dict[str, Any]) -> bool:
+    names = METHOD_PARAMS[method_id]
+    return len(params) == len(names) and all(key in names or key + "_" in names for key in params)
+
+def resolve_method(method: str, params: Dict[str, Any]) -> str:
+    """
+    Resolve a requested method to a method id.
+
+    ``method`` may be a method id, a canonical signature, a 4-byte selector
+    or the name of an overloaded function, in which case the overload is
+    picked by the request's parameter names (or, failing that, their count).
+    """
+    if method in METHOD_SIGNATURES:
+        return method
+    method_id = SELECTORS.get(method.lower()) or _SIGNATURE_INDEX.get(method.replace(" ", ""))
+    if method_id is not None:
+        return method_id
+    overloads = OVERLOADS.get(method)
+    if overloads is None:
         return method
+    matching = [m for m in overloads if _matches_params(m, params)]
+    if not matching:
+        matching = [m for m in overloads if len(METHOD_PARAMS[m]) == len(params)]
+    if len(matching) == 1:
+        return matching[0]
+    signatures = ", ".join(METHOD_SIGNATURES[m] for m in (matching or overloads))
+    raise HTTPException(
+        status_code=400,
+        detail=f"Ambiguous overloaded method {{method}}; call one of {{signatures}} by signature or selector"
+    )
+
+# MCP_CACHE_SIZE=0 disables the read cache
+read_cache = ReadCache(
+    max_size=int(os.getenv("MCP_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MCP_CACHE_TTL", "12"))
+)
+
+async def _fetch_block_number() -> int:
+    return await state.web3.eth.block_number
+
+block_tracker = BlockTracker(
+    _fetch_block_number,
+    poll_interval=float(os.getenv("MCP_BLOCK_POLL_INTERVAL", "1.0"))
+)
+
+# Concurrent identical view requests share one upstream call
+single_flight = SingleFlight()
+
+# Event topic -> log decoder
+EVENT_TOPICS = MappingProxyType({{decoder.topic: decoder for decoder in EVENTS.values()}})
+
+def resolve_event(event: str):
+    """Resolve an event name, canonical signature or topic to its decoder."""
+    decoder = EVENTS.get(event.replace(" ", "")) or EVENT_TOPICS.get(event.lower())
+    if decoder is not None:
+        return decoder
+    matching = [decoder for decoder in EVENTS.values() if decoder.name == event]
+    if not matching:
+        raise HTTPException(status_code=404, detail=f"Event {{event}} not found")
+    if len(matching) > 1:
+        signatures = ", ".join(decoder.signature for decoder in matching)
+        raise HTTPException(
+            status_code=400, detail=f"Ambiguous overloaded event {{event}}; query one of {{signatures}} by signature"
+        )
+    return matching[0]
+
+# MCP_INDEXER=1 backfills the contract's event logs into a local SQLite store
+# (MCP_INDEXER_DB) and keeps following the chain, for the /events endpoints
+INDEXER_ENABLED = os.getenv("MCP_INDEXER", "").lower() in ("1", "true", "yes")
+event_store = None
+indexer = None
+
+async def _get_logs(from_block: int, to_block: int):
+    return await fetch_logs(
+        await state.http_session(), state.node_url, state.contract.address, list(EVENT_TOPICS), from_block, to_block
+    )
+
+if INDEXER_ENABLED and EVENT_TOPICS:
+    event_store = LogStore(
+        Path(os.getenv("MCP_INDEXER_DB", str(current_dir / "data" / "events.sqlite3"))),
+        state.contract.address,
+        EVENT_TOPICS
+    )
+    indexer = LogIndexer(
+        event_store,
+        EVENT_TOPICS,
+        _get_logs,
+        block_tracker.current,
+        start_block=int(os.getenv("MCP_INDEXER_START_BLOCK", "0")),
+        confirmations=int(os.getenv("MCP_INDEXER_CONFIRMATIONS", "12")),
+        chunk_size=int(os.getenv("MCP_INDEXER_CHUNK_SIZE", "2000")),
+        max_chunk_size=int(os.getenv("MCP_INDEXER_MAX_CHUNK_SIZE", "100000"))
+    )
+_indexer_task = None
+
+@app.on_event("startup")
+async def start_indexer():
+    """Start backfilling and following event logs in the background."""
+    global _indexer_task
+    if indexer is not None:
+        _indexer_task = asyncio.create_task(indexer.run(float(os.getenv("MCP_INDEXER_POLL_INTERVAL", "2"))))
+
+@app.on_event("shutdown")
+async def stop_indexer():
+    """Stop the indexer; its checkpoint lets the next start resume where it stopped."""
+    if _indexer_task is not None:
+        _indexer_task.cancel()
+        try:
+            await _indexer_task
+        except asyncio.CancelledError:
+            pass
+
+def _encode_event(decoder, log: Dict[str, Any], args: Dict[str, Any]) -> bytes:
+    """Encode a new log once, for every subscriber it is pushed to."""
+    return result_encoder.encode({{
+        "event": decoder.signature,
+        "block_number": int(log["blockNumber"], 16),
+        "log_index": int(log["logIndex"], 16),
+        "transaction_hash": log["transactionHash"],
+        "args": result_encoder.convert(args)
+    }})
+
+# Live events for the /events/{{event}}/stream and /ws subscriptions. One poller
+# fetches new logs for all subscribers, and only while there are any.
+event_hub = EventHub(
+    EVENT_TOPICS,
+    _get_logs,
+    block_tracker.current,
+    _encode_event,
+    poll_interval=float(os.getenv("MCP_SUBSCRIBE_POLL_INTERVAL", "1.0")),
+    confirmations=int(os.getenv("MCP_SUBSCRIBE_CONFIRMATIONS", "0")),
+    buffer_size=int(os.getenv("MCP_SUBSCRIBE_BUFFER_SIZE", "1000")),
+    max_subscribers=int(os.getenv("MCP_SUBSCRIBE_MAX_SUBSCRIBERS", "1000"))
+)
+
+@app.on_event("shutdown")
+async def stop_event_hub():
+    await event_hub.close()
+
+async def call_view_method(method, method_name: str, params: Dict[str, Any]):
+    """Execute a view method through the read cache and request coalescing."""
+    immutable = method_name in IMMUTABLE_METHODS
+    block_number = None if immutable else await block_tracker.current()
+    key = request_key(method_name, params, block_number)
+
+    async def read():
+        # Codec calls read the block the result is cached under, not whatever is latest by then
+        token = pinned_block.set("latest" if block_number is None else block_number)
+        try:
+            return await method(state, **params)
+        finally:
+            pinned_block.reset(token)
+
+    return await read_cache.get_or_call(key, lambda: single_flight.do(key, read), immutable=immutable)
+
+@app.on_event("startup")
+async def connect_state():
+    """Open the shared node connection pool."""
+    await state.connect()
+
+@app.on_event("shutdown")
+async def close_state():
+    """Close the shared node connection pool."""
+    await state.close()
+
+''',
+            'dispatch': '''METHODS_DIR = current_dir / 'methods'
+
+# Set MCP_RELOAD_METHODS=1 during development to reload a method whenever its
+# file changes. In the default mode every method is loaded exactly once.
+RELOAD_METHODS = os.getenv("MCP_RELOAD_METHODS", "").lower() in ("1", "true", "yes")
+
+def _load_method_file(method_name: str, method_path: Path):
+    """Execute a method file and return its coroutine function."""
+    spec = importlib.util.spec_from_file_location(f"methods.{{method_name}}", str(method_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Overloads live in files named after their method id but define the function's name
+    return getattr(module, METHOD_SIGNATURES.get(method_name, method_name).split("(")[0])
+
+def build_dispatch_table():
+    """Load every method once and return immutable id -> coroutine and id -> load error maps."""
+    methods = {{}}
+    errors = {{}}
+    for method_path in sorted(METHODS_DIR.glob('*.py')):
+        method_name = method_path.stem
+        if method_name == '__init__':
+            continue
+        try:
+            methods[method_name] = _load_method_file(method_name, method_path)
+        except Exception as e:
+            logger.error("Failed to load method %s: %s", method_name, e)
+            errors[method_name] = str(e)
+    logger.info("Loaded %d methods", len(methods))
+    return MappingProxyType(methods), MappingProxyType(errors)
+
+METHODS, METHOD_LOAD_ERRORS = build_dispatch_table()
+
+# Reload mode only: method name -> (file mtime, coroutine)
+_reloadable_methods = {{}}
+
+def _reload_method(method_name: str):
+    """Return a method, re-executing its file only if the mtime changed."""
+    if not method_name.isidentifier():
+        raise HTTPException(status_code=404, detail=f"Method {{method_name}} not found")
+    method_path = METHODS_DIR / f'{{method_name}}.py'
+    try:
+        mtime = method_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _reloadable_methods.pop(method_name, None)
+        raise HTTPException(status_code=404, detail=f"Method {{method_name}} not found")
+
+    cached = _reloadable_methods.get(method_name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        method = _load_method_file(method_name, method_path)
     except Exception as e:
         logger.error("Failed to load method %s: %s", method_name, e)
         raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Reloaded method %s", method_name)
+    _reloadable_methods[method_name] = (mtime, method)
+    return method
+
+def get_method(method_name: str):
+    """Look up a method in the dispatch table."""
+    if RELOAD_METHODS:
+        return _reload_method(method_name)
+    method = METHODS.get(method_name)
+    if method is None:
+        if method_name in METHOD_LOAD_ERRORS:
+            raise HTTPException(status_code=500, detail=METHOD_LOAD_ERRORS[method_name])
+        raise HTTPException(status_code=404, detail=f"Method {{method_name}} not found")
+    return method
+
+''',
+            'endpoints': '''async def execute_request(request: MCPRequest):
+    """Execute a single MCP request, raising HTTPException on failure."""
+    try:
+        # Look up and execute the method
+        method_id = resolve_method(request.method, request.params)
+        method = get_method(method_id)
+        params = validate_params(method_id, request.params)
+        if method_id in VIEW_METHODS:
+            result = await call_view_method(method, method_id, params)
+        else:
+            result = await method(state, **params)
+        if LOG_REQUESTS:
+            logger.debug("Method %s executed successfully", method_id)
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error processing MCP request: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/mcp", response_model=MCPResponse)
 async def process_mcp_request(request: MCPRequest):
@@ -152,58 +745,641 @@ async def process_mcp_request(request: MCPRequest):
     This endpoint accepts requests in the Model Context Protocol format and
     routes them to the appropriate contract method implementation.
     """
-    logger.debug("Processing MCP request: %s", request.method)
+    if LOG_REQUESTS:
+        logger.debug("Processing MCP request: %s", request.method)
+    result = await execute_request(request)
+    return json_response({{"result": result_encoder.convert(result), "context": request.context}})
+
+# When set, batched view calls are aggregated through Multicall3 instead of a JSON-RPC batch
+MULTICALL_ADDRESS = os.getenv("MULTICALL_ADDRESS")
+# Maximum number of calls sent to the node in one JSON-RPC batch or aggregate3 call
+BATCH_MAX_CALLS = int(os.getenv("MCP_BATCH_MAX_CALLS", "500"))
+
+async def _execute_view_batch(calls):
+    """Execute encoded view calls in as few node round trips as possible."""
+    block_number = await block_tracker.current()
+    if MULTICALL_ADDRESS:
+        return await execute_multicall(
+            state.web3, MULTICALL_ADDRESS, state.contract.address, calls, block_number, BATCH_MAX_CALLS
+        )
+    return await execute_json_rpc_batch(
+        await state.http_session(), state.node_url, state.contract.address, calls, block_number, BATCH_MAX_CALLS
+    )
+
+@app.post("/mcp/batch", response_model=MCPBatchResponse)
+async def process_mcp_batch(requests: List[MCPRequest]):
+    """
+    Process a list of MCP requests for the {contract_name} contract.
+
+    View calls are aggregated into a single JSON-RPC batch (or a Multicall3
+    aggregate3 call when MULTICALL_ADDRESS is set) pinned to one block.
+    Other methods run concurrently. Results are returned in request order,
+    and a failing item does not fail the rest of the batch.
+    """
+    if LOG_REQUESTS:
+        logger.debug("Processing MCP batch of %d requests", len(requests))
+    # Plain dicts shaped like MCPBatchItem
+    items: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+
+    def fail(index: int, status_code: int, detail: str):
+        items[index] = {{
+            "result": None,
+            "error": {{"status_code": status_code, "detail": detail}},
+            "context": requests[index].context
+        }}
+
+    view_indexes, view_calls, other_indexes = [], [], []
+    for index, request in enumerate(requests):
+        try:
+            method_id = resolve_method(request.method, request.params)
+            if method_id not in VIEW_METHODS:
+                other_indexes.append(index)
+                continue
+            params = validate_params(method_id, request.params)
+        except HTTPException as e:
+            fail(index, e.status_code, str(e.detail))
+            continue
+        try:
+            view_calls.append(
+                encode_view_call(state.contract, method_id, params, codec=METHOD_CODECS.get(method_id))
+            )
+            view_indexes.append(index)
+        except BatchCallError as e:
+            fail(index, e.status_code, e.detail)
+
+    async def run_views():
+        if not view_calls:
+            return
+        try:
+            results = await _execute_view_batch(view_calls)
+        except BatchCallError as e:
+            results = [e] * len(view_calls)
+        except Exception as e:
+            logger.error("Batch call failed: %s", e)
+            results = [BatchCallError(502, str(e))] * len(view_calls)
+        for index, result in zip(view_indexes, results):
+            if isinstance(result, BatchCallError):
+                fail(index, result.status_code, result.detail)
+            else:
+                items[index] = {{
+                    "result": {{"result": result_encoder.convert(result)}},
+                    "error": None,
+                    "context": requests[index].context
+                }}
+
+    async def run_single(index: int):
+        request = requests[index]
+        try:
+            result = await execute_request(request)
+            items[index] = {{"result": result_encoder.convert(result), "error": None, "context": request.context}}
+        except HTTPException as e:
+            fail(index, e.status_code, str(e.detail))
+
+    await asyncio.gather(run_views(), *(run_single(index) for index in other_indexes))
+    return json_response({{"results": items}})
+
+def _is_hex_calldata(data: str) -> bool:
+    if not data.startswith("0x") or len(data) < 10 or len(data) % 2:
+        return False
     try:
-        # Load and execute the method
-        method = load_method(request.method)
-        result = await method(state, **request.params)
-        logger.debug("Method %s executed successfully", request.method)
-
-        return MCPResponse(
-            result=result,
-            context=request.context
+        bytes.fromhex(data[2:])
+    except ValueError:
+        return False
+    return True
+
+@app.post("/mcp/raw", response_model=MCPRawResponse)
+async def process_raw_call(call: MCPRawCall):
+    """
+    Forward ABI-encoded calldata for a view function as a single eth_call.
+
+    The calldata's selector must belong to one of the contract's view
+    functions. Nothing is decoded: the raw return data is returned as hex,
+    so callers that already hold calldata skip the codec entirely. Calls go
+    through the read cache and request coalescing like decoded reads.
+    """
+    data = call.data.lower()
+    if not _is_hex_calldata(data):
+        raise HTTPException(status_code=422, detail="data must be 0x-prefixed hex calldata with a 4-byte selector")
+    method_id = SELECTORS.get(data[:10])
+    if method_id is None:
+        raise HTTPException(status_code=404, detail=f"Unknown selector {{data[:10]}}")
+    if method_id not in VIEW_METHODS:
+        raise HTTPException(status_code=422, detail=f"{{METHOD_SIGNATURES[method_id]}} is not a view function")
+    immutable = method_id in IMMUTABLE_METHODS
+    block_number = None if immutable else await block_tracker.current()
+    # Keyed apart from decoded reads of the same method, whose results differ in shape
+    key = request_key(f"raw:{{method_id}}", {{"data": data}}, block_number)
+
+    async def forward():
+        return await eth_call_raw(
+            await state.http_session(), state.node_url, state.contract.address, data,
+            "latest" if block_number is None else block_number
         )
-    except HTTPException:
-        raise
+
+    try:
+        result = await read_cache.get_or_call(key, lambda: single_flight.do(key, forward), immutable=immutable)
+    except BatchCallError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
-        logger.error("Error processing MCP request: %s", e)
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Raw call failed: %s", e)
+        raise HTTPException(status_code=502, detail=str(e))
+    return json_response({{"result": result, "method": METHOD_SIGNATURES[method_id], "context": call.context}})
+
+# Query parameters of /events/{{event}} that are not indexed argument filters
+EVENT_QUERY_OPTIONS = frozenset({{"from_block", "to_block", "after", "limit", "order"}})
+EVENTS_MAX_LIMIT = int(os.getenv("MCP_EVENTS_MAX_LIMIT", "10000"))
+
+def _event_filters(decoder, query_params) -> Dict[int, List[bytes]]:
+    """Topic position -> accepted topics, from query parameters naming indexed arguments; 422 if invalid."""
+    filters = {{}}
+    for name in query_params.keys():
+        if name in EVENT_QUERY_OPTIONS:
+            continue
+        try:
+            topics = [decoder.topic_filter(name, value) for value in query_params.getlist(name)]
+        except ParamError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        filters[decoder.indexed.index(name) + 1] = topics
+    return filters
+
+@app.get("/events")
+async def list_events():
+    """List the contract's events, their indexed parameters and the indexer's progress."""
+    return {{
+        "events": {{
+            decoder.signature: {{"topic": decoder.topic, "indexed": decoder.indexed}} for decoder in EVENTS.values()
+        }},
+        "indexer": indexer.stats() if indexer is not None else None,
+        "subscriptions": event_hub.stats()
+    }}
+
+@app.get("/events/{{event}}", response_model=MCPEventsResponse)
+async def query_events(event: str, request: Request, from_block: Optional[int] = None,
+                       to_block: Optional[int] = None, after: Optional[str] = None,
+                       limit: int = 100, order: str = "asc"):
+    """
+    Return the indexed history of an event, served from the local store.
+
+    ``event`` is an event name, canonical signature or topic. Any other
+    query parameter filters on an indexed argument by value (repeat it to
+    match any of several values), e.g. ``/events/Transfer?to=0x...``.
+    Pages hold up to ``limit`` logs in block order (``order=desc`` for
+    newest first); pass ``next`` back as ``after`` for the next page.
+    """
+    if event_store is None:
+        raise HTTPException(status_code=503, detail="The event indexer is disabled; set MCP_INDEXER=1 to enable it")
+    decoder = resolve_event(event)
+    if not 1 <= limit <= EVENTS_MAX_LIMIT:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {{EVENTS_MAX_LIMIT}}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=422, detail="order must be asc or desc")
+    cursor = None
+    if after is not None:
+        try:
+            block_number, log_index = after.split(":")
+            cursor = (int(block_number), int(log_index))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="after must be a block:log_index cursor")
+    filters = _event_filters(decoder, request.query_params)
+    logs = event_store.query(
+        bytes.fromhex(decoder.topic[2:]), filters, from_block, to_block, cursor, limit + 1, order == "desc"
+    )
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = f"{{logs[-1]['block_number']}}:{{logs[-1]['log_index']}}"
+    for log in logs:
+        log["args"] = result_encoder.convert(log["args"])
+    return json_response({{
+        "event": decoder.signature, "events": logs, "next": next_cursor, "indexed_to": event_store.checkpoint
+    }})
+
+# Seconds between keepalive comments on idle event streams
+SUBSCRIBE_KEEPALIVE = float(os.getenv("MCP_SUBSCRIBE_KEEPALIVE", "15"))
+
+def _check_subscriber_limit():
+    if event_hub.subscribers >= event_hub.max_subscribers:
+        raise HTTPException(status_code=503, detail=f"At most {{event_hub.max_subscribers}} subscribers are allowed")
+
+@app.get("/events/{{event}}/stream")
+async def stream_events(event: str, request: Request):
+    """
+    Stream new logs of an event as Server-Sent Events.
+
+    Filters on indexed arguments work as for ``/events/{{event}}``. Each
+    event is a ``data:`` line holding the decoded log. A client that falls
+    more than MCP_SUBSCRIBE_BUFFER_SIZE events behind loses its oldest
+    pending events and is sent a ``dropped`` event with their count.
+    """
+    decoder = resolve_event(event)
+    filters = _event_filters(decoder, request.query_params)
+    _check_subscriber_limit()
+    prefix = f"event: {{decoder.name}}\\ndata: ".encode()
+
+    async def frames():
+        # Subscribed once streaming starts, so a stream that never starts never subscribes
+        try:
+            subscription = event_hub.subscribe(decoder.topic, filters)
+        except TooManySubscribers:
+            return
+        try:
+            yield b": subscribed\\n\\n"
+            async for item in subscription.events(SUBSCRIBE_KEEPALIVE):
+                if item is None:
+                    yield b": keepalive\\n\\n"
+                elif isinstance(item, int):
+                    yield b'event: dropped\\ndata: {{"dropped": %d}}\\n\\n' % item
+                else:
+                    yield prefix + item + b"\\n\\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(), media_type="text/event-stream", headers={{"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}}
+    )
+
+@app.websocket("/events/{{event}}/ws")
+async def websocket_events(websocket: WebSocket, event: str):
+    """
+    Stream new logs of an event over a WebSocket, one JSON message per log.
+
+    Filters are passed as query parameters, as for ``/events/{{event}}``. A
+    client that falls behind receives ``{{"dropped": n}}`` in place of the
+    events it lost.
+    """
+    try:
+        decoder = resolve_event(event)
+        filters = _event_filters(decoder, websocket.query_params)
+        subscription = event_hub.subscribe(decoder.topic, filters)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+    except TooManySubscribers as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+
+    async def send_events():
+        async for item in subscription.events(SUBSCRIBE_KEEPALIVE):
+            if isinstance(item, int):
+                await websocket.send_text(json.dumps({{"dropped": item}}))
+            elif item is not None:
+                await websocket.send_text(item.decode())
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    try:
+        await websocket.accept()
+        tasks = [asyncio.ensure_future(send_events()), asyncio.ensure_future(wait_for_disconnect())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+        for task in done:
+            # A send to a client that already left fails; that is just a disconnect
+            if not task.cancelled() and task.exception() is not None:
+                logger.debug("Event stream ended: %s", task.exception())
+    finally:
+        event_hub.unsubscribe(subscription)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Return read cache hit/miss and request coalescing counters."""
+    return {{**read_cache.stats(), "single_flight": single_flight.stats()}}
+''',
+            'main': self._server_main_section()
+        }
+        functions = self.analysis['functions']
+        overloads: Dict[str, List[str]] = {}
+        for function in functions:
+            if function.overloaded:
+                overloads.setdefault(function.name, []).append(function.method_name)
+        values = dict(
+            contract_name=self.contract_name,
+            view_methods=self._set_literal(
+                f.method_name for f in functions if f.state_mutability.value in ("view", "pure")
+            ),
+            method_signatures=self._dict_literal({f.method_name: f.signature for f in functions}),
+            method_params=self._dict_literal({
+                f.method_name: tuple(p.name for p in f.inputs) for f in functions
+            }),
+            selectors=self._dict_literal({f.selector: f.method_name for f in functions}),
+            overloads=self._dict_literal({name: tuple(ids) for name, ids in overloads.items()}),
+            immutable_methods=self._set_literal(self.immutable_methods),
+            log_level="WARNING" if self.profile == "production" else "DEBUG"
+        )
+        return {name: section.format(**values) for name, section in sections.items()}
+        
+    def _server_main_section(self) -> str:
+        """The ``__main__`` block of the generated server for the selected profile."""
+        if self.profile == "production":
+            return '''
+def _worker_count() -> int:
+    """MCP_WORKERS, or one worker per core available to this process."""
+    if os.getenv("MCP_WORKERS"):
+        return int(os.environ["MCP_WORKERS"])
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
 
+if __name__ == '__main__':
+    import uvicorn
+    workers = _worker_count()
+    logger.warning("Starting MCP server with %d workers", workers)
+    # Workers are separate processes, so the app is passed as an import string.
+    # "auto" picks uvloop and httptools when they are installed.
+    uvicorn.run(
+        f"{{Path(__file__).stem}}:app",
+        app_dir=str(current_dir),
+        host=os.getenv("MCP_HOST", "0.0.0.0"),
+        port=int(os.getenv("MCP_PORT", "8000")),
+        workers=workers,
+        loop="auto",
+        http="auto",
+        log_level=LOG_LEVEL.lower(),
+        access_log=os.getenv("MCP_ACCESS_LOG", "").lower() in ("1", "true", "yes")
+    )
+'''
+        return '''
 if __name__ == '__main__':
     import uvicorn
     logger.info("Starting MCP server")
     uvicorn.run(app, host="0.0.0.0", port=8000)
-'''.format(contract_name=self.contract_name)
+'''
+            
+    def _generate_server_file(self):
+        """Generate the main MCP server file."""
+        sections = self._server_sections()
+        self._write_file('server.py', ''.join(sections[name] for name in ('prelude', 'core', 'dispatch', 'endpoints', 'main')))
+        
+    def _generate_bundle(self):
+        """
+        Generate ``bundle.py``: the server with every method compiled in.
+
+        Methods are read back from their (validated) method files and renamed
+        to ``_method_<method id>`` so they cannot shadow the server's own names.
+        The dispatch table is a literal mapping, so starting the server runs
+        one precompiled module instead of executing every method file.
+        """
+        methods = {}
+        for function in self.analysis['functions']:
+            record = self._manifest['functions'].get(function.signature)
+            if not record or function.method_name in methods:
+                continue
+            source = (self.output_dir / record['output']).read_text()
+            if not source.startswith(METHOD_MODULE_HEADER):
+                raise ValueError(f"Unexpected method module header in {record['output']}")
+            methods[function.method_name] = source[len(METHOD_MODULE_HEADER):].replace(
+                f'async def {function.name}(state', f'async def _method_{function.method_name}(state', 1
+            )
+        entries = ''.join(f'    {name!r}: _method_{name},\n' for name in sorted(methods))
+        dispatch = f'''# Every method of the contract, compiled into this module
+METHODS = MappingProxyType({{
+{entries}}})
+METHOD_LOAD_ERRORS = MappingProxyType({{}})
+
+def get_method(method_name: str):
+    """Look up a method in the dispatch table."""
+    method = METHODS.get(method_name)
+    if method is None:
+        raise HTTPException(status_code=404, detail=f"Method {{method_name}} not found")
+    return method
 
-        # Write the server file
-        server_path = self.output_dir / 'server.py'
-        with open(server_path, 'w') as f:
-            f.write(template)
+'''
+        sections = self._server_sections()
+        content = ''.join([
+            '# Generated in bundle mode: run this module instead of server.py\n',
+            'from __future__ import annotations\n',
+            sections['prelude'],
+            *(methods[name] + '\n\n' for name in sorted(methods)),
+            sections['core'],
+            dispatch,
+            sections['endpoints'],
+            sections['main']
+        ])
+        self._precompile(BUNDLE_NAME, self._write_file(BUNDLE_NAME, content))
             
     async def _generate_methods(self):
-        """Generate MCP implementations for each function."""
-        for function in self.analysis['functions']:
-            await self._generate_method_file(function)
+        """
+        Generate MCP implementations for each function.
+
+        Up to ``max_workers`` functions are generated concurrently. A failure
+        does not cancel the other functions; all failures are reported together
+        once every function has finished. When batching, the functions that
+        need the LLM are generated up front, ``batch_size`` per request. The
+        implementations are then validated together (in parallel for large
+        contracts) and only the valid ones are written and precompiled.
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def worker(function: FunctionDefinition):
+            async with semaphore:
+                return await self._generate_implementation(function)
+
+        functions = [f for f in self.analysis['functions'] if not self._is_method_up_to_date(f)]
+        self.build_stats['methods_skipped'] = len(self.analysis['functions']) - len(functions)
+        self.build_stats['methods_generated'] = 0
+        if self.batch_size > 1:
+            llm_functions = [f for f in functions
+                             if not (self.template_generator and self.template_generator.supports(f))]
+            self._batched_implementations = await self.llm_generator.generate_methods(
+                llm_functions, self.analysis['abi'], batch_size=self.batch_size, max_concurrency=self.max_workers
+            )
+        results = await asyncio.gather(
+            *(worker(function) for function in functions),
+            return_exceptions=True
+        )
+
+        failures = {}
+        generated = []
+        for function, result in zip(functions, results):
+            if isinstance(result, Exception):
+                failures[function.method_name] = result
+            else:
+                generated.append((function, result))
+        checks = validate_implementations(generated, processes=self.validation_processes)
+        for (function, implementation), (is_valid, error) in zip(generated, checks):
+            if not is_valid:
+                failures[function.method_name] = ValueError(f"Invalid implementation: {error}")
+                continue
+            self._write_method_file(function, implementation)
+            self.build_stats['methods_generated'] += 1
+        for name, error in failures.items():
+            self.logger.error(f"Failed to generate method {name}: {error}")
+        if failures:
+            raise MethodGenerationError(failures)
             
-    async def _generate_method_file(self, function: FunctionDefinition):
+    async def _generate_implementation(self, function: FunctionDefinition) -> str:
         """Generate an MCP implementation for a single function."""
+        if self.template_generator and self.template_generator.supports(function):
+            self.build_stats['methods_from_template'] += 1
+            return self.template_generator.render(function)
+        if function.signature in self._batched_implementations:
+            implementation = self._batched_implementations.pop(function.signature)
+            if isinstance(implementation, Exception):
+                raise implementation
+            return implementation
         # Generate implementation using LLM
-        implementation = await self.llm_generator.generate_method(function, self.analysis['abi'])
+        return await self.llm_generator.generate_method(function, self.analysis['abi'])
         
-        # Save the implementation
-        with open(self.output_dir / 'methods' / f'{function.name}.py', 'w') as f:
-            f.write(implementation)
+    def _write_method_file(self, function: FunctionDefinition, implementation: str):
+        """Save a validated implementation along with its bytecode."""
+        output = self._method_output(function)
+        self._precompile(output, self._write_file(output, METHOD_MODULE_HEADER + implementation + '\n'))
+        self._manifest['functions'][function.signature] = {
+            'input': self._method_input_hash(function),
+            'output': output
+        }
             
     def _generate_state_variables(self):
         """Generate state variable implementations."""
-        template = '''from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+        self._write_file('state/abi.json', self._abi_json())
+        self._write_file('state/__init__.py', self._state_module_source())
+        self._write_file('state/codecs.py', self._codecs_module_source())
+        self._write_file('state/validators.py', self._validators_module_source())
+        self._write_file('state/events.py', self._events_module_source())
+        
+    def _codecs_module_source(self) -> str:
+        """
+        Source of ``state/codecs.py``: a ``MethodCodec`` per function, by signature.
+
+        Selectors and canonical types are computed here, so the server only
+        builds the eth_abi coders, once, when it starts.
+        """
+        entries = []
+        for function in sorted(self.analysis['functions'], key=lambda f: f.signature):
+            entries.append(
+                f"    {function.signature!r}: MethodCodec(\n"
+                f"        {function.signature!r}, {function.selector!r},\n"
+                f"        {self._abi_params(function.inputs)!r},\n"
+                f"        {self._abi_params(function.outputs)!r}\n"
+                f"    ),\n"
+            )
+        return (
+            "# ABI codecs of the contract's functions, keyed by canonical signature\n"
+            "from types import MappingProxyType\n"
+            "from runtime.codec import MethodCodec\n"
+            "\n"
+            f"CODECS = MappingProxyType({{\n{''.join(entries)}}})\n"
+        )
+        
+    def _validators_module_source(self) -> str:
+        """
+        Source of ``state/validators.py``: a request parameter validator per function, by signature.
+
+        Each validator is straight-line code derived from the function's
+        Solidity types, so checking a request costs microseconds and bad
+        input never reaches the node.
+        """
+        sources, entries = [], []
+        for function in sorted(self.analysis['functions'], key=lambda f: f.signature):
+            name = f"_validate_{function.method_name}"
+            source = validator_source(function, name)
+            if source is None:
+                continue
+            sources.append(source)
+            entries.append(f"    {function.signature!r}: {name},\n")
+        return (
+            "# Request parameter validators of the contract's functions, keyed by canonical signature.\n"
+            "# Each checks and coerces a request's params and raises ParamError before any node call.\n"
+            "from types import MappingProxyType\n"
+            "from runtime.validation import (address, array, bind, boolean, dynamic_bytes, fixed_bytes, integer,\n"
+            "                                number, string, struct)\n"
+            "\n\n"
+            + "\n\n".join(sources)
+            + f"\n\nVALIDATORS = MappingProxyType({{\n{''.join(entries)}}})\n"
+        )
+        
+    def _events_module_source(self) -> str:
+        """
+        Source of ``state/events.py``: an ``EventDecoder`` per event, by canonical signature.
+
+        Anonymous events are left out, since their logs carry no event topic
+        to recognize them by.
+        """
+        # Imported on first use to keep the generator cheap to import
+        from eth_hash.auto import keccak
+        events = {}
+        for event in self.analysis['events']:
+            if event.get('anonymous'):
+                continue
+            signature = f"{event['name']}({','.join(self._canonical_type(p) for p in event.get('inputs', []))})"
+            events.setdefault(signature, event)
+        entries = []
+        for signature in sorted(events):
+            topic = "0x" + keccak(signature.encode()).hex()
+            entries.append(
+                f"    {signature!r}: EventDecoder(\n"
+                f"        {signature!r}, {topic!r},\n"
+                f"        {self._event_params(events[signature].get('inputs', []))!r}\n"
+                f"    ),\n"
+            )
+        return (
+            "# Log decoders of the contract's events, keyed by canonical signature\n"
+            "from types import MappingProxyType\n"
+            "from runtime.events import EventDecoder\n"
+            "\n"
+            f"EVENTS = MappingProxyType({{\n{''.join(entries)}}})\n"
+        )
+        
+    @classmethod
+    def _canonical_type(cls, param: Dict) -> str:
+        """The canonical type of a raw ABI parameter, with tuples spelled out."""
+        if param['type'].startswith('tuple'):
+            inner = ','.join(cls._canonical_type(c) for c in param.get('components', []))
+            return f"({inner}){param['type'][len('tuple'):]}"
+        return param['type']
+        
+    @classmethod
+    def _event_params(cls, params: List[Dict], top_level: bool = True) -> List[Dict]:
+        """ABI JSON entries for event parameters, with the fields the decoders use."""
+        entries = []
+        for param in params:
+            entry = {'name': param.get('name', ''), 'type': param['type']}
+            if top_level:
+                entry['indexed'] = bool(param.get('indexed'))
+            if 'components' in param:
+                entry['components'] = cls._event_params(param['components'], top_level=False)
+            entries.append(entry)
+        return entries
+        
+    @classmethod
+    def _abi_params(cls, params: List[FunctionParameter]) -> List[Dict]:
+        """ABI JSON entries for parameters, with the fields the codecs use."""
+        entries = []
+        for param in params:
+            entry = {'name': param.name, 'type': param.type}
+            if param.components is not None:
+                entry['components'] = cls._abi_params(param.components)
+            entries.append(entry)
+        return entries
+        
+    def _abi_json(self) -> str:
+        return json.dumps(self.analysis['abi'], separators=(',', ':'))
+        
+    def _state_module_source(self) -> str:
+        """Source of the State model, which loads its ABI from ``abi.json`` beside it."""
+        template = '''from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import json
 import logging
+from pathlib import Path
+import aiohttp
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; MCP_LOG_LEVEL overrides the profile's default level
+LOG_LEVEL = os.getenv("MCP_LOG_LEVEL", "{log_level}").upper()
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
+logger.setLevel(LOG_LEVEL)
+
+# Stored as compact JSON beside this module and parsed once per process
+ABI = json.loads((Path(__file__).parent / 'abi.json').read_text())
 
 class State(BaseModel):
     """State variables for the MCP contract."""
@@ -211,10 +1387,16 @@ class State(BaseModel):
     contract_address: str
     abi: List[Dict[str, Any]]
     account: str
+    node_url: str
     
     # Contract variables
     {state_vars}
     
+    # One provider, HTTP session and contract object per process, shared by all methods
+    _web3: Any = PrivateAttr(default=None)
+    _contract: Any = PrivateAttr(default=None)
+    _session: Any = PrivateAttr(default=None)
+    
     def __init__(self, **data):
         """Initialize state variables."""
         logger.debug("Initializing State with data: %s", data)
@@ -224,26 +1406,74 @@ class State(BaseModel):
         logger.debug("Got contract_address from env: %s", contract_address)
         data["contract_address"] = contract_address
         
-        abi = {abi}
-        logger.debug("Setting ABI: %s", abi)
-        data["abi"] = abi
+        data["abi"] = ABI
         
         account = os.getenv("ACCOUNT_ADDRESS", "0x0000000000000000000000000000000000000000")
         logger.debug("Got account from env: %s", account)
         data["account"] = account
         
+        data["node_url"] = os.getenv("ETH_NODE_URL", "http://localhost:8545")
+        logger.debug("Got node_url from env: %s", data["node_url"])
+        
         # Initialize contract variables with defaults
         {init_vars}
         
         logger.debug("Calling super().__init__ with data: %s", data)
         super().__init__(**data)
+        
+        timeout = aiohttp.ClientTimeout(total=float(os.getenv("ETH_HTTP_TIMEOUT", "30")))
+        self._web3 = AsyncWeb3(AsyncHTTPProvider(self.node_url, request_kwargs={{"timeout": timeout}}))
+        self._contract = self._web3.eth.contract(
+            address=AsyncWeb3.to_checksum_address(self.contract_address),
+            abi=self.abi
+        )
         logger.debug("State initialization complete")
+    
+    @property
+    def web3(self) -> AsyncWeb3:
+        """The shared AsyncWeb3 instance."""
+        return self._web3
+    
+    @property
+    def contract(self):
+        """The contract object, built once from the ABI."""
+        return self._contract
+    
+    async def connect(self):
+        """
+        Open the pooled keep-alive HTTP session used for all node requests.
+
+        Must be called from the server's event loop. ETH_HTTP_POOL_SIZE bounds
+        the number of concurrent connections to the node.
+        """
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv("ETH_HTTP_POOL_SIZE", "100")),
+            keepalive_timeout=float(os.getenv("ETH_HTTP_KEEPALIVE", "60"))
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        await self._web3.provider.cache_async_session(self._session)
+        logger.info("Connected to node %s", self.node_url)
+    
+    async def http_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, opening it if necessary."""
+        await self.connect()
+        return self._session
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 '''
         
         state_vars = []
         init_vars = []
         
         for var in self.analysis['state_variables']:
+            if var['name'] in self.RESERVED_STATE_NAMES:
+                continue
             type_hint = self._get_python_type(var['type'])
             state_vars.append(f"{var['name']}: Optional[{type_hint}] = Field(default=None)")
             init_vars.append(f"data['{var['name']}'] = None")
@@ -251,27 +1481,32 @@ class State(BaseModel):
         state_vars_str = '\n    '.join(state_vars)
         init_vars_str = '\n        '.join(init_vars)
         
-        # Convert JavaScript-style booleans to Python-style
-        abi_str = str(self.analysis['abi']).replace('false', 'False').replace('true', 'True')
-        
-        with open(self.output_dir / 'state' / '__init__.py', 'w') as f:
-            f.write(template.format(
-                state_vars=state_vars_str,
-                init_vars=init_vars_str,
-                abi=abi_str
-            ))
+        return template.format(
+            state_vars=state_vars_str,
+            init_vars=init_vars_str,
+            log_level="WARNING" if self.profile == "production" else "DEBUG"
+        )
+    
+    @staticmethod
+    def _set_literal(names) -> str:
+        """Render names as a deterministic set literal for frozenset()."""
+        names = sorted(set(names))
+        if not names:
+            return ""
+        return "{" + ", ".join(repr(name) for name in names) + "}"
+
+    @staticmethod
+    def _dict_literal(mapping: Dict) -> str:
+        """Render a mapping as a deterministic dict literal."""
+        return "{" + ", ".join(f"{key!r}: {mapping[key]!r}" for key in sorted(mapping)) + "}"
     
     def _get_python_type(self, solidity_type: str) -> str:
         """Convert Solidity type to Python type hint."""
-        type_mapping = {
-            'uint256': 'int',
-            'uint8': 'int',
-            'bool': 'bool',
-            'address': 'str',
-            'string': 'str',
-            'bytes32': 'bytes'
-        }
-        return type_mapping.get(solidity_type, 'Any')
+        try:
+            return python_type(parse_type(solidity_type))
+        except ValueError:
+            # e.g. a tuple whose components aren't known
+            return 'Any'
     
     def _generate_documentation(self):
         """Generate documentation for the MCP server."""
@@ -320,6 +1555,112 @@ Process an MCP request for the {self.contract_name} contract.
 }}
 ```
 
+Integers are JSON numbers by default. Set `MCP_INTEGER_ENCODING=string` (decimal) or
+`hex` to return every integer as a string, which keeps uint256 values exact in
+JavaScript clients. Bytes are `0x`-prefixed hex strings, or base64 with
+`MCP_BYTES_ENCODING=base64`.
+
+`method` may be a method name, a canonical signature such as
+`transfer(address,uint256)` or a 4-byte selector such as `0xa9059cbb`. Each
+overload of an overloaded function is its own method, named after the function
+and its selector (e.g. `safeTransferFrom_42842e0e`); calling an overloaded
+function by plain name picks the overload whose parameter names match `params`.
+
+#### POST /mcp/batch
+
+Process a list of MCP requests in one HTTP request. The body is a JSON array of
+request objects in the `/mcp` format. View calls are sent to the node as a single
+JSON-RPC batch pinned to one block, or as one Multicall3 `aggregate3` call when
+`MULTICALL_ADDRESS` is set (`MCP_BATCH_MAX_CALLS` calls per node request).
+
+**Response:**
+```json
+{{
+    "results": [
+        {{"result": {{"result": 1000}}, "error": null, "context": null}},
+        {{"result": null, "error": {{"status_code": 404, "detail": "Method foo not found"}}, "context": null}}
+    ]
+}}
+```
+
+Results are returned in request order; a failing item does not affect the others.
+
+#### POST /mcp/raw
+
+Forward ABI-encoded calldata for a view function as a single `eth_call`, without
+decoding the parameters or the result. The selector must belong to a view function.
+
+**Request Body:**
+```json
+{{"data": "0x70a08231000000000000000000000000...", "context": null}}
+```
+
+**Response:**
+```json
+{{"result": "0x00000000000000000000000000000000000000000000000000000000000003e8",
+  "method": "balanceOf(address)", "context": null}}
+```
+
+#### GET /events/{{event}}
+
+The indexed history of an event, such as `/events/Transfer`, served from a local
+SQLite store in milliseconds. `event` is an event name, canonical signature or topic.
+
+Query parameters:
+- `from_block`, `to_block`: block range (inclusive)
+- `limit`: page size (default 100, at most `MCP_EVENTS_MAX_LIMIT`); `order`: `asc` or `desc`
+- `after`: the `next` cursor of the previous page
+- any indexed parameter of the event, e.g. `?to=0x1234...`; repeat it to match any of several values
+
+**Response:**
+```json
+{{
+    "event": "Transfer(address,address,uint256)",
+    "events": [
+        {{"block_number": 12000001, "log_index": 3, "transaction_hash": "0x...",
+          "args": {{"from": "0x...", "to": "0x1234...", "value": 1000}}}}
+    ],
+    "next": "12000001:3",
+    "indexed_to": 12000400
+}}
+```
+
+The indexer is off by default. With `MCP_INDEXER=1` the server backfills the contract's logs
+from `MCP_INDEXER_START_BLOCK` into `MCP_INDEXER_DB` (`data/events.sqlite3` by default) and then
+follows the chain every `MCP_INDEXER_POLL_INTERVAL` seconds, `MCP_INDEXER_CONFIRMATIONS` (12)
+blocks behind the head so reorgs never reach the store. `eth_getLogs` ranges start at
+`MCP_INDEXER_CHUNK_SIZE` blocks, halve whenever the node reports too many results and grow
+again up to `MCP_INDEXER_MAX_CHUNK_SIZE`. Progress is checkpointed with every range, so a
+restarted server resumes where it stopped. Bytes arguments are returned as hex.
+
+#### GET /events/{{event}}/stream and WebSocket /events/{{event}}/ws
+
+New logs of an event as they are mined, as Server-Sent Events (`event: Transfer`, with the
+decoded log as `data`) or as one JSON message per log over a WebSocket. Filters on indexed
+parameters work as above, e.g. `/events/Transfer/stream?to=0x1234...`. The indexer does not
+need to be enabled.
+
+All subscribers share one upstream `eth_getLogs` poller (every `MCP_SUBSCRIBE_POLL_INTERVAL`
+seconds, `MCP_SUBSCRIBE_CONFIRMATIONS` blocks behind the head) that only runs while someone is
+subscribed, so node load does not grow with the number of subscribers. Each client has its own
+buffer of `MCP_SUBSCRIBE_BUFFER_SIZE` events: a client that falls behind loses its oldest
+pending events and receives a `dropped` event (`{{"dropped": n}}` over WebSockets) with their
+count, without slowing anyone else down. Idle streams get a keepalive comment every
+`MCP_SUBSCRIBE_KEEPALIVE` seconds. At most `MCP_SUBSCRIBE_MAX_SUBSCRIBERS` clients may
+subscribe at once (503 beyond that).
+
+#### GET /events
+
+The contract's events with their topics and indexed parameters, the indexer's progress and
+the subscription poller's state.
+
+#### GET /cache/stats
+
+Read cache hit/miss and request coalescing counters. Results of view methods are
+cached per block (`MCP_CACHE_SIZE` entries, `MCP_CACHE_TTL` seconds;
+`MCP_CACHE_SIZE=0` disables the cache). {self._immutable_methods_doc()}
+Concurrent identical view requests share a single node call.
+
 ## Available Methods
 
 {self._generate_function_docs()}
@@ -342,7 +1683,7 @@ To integrate this MCP server with an AI agent:
    ```bash
    python {self.contract_name.lower()}_server.py
    ```
-
+{self._bundle_doc()}{self._profile_doc()}
 2. Make requests to the server using the MCP format:
    ```python
    import requests
@@ -372,15 +1713,49 @@ To integrate this MCP server with an AI agent:
 The server returns appropriate HTTP status codes and error messages:
 
 - 200: Success
+- 400: Ambiguous overloaded method
 - 404: Method not found
+- 422: Invalid parameters, such as a malformed address, an integer out of range for
+  its type or a struct or array of the wrong shape. Parameters are checked against
+  the function's Solidity types before any node call. Integers may be passed as
+  JSON numbers or as decimal or `0x`-hex strings, and bytes as `0x`-hex strings.
 - 500: Server error
+- 503: Event history requested while the indexer is disabled, or too many event subscribers
 
 Error responses include a detail message explaining the error.
 '''
         
-        with open(self.output_dir / 'docs' / 'README.md', 'w') as f:
-            f.write(template)
+        self._write_file('docs/README.md', template)
             
+    def _bundle_doc(self) -> str:
+        """Explain how to start the bundled server, if one is generated."""
+        if not self.bundle:
+            return ""
+        return """   For the fastest cold start, run the precompiled single-module bundle instead:
+   ```bash
+   uvicorn bundle:app --port 8000
+   ```
+"""
+        
+    def _profile_doc(self) -> str:
+        """Document the runtime settings of the production profile."""
+        if self.profile != "production":
+            return ""
+        return """   The server was generated with the production profile: it logs at WARNING
+   (`MCP_LOG_LEVEL`), without access logs (`MCP_ACCESS_LOG=1` enables them), and
+   starts one worker per available core (`MCP_WORKERS`) on `MCP_HOST`:`MCP_PORT`.
+   Each worker keeps its own read cache. Install `uvicorn[standard]` to serve with
+   uvloop and httptools.
+"""
+        
+    def _immutable_methods_doc(self) -> str:
+        """Describe which methods are cached for the life of the process."""
+        if not self.immutable_methods:
+            return "No methods are marked immutable."
+        names = ", ".join(f"`{name}`" for name in self.immutable_methods)
+        return (f"{names} are marked immutable and cached without expiry, in their own store of up to "
+                "`MCP_CACHE_SIZE` entries.")
+        
     def _generate_function_docs(self) -> str:
         """Generate function documentation."""
         docs = []
@@ -388,7 +1763,8 @@ Error responses include a detail message explaining the error.
             params = [f"{p.name}: {p.type}" for p in function.inputs]
             returns = [f"{p.type}" for p in function.outputs]
             
-            docs.append(f"### {function.name}")
+            docs.append(f"### {function.method_name}")
+            docs.append(f"\nSignature: `{function.signature}` (selector `{function.selector}`)")
             docs.append(f"\nFunction Type: {function.state_mutability.value}")
             if params:
                 docs.append("\nParameters:")
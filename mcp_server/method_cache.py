@@ -1,49 +1,250 @@
+import os
+import ast
 import json
+import time
+import sqlite3
 import hashlib
+import builtins
+import py_compile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
-from .abi_analyzer import FunctionDefinition
+from .abi_analyzer import FunctionDefinition, FunctionParameter
+from .template_engine import python_identifier
+
+# Bump when the structure of cache keys changes
+CACHE_KEY_VERSION = 2
+
+def _parameter_key(param: FunctionParameter) -> Dict:
+    key = {'name': param.name, 'type': param.canonical_type}
+    if param.components:
+        key['components'] = [_parameter_key(c) for c in param.components]
+    return key
 
 class MethodCache:
-    def __init__(self, cache_dir: Path):
+    """
+    Cache of generated method implementations.
+
+    Implementations live in a single SQLite database in ``cache_dir`` that
+    records creation time, last use, hit count and size for each entry, so
+    lookups never scan the directory. When ``max_entries`` or ``max_bytes``
+    is set, least recently used entries are evicted as new ones are added.
+    Legacy ``<sha256>.py`` cache files, keyed in an older key format that
+    no lookup can match, are deleted on first open.
+
+    Keys are content addressed: the canonical ABI signature (including tuple
+    components and parameter names), state mutability and a ``fingerprint``
+    of everything else that shaped the implementation, such as the prompt
+    template, model and validator rules. Changing any of them only misses
+    the entries it actually affects.
+    """
+
+    DB_NAME = "methods.sqlite3"
+
+    def __init__(self, cache_dir: Path, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
         self.cache_dir = cache_dir
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
         self.logger = logging.getLogger(__name__)
+        # Lookups served by this instance
+        self.hits = 0
+        self.misses = 0
+        # Several generator processes may share one cache directory
+        self._db = sqlite3.connect(str(self.cache_dir / self.DB_NAME), timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS methods (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                implementation TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS methods_last_used ON methods (last_used_at)")
+        self._discard_legacy_files()
         
-    def _get_cache_key(self, function: FunctionDefinition) -> str:
+    def _get_cache_key(self, function: FunctionDefinition, fingerprint: str = "") -> str:
         """Generate a unique cache key for a function."""
         # Create a deterministic string representation of the function
         func_str = json.dumps({
-            'name': function.name,
-            'inputs': [(p.name, p.type) for p in function.inputs],
-            'outputs': [(p.name, p.type) for p in function.outputs],
-            'state_mutability': function.state_mutability.value
+            'version': CACHE_KEY_VERSION,
+            'signature': function.signature,
+            'inputs': [_parameter_key(p) for p in function.inputs],
+            'outputs': [_parameter_key(p) for p in function.outputs],
+            'state_mutability': function.state_mutability.value,
+            'fingerprint': fingerprint
         }, sort_keys=True)
         
         return hashlib.sha256(func_str.encode()).hexdigest()
         
-    def get_cached_implementation(self, function: FunctionDefinition) -> Optional[str]:
+    def get_cached_implementation(self, function: FunctionDefinition, fingerprint: str = "") -> Optional[str]:
         """Get cached implementation if it exists."""
-        cache_key = self._get_cache_key(function)
-        cache_file = self.cache_dir / f"{cache_key}.py"
+        cache_key = self._get_cache_key(function, fingerprint)
+        row = self._db.execute("SELECT implementation FROM methods WHERE key = ?", (cache_key,)).fetchone()
         
-        if cache_file.exists():
+        if row:
+            self._db.execute(
+                "UPDATE methods SET hits = hits + 1, last_used_at = ? WHERE key = ?",
+                (time.time(), cache_key)
+            )
+            self.hits += 1
             self.logger.info(f"Cache hit for function {function.name}")
-            return cache_file.read_text()
+            return row[0]
             
+        self.misses += 1
         self.logger.info(f"Cache miss for function {function.name}")
         return None
         
-    def cache_implementation(self, function: FunctionDefinition, implementation: str):
-        """Cache a generated implementation."""
-        cache_key = self._get_cache_key(function)
-        cache_file = self.cache_dir / f"{cache_key}.py"
+    def contains(self, function: FunctionDefinition, fingerprint: str = "") -> bool:
+        """Check for an entry without counting it as a lookup."""
+        cache_key = self._get_cache_key(function, fingerprint)
+        return self._db.execute("SELECT 1 FROM methods WHERE key = ?", (cache_key,)).fetchone() is not None
         
-        cache_file.write_text(implementation)
+    def cache_implementation(self, function: FunctionDefinition, implementation: str, fingerprint: str = ""):
+        """Cache a generated implementation."""
+        cache_key = self._get_cache_key(function, fingerprint)
+        self._store(cache_key, function.name, implementation)
         self.logger.info(f"Cached implementation for function {function.name}")
+        if self.max_entries is not None or self.max_bytes is not None:
+            self.prune(max_entries=self.max_entries, max_bytes=self.max_bytes)
+            
+    def _store(self, cache_key: str, name: str, implementation: str, created_at: Optional[float] = None):
+        now = time.time()
+        self._db.execute(
+            """INSERT OR REPLACE INTO methods (key, name, implementation, size, created_at, last_used_at, hits)
+               VALUES (?, ?, ?, ?, ?, ?, 0)""",
+            (cache_key, name, implementation, len(implementation.encode()), created_at or now, now)
+        )
+        
+    def _discard_legacy_files(self):
+        """
+        Delete implementations left in the old one-file-per-method layout.
+
+        Their names are cache keys from before CACHE_KEY_VERSION 2, and they
+        cannot be re-keyed without the functions they were generated for, so
+        importing them would only fill the index with entries that never hit.
+        """
+        removed = 0
+        for cache_file in self.cache_dir.glob("*.py"):
+            if len(cache_file.stem) != 64 or cache_file.stem.strip("0123456789abcdef"):
+                continue
+            cache_file.unlink()
+            removed += 1
+        if removed:
+            self.logger.info(f"Removed {removed} legacy cache files, which no current cache key can match")
+            
+    def stats(self) -> Dict:
+        """Get cache statistics."""
+        entries, total_bytes, hits, oldest, newest = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0), MIN(created_at), MAX(created_at) FROM methods"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "total_hits": hits,
+            "oldest_created_at": oldest,
+            "newest_created_at": newest
+        }
+        
+    def prune(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+              max_age: Optional[float] = None) -> int:
+        """
+        Evict entries, least recently used first.
+
+        Removes entries unused for more than ``max_age`` seconds, then evicts
+        until at most ``max_entries`` entries and ``max_bytes`` bytes remain.
+        Returns the number of entries removed.
+        """
+        removed = 0
+        if max_age is not None:
+            removed += self._db.execute(
+                "DELETE FROM methods WHERE last_used_at < ?", (time.time() - max_age,)
+            ).rowcount
+        if max_entries is not None:
+            removed += self._db.execute(
+                """DELETE FROM methods WHERE key IN (
+                       SELECT key FROM methods ORDER BY last_used_at DESC, created_at DESC LIMIT -1 OFFSET ?
+                   )""",
+                (max_entries,)
+            ).rowcount
+        if max_bytes is not None:
+            total = 0
+            evict = []
+            rows = self._db.execute("SELECT key, size FROM methods ORDER BY last_used_at DESC, created_at DESC")
+            for key, size in rows:
+                total += size
+                if total > max_bytes:
+                    evict.append((key,))
+            self._db.executemany("DELETE FROM methods WHERE key = ?", evict)
+            removed += len(evict)
+        if removed:
+            self.logger.info(f"Evicted {removed} cached implementations")
+        return removed
+        
+    def clear(self) -> int:
+        """Remove every cached implementation. Returns the number removed."""
+        return self._db.execute("DELETE FROM methods").rowcount
         
+    def close(self):
+        self._db.close()
+        
+# Names a method module provides besides builtins (see METHOD_MODULE_HEADER)
+_MODULE_NAMES = {"State", "Dict", "CODECS"}
+_BUILTIN_NAMES = set(dir(builtins))
+
+# Below this many methods a process pool costs more to start than it saves
+PARALLEL_VALIDATION_THRESHOLD = 64
+
+def _attribute_path(node: ast.AST) -> Optional[str]:
+    """Dotted name of an attribute chain such as ``state.contract.functions``."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+def _is_codec_call(node: ast.AST, signature: str) -> bool:
+    """Whether ``node`` is ``CODECS[signature].call(...)``."""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "call"
+            and isinstance(node.func.value, ast.Subscript)
+            and isinstance(node.func.value.value, ast.Name) and node.func.value.value.id == "CODECS"):
+        return False
+    key = node.func.value.slice
+    if not isinstance(key, ast.Constant):
+        # Python 3.8 wraps subscripts in ast.Index
+        key = getattr(key, "value", key)
+    return isinstance(key, ast.Constant) and key.value == signature
+
+def _dict_entries(node: ast.AST) -> Dict[str, ast.AST]:
+    if not isinstance(node, ast.Dict):
+        return {}
+    return {k.value: v for k, v in zip(node.keys, node.values)
+            if isinstance(k, ast.Constant) and isinstance(k.value, str)}
+
 class MethodValidator:
+    """
+    Structural checks for generated method implementations.
+
+    The code is parsed and compiled, then checked for: a single
+    ``async def`` with the expected name and parameters, a ``try`` with an
+    ``except Exception as e`` handler, a call of the contract function with
+    the parameters in order, ``.call()`` (views) or ``.build_transaction()``
+    (transactions) on it, the expected return shape, and no undefined names.
+    Views may instead call their precompiled codec,
+    ``CODECS[signature].call(state, ...)``.
+    """
+
+    # Bump whenever the validation rules change so cached implementations are re-validated
+    RULES_VERSION = 4
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
@@ -52,62 +253,173 @@ class MethodValidator:
         Validate a generated implementation.
         Returns (is_valid, error_message)
         """
-        # Base required components for all functions
-        required_components = [
-            "async def",
-            "web3.eth.contract",
-            "try:",
-            "except Exception as e:"
-        ]
-        
-        # Add function-specific components
-        if function.state_mutability.value != "view":
-            required_components.append("build_transaction")
-        else:
-            required_components.append("call()")
-        
-        # Check for required components
-        for component in required_components:
-            if component not in implementation:
-                return False, f"Missing required component: {component}"
-                
+        try:
+            tree = ast.parse(implementation)
+            compile(tree, f"<{function.name}>", "exec")
+        except SyntaxError as e:
+            return False, f"Syntax error on line {e.lineno}: {e.msg}"
+        except ValueError as e:
+            return False, f"Invalid code: {e}"
+            
         # Check function signature
-        expected_signature = f"async def {function.name}(state: State"
-        if not implementation.startswith(expected_signature):
+        if len(tree.body) != 1 or not isinstance(tree.body[0], ast.AsyncFunctionDef):
+            return False, "Implementation must be a single async def"
+        method = tree.body[0]
+        if method.name != function.name:
+            return False, "Invalid function signature"
+        args = method.args
+        if args.vararg or args.kwarg or args.kwonlyargs or getattr(args, 'posonlyargs', []):
+            return False, "Invalid function signature"
+        names = [arg.arg for arg in args.args]
+        expected = ["state"] + [python_identifier(param.name) for param in function.inputs]
+        if not names or names[0] != "state":
             return False, "Invalid function signature"
-            
-        # Check parameter names match
         for param in function.inputs:
-            if f"{param.name}:" not in implementation:
+            if python_identifier(param.name) not in names:
                 return False, f"Missing parameter: {param.name}"
-                
+        if names != expected:
+            return False, f"Parameters must be {', '.join(expected)}"
+            
+        # Error handling
+        handlers = [
+            handler for node in ast.walk(method) if isinstance(node, ast.Try) for handler in node.handlers
+        ]
+        if not any(isinstance(h.type, ast.Name) and h.type.id == "Exception" and h.name == "e" for h in handlers):
+            return False, "Missing required component: except Exception as e:"
+            
+        # The contract call (or, for views, the codec call), with the parameters in order
+        is_view = function.state_mutability.value in ("view", "pure")
+        codec_calls = [node for node in ast.walk(method) if _is_codec_call(node, function.signature)]
+        if is_view and codec_calls:
+            error = self._check_codec_calls(function, codec_calls, expected)
+        else:
+            error = self._check_contract_calls(function, method, expected, is_view)
+        if error:
+            return False, error
+            
         # Check return type
-        if function.state_mutability.value == "view":
-            if "return {" not in implementation:
+        returns = [_dict_entries(node.value) for node in ast.walk(method)
+                   if isinstance(node, ast.Return) and node.value is not None]
+        if is_view:
+            if not any("result" in entries for entries in returns):
                 return False, "View function must return a dictionary"
         else:
-            # Check for either single or double quoted version
-            if '"type": "transaction_to_sign"' not in implementation and "'type': 'transaction_to_sign'" not in implementation:
+            if not any(
+                isinstance(entries.get("type"), ast.Constant) and entries["type"].value == "transaction_to_sign"
+                and "transaction" in entries
+                for entries in returns
+            ):
                 return False, "State-changing function must return transaction_to_sign"
                 
+        # Names that would raise NameError at call time
+        defined = set(names) | _MODULE_NAMES | _BUILTIN_NAMES
+        for node in ast.walk(method):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                defined.add(node.id)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                defined.add(node.name)
+        annotations = {id(n) for arg in args.args if arg.annotation for n in ast.walk(arg.annotation)}
+        if method.returns is not None:
+            annotations |= {id(n) for n in ast.walk(method.returns)}
+        for node in ast.walk(method):
+            if (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+                    and node.id not in defined and id(node) not in annotations):
+                return False, f"Undefined name on line {node.lineno}: {node.id}"
+                
         return True, ""
         
+    @staticmethod
+    def _check_contract_calls(function: FunctionDefinition, method: ast.AsyncFunctionDef,
+                              expected: List[str], is_view: bool) -> Optional[str]:
+        contract_calls = [
+            node for node in ast.walk(method)
+            if isinstance(node, ast.Call) and _attribute_path(node.func) == f"state.contract.functions.{function.name}"
+        ]
+        if not contract_calls:
+            return f"Missing required component: state.contract.functions.{function.name}(...)"
+        for call in contract_calls:
+            passed = [arg.id if isinstance(arg, ast.Name) else None for arg in call.args]
+            if call.keywords or passed != expected[1:]:
+                return f"state.contract.functions.{function.name} must be called with {', '.join(expected[1:]) or 'no arguments'}"
+                
+        terminal = "call" if is_view else "build_transaction"
+        if not any(
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == terminal and node.func.value in contract_calls
+            for node in ast.walk(method)
+        ):
+            return f"Missing required component: {terminal}()"
+        return None
+        
+    @staticmethod
+    def _check_codec_calls(function: FunctionDefinition, codec_calls: List[ast.Call],
+                           expected: List[str]) -> Optional[str]:
+        for call in codec_calls:
+            passed = [arg.id if isinstance(arg, ast.Name) else None for arg in call.args]
+            if call.keywords or passed != expected:
+                return f"CODECS[{function.signature!r}].call must be called with {', '.join(expected)}"
+        return None
+        
+    @staticmethod
+    def precompile(path: Path):
+        """
+        Byte-compile an accepted method file to ``__pycache__``.
+
+        Hash-checked bytecode stays valid when the file is copied or its
+        modification time changes, e.g. in a deployment image.
+        """
+        py_compile.compile(str(path), doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+        
+def _validate_chunk(items: List[Tuple[FunctionDefinition, str]]) -> List[Tuple[bool, str]]:
+    validator = MethodValidator()
+    return [validator.validate_implementation(function, implementation) for function, implementation in items]
+
+def validate_implementations(items: List[Tuple[FunctionDefinition, str]],
+                             processes: Optional[int] = None) -> List[Tuple[bool, str]]:
+    """
+    Validate many implementations, across a process pool for large contracts.
+
+    Returns (is_valid, error_message) for each item, in order. ``processes``
+    of 1 always validates in this process.
+    """
+    if processes == 1 or len(items) < PARALLEL_VALIDATION_THRESHOLD:
+        return _validate_chunk(items)
+    processes = processes or os.cpu_count() or 1
+    size = -(-len(items) // processes)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        return [result for chunk in pool.map(_validate_chunk, chunks) for result in chunk]
+        
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt or response (about four characters per token)."""
+    return (len(text) + 3) // 4
+
 class LLMMeter:
     def __init__(self):
         self.total_tokens = 0
         self.total_requests = 0
+        self.tokens_saved = 0
         self.logger = logging.getLogger(__name__)
         
-    def record_usage(self, tokens: int):
-        """Record LLM usage."""
+    def record_usage(self, tokens: int, tokens_saved: int = 0):
+        """
+        Record LLM usage.
+
+        ``tokens_saved`` is the estimated saving of the request over one
+        request per function with the whole ABI in each prompt.
+        """
         self.total_tokens += tokens
         self.total_requests += 1
-        self.logger.info(f"LLM Usage: {tokens} tokens (Total: {self.total_tokens} tokens, {self.total_requests} requests)")
+        self.tokens_saved += tokens_saved
+        self.logger.info(f"LLM Usage: {tokens} tokens (Total: {self.total_tokens} tokens, {self.total_requests} requests, "
+                         f"~{self.tokens_saved} tokens saved)")
         
     def get_usage_stats(self) -> Dict:
         """Get usage statistics."""
         return {
             "total_tokens": self.total_tokens,
             "total_requests": self.total_requests,
-            "average_tokens_per_request": self.total_tokens / self.total_requests if self.total_requests > 0 else 0
+            "average_tokens_per_request": self.total_tokens / self.total_requests if self.total_requests > 0 else 0,
+            "estimated_tokens_saved": self.tokens_saved
         } 
\ No newline at end of file
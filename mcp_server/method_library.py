@@ -0,0 +1,163 @@
+import re
+import logging
+from typing import Dict, List
+from .abi_analyzer import FunctionDefinition, FunctionParameter, FunctionType
+from .template_engine import TemplateMethodGenerator
+
+logger = logging.getLogger(__name__)
+
+# Environment variable holding the shared method library location
+LIBRARY_ENV_VAR = 'MCP_METHOD_LIBRARY'
+
+# Canonical functions of the common token standards. Each function is listed
+# with the parameter names used by the EIP reference interfaces and by the
+# OpenZeppelin implementations most contracts are built from, since the names
+# end up in the generated signatures and therefore in the cache key. Every
+# entry is seeded both with and without output names.
+STANDARD_SIGNATURES: Dict[str, List[str]] = {
+    'ERC20': [
+        "function name() view returns (string)",
+        "function symbol() view returns (string)",
+        "function decimals() view returns (uint8)",
+        "function totalSupply() view returns (uint256)",
+        "function balanceOf(address account) view returns (uint256)",
+        "function balanceOf(address _owner) view returns (uint256 balance)",
+        "function allowance(address owner, address spender) view returns (uint256)",
+        "function allowance(address _owner, address _spender) view returns (uint256 remaining)",
+        "function transfer(address to, uint256 amount) returns (bool)",
+        "function transfer(address to, uint256 value) returns (bool)",
+        "function transfer(address _to, uint256 _value) returns (bool success)",
+        "function approve(address spender, uint256 amount) returns (bool)",
+        "function approve(address spender, uint256 value) returns (bool)",
+        "function approve(address _spender, uint256 _value) returns (bool success)",
+        "function transferFrom(address from, address to, uint256 amount) returns (bool)",
+        "function transferFrom(address from, address to, uint256 value) returns (bool)",
+        "function transferFrom(address _from, address _to, uint256 _value) returns (bool success)",
+        "function increaseAllowance(address spender, uint256 addedValue) returns (bool)",
+        "function decreaseAllowance(address spender, uint256 subtractedValue) returns (bool)",
+    ],
+    'ERC721': [
+        "function name() view returns (string)",
+        "function symbol() view returns (string)",
+        "function totalSupply() view returns (uint256)",
+        "function supportsInterface(bytes4 interfaceId) view returns (bool)",
+        "function balanceOf(address owner) view returns (uint256)",
+        "function balanceOf(address _owner) view returns (uint256)",
+        "function ownerOf(uint256 tokenId) view returns (address)",
+        "function ownerOf(uint256 _tokenId) view returns (address)",
+        "function tokenURI(uint256 tokenId) view returns (string)",
+        "function tokenURI(uint256 _tokenId) view returns (string)",
+        "function tokenByIndex(uint256 index) view returns (uint256)",
+        "function tokenOfOwnerByIndex(address owner, uint256 index) view returns (uint256)",
+        "function getApproved(uint256 tokenId) view returns (address)",
+        "function getApproved(uint256 _tokenId) view returns (address)",
+        "function isApprovedForAll(address owner, address operator) view returns (bool)",
+        "function isApprovedForAll(address _owner, address _operator) view returns (bool)",
+        "function approve(address to, uint256 tokenId)",
+        "function approve(address _approved, uint256 _tokenId) payable",
+        "function setApprovalForAll(address operator, bool approved)",
+        "function setApprovalForAll(address _operator, bool _approved)",
+        "function transferFrom(address from, address to, uint256 tokenId)",
+        "function transferFrom(address _from, address _to, uint256 _tokenId) payable",
+        "function safeTransferFrom(address from, address to, uint256 tokenId)",
+        "function safeTransferFrom(address from, address to, uint256 tokenId, bytes data)",
+        "function safeTransferFrom(address _from, address _to, uint256 _tokenId) payable",
+        "function safeTransferFrom(address _from, address _to, uint256 _tokenId, bytes data) payable",
+    ],
+    'ERC1155': [
+        "function supportsInterface(bytes4 interfaceId) view returns (bool)",
+        "function uri(uint256 _id) view returns (string)",
+        "function balanceOf(address account, uint256 id) view returns (uint256)",
+        "function balanceOf(address _owner, uint256 _id) view returns (uint256)",
+        "function balanceOfBatch(address[] accounts, uint256[] ids) view returns (uint256[])",
+        "function balanceOfBatch(address[] _owners, uint256[] _ids) view returns (uint256[])",
+        "function isApprovedForAll(address account, address operator) view returns (bool)",
+        "function isApprovedForAll(address _owner, address _operator) view returns (bool)",
+        "function setApprovalForAll(address operator, bool approved)",
+        "function setApprovalForAll(address _operator, bool _approved)",
+        "function safeTransferFrom(address from, address to, uint256 id, uint256 amount, bytes data)",
+        "function safeTransferFrom(address from, address to, uint256 id, uint256 value, bytes data)",
+        "function safeTransferFrom(address _from, address _to, uint256 _id, uint256 _value, bytes _data)",
+        "function safeBatchTransferFrom(address from, address to, uint256[] ids, uint256[] amounts, bytes data)",
+        "function safeBatchTransferFrom(address from, address to, uint256[] ids, uint256[] values, bytes data)",
+        "function safeBatchTransferFrom(address _from, address _to, uint256[] _ids, uint256[] _values, bytes _data)",
+    ],
+    'ERC4626': [
+        "function asset() view returns (address assetTokenAddress)",
+        "function totalAssets() view returns (uint256 totalManagedAssets)",
+        "function convertToShares(uint256 assets) view returns (uint256 shares)",
+        "function convertToAssets(uint256 shares) view returns (uint256 assets)",
+        "function maxDeposit(address receiver) view returns (uint256 maxAssets)",
+        "function previewDeposit(uint256 assets) view returns (uint256 shares)",
+        "function deposit(uint256 assets, address receiver) returns (uint256 shares)",
+        "function maxMint(address receiver) view returns (uint256 maxShares)",
+        "function previewMint(uint256 shares) view returns (uint256 assets)",
+        "function mint(uint256 shares, address receiver) returns (uint256 assets)",
+        "function maxWithdraw(address owner) view returns (uint256 maxAssets)",
+        "function previewWithdraw(uint256 assets) view returns (uint256 shares)",
+        "function withdraw(uint256 assets, address receiver, address owner) returns (uint256 shares)",
+        "function maxRedeem(address owner) view returns (uint256 maxShares)",
+        "function previewRedeem(uint256 shares) view returns (uint256 assets)",
+        "function redeem(uint256 shares, address receiver, address owner) returns (uint256 assets)",
+    ],
+}
+
+_SIGNATURE_PATTERN = re.compile(
+    r"^function (\w+)\(([^)]*)\)((?: \w+)*?)(?: returns \(([^)]*)\))?$"
+)
+
+def _parse_parameters(text: str) -> List[FunctionParameter]:
+    params = []
+    for item in filter(None, (p.strip() for p in text.split(','))):
+        type_, _, name = item.partition(' ')
+        params.append(FunctionParameter(name=name, type=type_))
+    return params
+
+def parse_signature(text: str) -> FunctionDefinition:
+    """Parse a human readable signature such as ``function decimals() view returns (uint8)``."""
+    match = _SIGNATURE_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid function signature: {text}")
+    name, inputs, modifiers, outputs = match.groups()
+    mutability = modifiers.split()[-1] if modifiers.strip() else 'nonpayable'
+    return FunctionDefinition(
+        name=name,
+        inputs=_parse_parameters(inputs),
+        outputs=_parse_parameters(outputs or ''),
+        state_mutability=FunctionType(mutability)
+    )
+
+def standard_functions() -> List[FunctionDefinition]:
+    """Every standard function variant the library is pre-warmed with."""
+    functions = []
+    for signatures in STANDARD_SIGNATURES.values():
+        for signature in signatures:
+            function = parse_signature(signature)
+            functions.append(function)
+            if any(p.name for p in function.outputs):
+                functions.append(FunctionDefinition(
+                    name=function.name,
+                    inputs=function.inputs,
+                    outputs=[FunctionParameter(name='', type=p.type) for p in function.outputs],
+                    state_mutability=function.state_mutability
+                ))
+    return functions
+
+def prewarm_library(llm_generator) -> int:
+    """
+    Seed a method cache with implementations of the standard functions.
+
+    Implementations are rendered by the template engine and stored under the
+    same keys ``llm_generator`` looks up, so generating a standard-compliant
+    contract needs no LLM calls. Entries already present are left alone.
+    Returns the number of entries added.
+    """
+    added = 0
+    for function in standard_functions():
+        # Rendered one at a time: overloads only clash within a contract
+        implementation = TemplateMethodGenerator([function]).render(function)
+        if llm_generator.seed_implementation(function, implementation):
+            added += 1
+    if added:
+        logger.info(f"Pre-warmed method library with {added} standard implementations")
+    return added
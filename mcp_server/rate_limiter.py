@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+import re
+import time
+import logging
+from typing import Optional
+
+# OpenAI embeds the suggested back-off in the error message, e.g.
+# "Rate limit reached ... Please try again in 6.5s."
+_RETRY_AFTER_PATTERN = re.compile(r"Please try again in (\d+(?:\.\d+)?)(ms|s)")
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """Extract the retry delay (in seconds) suggested by a rate limit error."""
+    match = _RETRY_AFTER_PATTERN.search(str(error))
+    if not match:
+        return None
+    wait_time = float(match.group(1))
+    if match.group(2) == "ms":
+        wait_time /= 1000
+    return wait_time
+
+class TokenBucket:
+    """
+    Async token bucket shared by every concurrent LLM request.
+
+    ``rate`` is the steady-state number of requests per second (``None``
+    disables the steady-state limit). Rate limit hints from the API are fed
+    back through ``pause`` so that all workers hold off together instead of
+    each one hammering the endpoint with its own retries.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: int = 1):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        # Created lazily so the lock binds to the loop that uses it (Python < 3.10)
+        self._lock: Optional[asyncio.Lock] = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: Optional[float], capacity: int = 1) -> 'TokenBucket':
+        """Create a bucket from a requests-per-minute budget."""
+        rate = requests_per_minute / 60 if requests_per_minute else None
+        return cls(rate=rate, capacity=capacity)
+
+    def _refill(self, now: float):
+        if self.rate is None:
+            self._tokens = float(self.capacity)
+        else:
+            elapsed = now - self._last_refill
+            self._tokens = min(float(self.capacity), self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        # The lock keeps waiters in FIFO order; only the head of the queue sleeps
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Block all workers for ``seconds`` and drain the burst allowance."""
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._paused_until:
+            self.logger.warning(f"Rate limit hit, pausing all LLM requests for {seconds}s")
+            self._paused_until = resume_at
+        self._tokens = 0.0
+        self._last_refill = max(self._last_refill, resume_at)
+
+class SharedTokenBucket:
+    """
+    Token bucket shared by several processes.
+
+    Same interface as ``TokenBucket``, but the bucket state lives in shared
+    memory, so every worker process of a pool draws from one request budget
+    and a rate limit hint seen by any worker pauses all of them. Pass it to
+    worker processes when they are started (e.g. via a pool initializer).
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: int = 1, context=None):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        context = context or multiprocessing.get_context()
+        # tokens, last refill time, paused-until time (CLOCK_MONOTONIC is system wide)
+        self._state = context.Array('d', [float(capacity), time.monotonic(), 0.0])
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: Optional[float], capacity: int = 1, context=None) -> 'SharedTokenBucket':
+        """Create a bucket from a requests-per-minute budget."""
+        rate = requests_per_minute / 60 if requests_per_minute else None
+        return cls(rate=rate, capacity=capacity, context=context)
+
+    def _try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return how long to wait."""
+        with self._state.get_lock():
+            tokens, last_refill, paused_until = self._state[:]
+            now = time.monotonic()
+            if now < paused_until:
+                return paused_until - now
+            if self.rate is None:
+                tokens = float(self.capacity)
+            else:
+                tokens = min(float(self.capacity), tokens + (now - last_refill) * self.rate)
+            if tokens >= 1:
+                self._state[0], self._state[1] = tokens - 1, now
+                return 0.0
+            self._state[0], self._state[1] = tokens, now
+            return (1 - tokens) / self.rate
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        while True:
+            wait_time = self._try_acquire()
+            if wait_time <= 0:
+                return
+            await asyncio.sleep(wait_time)
+
+    def pause(self, seconds: float):
+        """Block all workers in all processes for ``seconds``."""
+        with self._state.get_lock():
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._state[2]:
+                self.logger.warning(f"Rate limit hit, pausing all LLM requests for {seconds}s")
+                self._state[2] = resume_at
+            self._state[0] = 0.0
+            self._state[1] = max(self._state[1], resume_at)
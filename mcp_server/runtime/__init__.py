@@ -0,0 +1,7 @@
+"""
+Runtime support modules for generated MCP servers.
+
+These modules are copied verbatim into each generated server's ``runtime``
+package, so they may only depend on the standard library and on packages
+the generated server already requires.
+"""
@@ -0,0 +1,220 @@
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import aiohttp
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.contracts import encode_abi
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from .codec import MethodCodec
+
+# Multicall3.aggregate3((address,bool,bytes)[]) -> (bool,bytes)[]
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+# Error(string), the ABI encoding of revert("reason")
+ERROR_STRING_SELECTOR = bytes.fromhex("08c379a0")
+
+class BatchCallError(Exception):
+    """A single call in a batch failed; other calls are unaffected."""
+
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(detail)
+
+@dataclass
+class ViewCall:
+    """An encoded view call awaiting execution."""
+    method: str
+    calldata: bytes
+    output_types: List[str]
+    # Decodes the return data when the call was encoded by a precompiled codec
+    codec: Optional[MethodCodec] = None
+
+def bind_args(function_abi: Dict[str, Any], params: Dict[str, Any]) -> List[Any]:
+    """
+    Order request params by the function's ABI inputs.
+
+    Inputs named after Python keywords may also be passed with a trailing
+    underscore (``from_``), matching the generated method signatures.
+    """
+    args = []
+    expected = set()
+    for index, item in enumerate(function_abi.get('inputs', [])):
+        name = item.get('name') or f"arg{index}"
+        for key in (name, f"{name}_"):
+            if key in params:
+                args.append(params[key])
+                expected.add(key)
+                break
+        else:
+            raise BatchCallError(422, f"Missing parameter: {name}")
+    unexpected = set(params) - expected
+    if unexpected:
+        raise BatchCallError(422, f"Unexpected parameters: {', '.join(sorted(unexpected))}")
+    return args
+
+def encode_view_call(contract, method: str, params: Dict[str, Any],
+                     function_abi: Optional[Dict[str, Any]] = None,
+                     codec: Optional[MethodCodec] = None) -> ViewCall:
+    """
+    Encode a view method call against a web3 contract object.
+
+    With a precompiled ``codec`` the call is encoded (and later decoded)
+    without web3. Otherwise pass the ``function_abi`` entry to encode
+    overloaded functions; without it the function is looked up by name.
+    """
+    if codec is not None:
+        args = bind_args({'inputs': codec.inputs}, params)
+        try:
+            calldata = codec.encode(args)
+        except Exception as e:
+            raise BatchCallError(422, f"Invalid parameters for {method}: {e}")
+        return ViewCall(method=method, calldata=calldata, output_types=codec.output_types, codec=codec)
+    if function_abi is None:
+        try:
+            function_abi = contract.get_function_by_name(method).abi
+        except ValueError as e:
+            raise BatchCallError(404, str(e))
+    args = bind_args(function_abi, params)
+    try:
+        selector = "0x" + function_abi_to_4byte_selector(function_abi).hex()
+        calldata = encode_abi(contract.w3, function_abi, args, data=selector)
+    except Exception as e:
+        raise BatchCallError(422, f"Invalid parameters for {method}: {e}")
+    return ViewCall(method=method, calldata=bytes.fromhex(calldata[2:]),
+                    output_types=get_abi_output_types(function_abi))
+
+def decode_return_data(call: ViewCall, data: bytes) -> Any:
+    """Decode return data the same way web3's ``.call()`` does."""
+    if call.codec is not None:
+        try:
+            return call.codec.decode(data)
+        except Exception as e:
+            raise BatchCallError(500, f"Could not decode {call.method} result: {e}")
+    try:
+        values = decode(call.output_types, data)
+    except Exception as e:
+        raise BatchCallError(500, f"Could not decode {call.method} result: {e}")
+    values = map_abi_data(BASE_RETURN_NORMALIZERS, call.output_types, values)
+    if len(values) == 1:
+        return values[0]
+    return list(values)
+
+def decode_revert_reason(data: bytes) -> str:
+    """Turn revert data into a human readable message."""
+    if data[:4] == ERROR_STRING_SELECTOR:
+        try:
+            return f"execution reverted: {decode(['string'], data[4:])[0]}"
+        except Exception:
+            pass
+    return "execution reverted"
+
+def encode_aggregate3(target: str, calls: Sequence[ViewCall]) -> bytes:
+    """Encode a Multicall3 aggregate3 call that allows individual failures."""
+    return AGGREGATE3_SELECTOR + encode(
+        ['(address,bool,bytes)[]'],
+        [[(target, True, call.calldata) for call in calls]]
+    )
+
+def decode_aggregate3(data: bytes) -> List[Tuple[bool, bytes]]:
+    return decode(['(bool,bytes)[]'], data)[0]
+
+async def execute_multicall(web3, multicall_address: str, target: str,
+                            calls: Sequence[ViewCall], block_identifier: Any,
+                            max_batch_size: int = 500) -> List[Any]:
+    """
+    Run view calls as Multicall3 ``aggregate3`` eth_calls of up to
+    ``max_batch_size`` calls each.
+
+    Returns one entry per call: the decoded value, or a ``BatchCallError``.
+    """
+    results: List[Any] = []
+    for start in range(0, len(calls), max_batch_size):
+        chunk = calls[start:start + max_batch_size]
+        data = await web3.eth.call(
+            {"to": multicall_address, "data": "0x" + encode_aggregate3(target, chunk).hex()},
+            block_identifier
+        )
+        for call, (success, return_data) in zip(chunk, decode_aggregate3(bytes(data))):
+            if not success:
+                reason = decode_revert_reason(return_data)
+                results.append(BatchCallError(500, f"Failed to execute {call.method}: {reason}"))
+                continue
+            try:
+                results.append(decode_return_data(call, return_data))
+            except BatchCallError as e:
+                results.append(e)
+    return results
+
+async def execute_json_rpc_batch(session: aiohttp.ClientSession, node_url: str, target: str,
+                                 calls: Sequence[ViewCall], block_identifier: Any,
+                                 max_batch_size: int = 500) -> List[Any]:
+    """
+    Run view calls as JSON-RPC batches of ``eth_call`` requests.
+
+    Returns one entry per call: the decoded value, or a ``BatchCallError``.
+    """
+    block_tag = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+    results: List[Any] = []
+    ids = itertools.count()
+    for start in range(0, len(calls), max_batch_size):
+        chunk = calls[start:start + max_batch_size]
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": next(ids),
+                "method": "eth_call",
+                "params": [{"to": target, "data": "0x" + call.calldata.hex()}, block_tag]
+            }
+            for call in chunk
+        ]
+        async with session.post(node_url, json=payload) as response:
+            response.raise_for_status()
+            body = await response.json(content_type=None)
+        if not isinstance(body, list):
+            # Nodes without batch support answer with a single error object
+            message = body.get("error", {}).get("message", "invalid batch response")
+            raise BatchCallError(502, f"Node rejected JSON-RPC batch: {message}")
+
+        by_id = {item.get("id"): item for item in body}
+        for request, call in zip(payload, chunk):
+            item = by_id.get(request["id"])
+            if item is None:
+                results.append(BatchCallError(502, f"No response for {call.method}"))
+            elif "error" in item:
+                error = item["error"]
+                reason = error.get("message", "eth_call failed")
+                data = error.get("data")
+                if isinstance(data, str) and data.startswith("0x") and len(data) > 2:
+                    reason = decode_revert_reason(bytes.fromhex(data[2:]))
+                results.append(BatchCallError(500, f"Failed to execute {call.method}: {reason}"))
+            else:
+                try:
+                    results.append(decode_return_data(call, bytes.fromhex(item["result"][2:])))
+                except BatchCallError as e:
+                    results.append(e)
+    return results
+
+async def eth_call_raw(session: aiohttp.ClientSession, node_url: str, target: str, calldata: str,
+                       block_identifier: Any) -> str:
+    """
+    Forward hex calldata as a single ``eth_call`` and return the raw hex result.
+
+    Nothing is decoded or re-encoded on the way, so callers that already
+    hold calldata skip the codec entirely.
+    """
+    block_tag = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+    payload = {"jsonrpc": "2.0", "id": 0, "method": "eth_call",
+               "params": [{"to": target, "data": calldata}, block_tag]}
+    async with session.post(node_url, json=payload) as response:
+        response.raise_for_status()
+        body = await response.json(content_type=None)
+    if "error" in body:
+        error = body["error"]
+        reason = error.get("message", "eth_call failed")
+        data = error.get("data")
+        if isinstance(data, str) and data.startswith("0x") and len(data) > 2:
+            reason = decode_revert_reason(bytes.fromhex(data[2:]))
+        raise BatchCallError(500, reason)
+    return body["result"]
@@ -0,0 +1,139 @@
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.encoding import TupleEncoder
+from eth_abi.registry import registry
+from eth_utils import to_checksum_address
+
+# Checksumming hashes the address, and the same addresses turn up again and again
+# in requests, results and logs
+checksum_address = lru_cache(maxsize=16384)(to_checksum_address)
+
+# Block that codec calls read when not given one; the server pins it per request so a
+# read cached under a block number really comes from that block
+pinned_block: ContextVar = ContextVar("pinned_block", default="latest")
+
+# Converts one request value (or decoded value) of a given ABI type; None means unchanged
+Normalizer = Optional[Callable[[Any], Any]]
+
+def canonical_type(param: Dict[str, Any]) -> str:
+    """The canonical type of an ABI parameter, with tuples spelled out: ``(address,uint256)[]``."""
+    abi_type = param['type']
+    if not abi_type.startswith('tuple'):
+        return abi_type
+    components = ','.join(canonical_type(c) for c in param.get('components', []))
+    return f"({components}){abi_type[len('tuple'):]}"
+
+def _array_dimensions(param: Dict[str, Any]) -> int:
+    return param['type'].count('[')
+
+def _element(param: Dict[str, Any]) -> Dict[str, Any]:
+    """The ABI parameter for one element of an array parameter."""
+    return {**param, 'type': param['type'][:param['type'].rindex('[')]}
+
+def _hex_to_bytes(value: Any) -> Any:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value[:2] in ('0x', '0X') else value)
+    return value
+
+def _input_normalizer(param: Dict[str, Any]) -> Normalizer:
+    """Build the converter from JSON request values to what eth_abi encodes, or None."""
+    if _array_dimensions(param):
+        element = _input_normalizer(_element(param))
+        if element is None:
+            return None
+        return lambda values: [element(value) for value in values]
+    abi_type = param['type']
+    if abi_type == 'tuple':
+        components = param.get('components', [])
+        names = [c.get('name') for c in components]
+        normalizers = [_input_normalizer(c) for c in components]
+
+        def normalize_tuple(value):
+            # Structs may be passed as objects keyed by component name
+            if isinstance(value, dict):
+                value = [value[name] for name in names]
+            return tuple(v if normalize is None else normalize(v) for v, normalize in zip(value, normalizers))
+        return normalize_tuple
+    if abi_type.startswith('bytes'):
+        return _hex_to_bytes
+    return None
+
+def _output_normalizer(param: Dict[str, Any]) -> Normalizer:
+    """
+    Build the converter applied to decoded values, or None.
+
+    Like web3, addresses are checksummed and arrays returned as lists.
+    """
+    if _array_dimensions(param):
+        element = _output_normalizer(_element(param))
+        if element is None:
+            return list
+        return lambda values: [element(value) for value in values]
+    abi_type = param['type']
+    if abi_type == 'tuple':
+        normalizers = [_output_normalizer(c) for c in param.get('components', [])]
+        if all(normalize is None for normalize in normalizers):
+            return None
+        return lambda value: tuple(
+            v if normalize is None else normalize(v) for v, normalize in zip(value, normalizers)
+        )
+    if abi_type == 'address':
+        return checksum_address
+    return None
+
+class MethodCodec:
+    """
+    Calldata encoder and return data decoder for one contract function.
+
+    Generated servers build one per function at import time, so the
+    selector, the eth_abi coders and the value converters are resolved once
+    rather than looked up from the ABI on every request. Results match
+    web3's ``.call()``: one output is returned as is, several as a list.
+    """
+
+    def __init__(self, signature: str, selector: str, inputs: Sequence[Dict[str, Any]],
+                 outputs: Sequence[Dict[str, Any]]):
+        self.signature = signature
+        self.selector = bytes.fromhex(selector[2:])
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.input_types = [canonical_type(p) for p in inputs]
+        self.output_types = [canonical_type(p) for p in outputs]
+        self._encoder = TupleEncoder(encoders=[registry.get_encoder(t) for t in self.input_types])
+        self._decoder = TupleDecoder(decoders=[registry.get_decoder(t) for t in self.output_types])
+        self._input_normalizers = [_input_normalizer(p) for p in inputs]
+        self._output_normalizers = [_output_normalizer(p) for p in outputs]
+        self._normalize_inputs = any(n is not None for n in self._input_normalizers)
+        self._normalize_outputs = any(n is not None for n in self._output_normalizers)
+
+    def encode(self, args: Sequence[Any]) -> bytes:
+        """Encode positional arguments as calldata, selector included."""
+        if len(args) != len(self.input_types):
+            raise ValueError(f"{self.signature} takes {len(self.input_types)} arguments, got {len(args)}")
+        if self._normalize_inputs:
+            args = [a if normalize is None else normalize(a) for a, normalize in zip(args, self._input_normalizers)]
+        return self.selector + self._encoder(args)
+
+    def decode(self, data: bytes) -> Any:
+        """Decode return data the way web3's ``.call()`` does."""
+        values = self._decoder(ContextFramesBytesIO(data))
+        if self._normalize_outputs:
+            values = [v if normalize is None else normalize(v) for v, normalize in zip(values, self._output_normalizers)]
+        if len(values) == 1:
+            return values[0]
+        return list(values)
+
+    async def call(self, state, *args, block_identifier: Any = None) -> Any:
+        """
+        Run the function as an ``eth_call`` against the state's contract and decode the result.
+
+        Reads ``block_identifier``, by default the block pinned for the
+        current request (``pinned_block``), or else the latest block.
+        """
+        data = await state.web3.eth.call(
+            {"to": state.contract.address, "data": "0x" + self.encode(args).hex()},
+            pinned_block.get() if block_identifier is None else block_identifier
+        )
+        return self.decode(bytes(data))
@@ -0,0 +1,127 @@
+import json
+import base64
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+# "number" emits integers as JSON numbers (exact, but unsafe above 2**53 for
+# JavaScript clients); "string" and "hex" emit every integer as a string.
+INTEGER_ENCODINGS = ("number", "string", "hex")
+BYTES_ENCODINGS = ("hex", "base64")
+
+# The integers orjson can write natively
+_ORJSON_INT_MIN = -2**63
+_ORJSON_INT_MAX = 2**64 - 1
+# Leaf types orjson writes with no large integer inside
+_ORJSON_LEAVES = frozenset({str, bool, float, type(None)})
+# Raw JSON values, in orjson 3.9 and later
+_Fragment = getattr(orjson, "Fragment", None)
+
+class ResultEncoder:
+    """
+    Encodes response payloads straight to JSON bytes.
+
+    Contract results are plain data (dicts, lists, tuples, ints, bools,
+    strings and bytes), so they are serialized without any model validation.
+    Only results go through ``convert``; request context is echoed verbatim.
+    orjson is used when it is installed. Integers beyond its 64-bit range,
+    such as most uint256 amounts, are passed to it as raw JSON numbers
+    (``orjson.Fragment``, orjson 3.9+), so they are still written exactly;
+    older orjson versions fall back to the standard library encoder.
+    """
+
+    def __init__(self, integers: str = "number", bytes_encoding: str = "hex"):
+        if integers not in INTEGER_ENCODINGS:
+            raise ValueError(f"Unknown integer encoding {integers!r}, expected one of {', '.join(INTEGER_ENCODINGS)}")
+        if bytes_encoding not in BYTES_ENCODINGS:
+            raise ValueError(f"Unknown bytes encoding {bytes_encoding!r}, expected one of {', '.join(BYTES_ENCODINGS)}")
+        self.integers = integers
+        self.bytes_encoding = bytes_encoding
+        self._encode_integer: Callable[[int], Any] = {"number": int, "string": str, "hex": hex}[integers]
+
+    def _encode_bytes(self, value: bytes) -> str:
+        if self.bytes_encoding == "base64":
+            return base64.b64encode(value).decode()
+        return "0x" + bytes(value).hex()
+
+    def _default(self, value: Any) -> Any:
+        """Encode the types JSON has no representation for."""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return self._encode_bytes(bytes(value))
+        if isinstance(value, Mapping):
+            # e.g. web3's AttributeDict
+            return dict(value)
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def convert(self, value: Any) -> Any:
+        """Apply the integer encoding (and bytes encoding) throughout a contract result."""
+        if self.integers == "number":
+            # Left to encode(), which writes integers as numbers and bytes via _default
+            return value
+        return self._convert(value)
+
+    def _convert(self, value: Any) -> Any:
+        if isinstance(value, bool) or value is None or isinstance(value, (str, float)):
+            return value
+        if isinstance(value, int):
+            return self._encode_integer(value)
+        if isinstance(value, (list, tuple)):
+            return [self._convert(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._convert(item) for key, item in value.items()}
+        return self._convert(self._default(value))
+
+    def _orjson_safe(self, value: Any) -> Any:
+        """Replace the integers orjson can't write, throughout a payload, with raw JSON numbers."""
+        kind = type(value)
+        if kind is list or kind is tuple:
+            # Leaves are checked inline; a call per item would cost more than the whole orjson pass
+            safe = []
+            for item in value:
+                item_kind = type(item)
+                if item_kind in _ORJSON_LEAVES:
+                    safe.append(item)
+                elif item_kind is int:
+                    safe.append(item if _ORJSON_INT_MIN <= item <= _ORJSON_INT_MAX else _Fragment(str(item)))
+                elif item_kind is bytes:
+                    # Saves orjson a call back into _default
+                    safe.append(self._encode_bytes(item))
+                else:
+                    safe.append(self._orjson_safe(item))
+            return safe
+        if kind is int:
+            return value if _ORJSON_INT_MIN <= value <= _ORJSON_INT_MAX else _Fragment(str(value))
+        if isinstance(value, Mapping):
+            return {key: self._orjson_safe(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            # e.g. NamedTuple
+            return self._orjson_safe(list(value))
+        if isinstance(value, int) and not isinstance(value, bool):
+            # e.g. IntEnum
+            return self._orjson_safe(int(value))
+        return value
+
+    def encode(self, payload: Any) -> bytes:
+        """Serialize a payload, with results already ``convert``ed, to compact JSON bytes."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(payload, default=self._default)
+            except TypeError:
+                # Most likely an integer beyond 64 bits; orjson stops at the first one, so this is cheap
+                pass
+            if _Fragment is not None:
+                try:
+                    return orjson.dumps(self._orjson_safe(payload), default=self._default)
+                except TypeError:
+                    # e.g. a large integer in a value only _default converts, such as a set
+                    pass
+        return json.dumps(payload, separators=(",", ":"), default=self._default).encode()
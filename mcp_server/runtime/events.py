@@ -0,0 +1,109 @@
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_hash.auto import keccak
+from .codec import _output_normalizer, canonical_type
+from .validation import ParamError, address, dynamic_bytes, fixed_bytes, integer, number, string
+
+def _is_hashed(param: Dict[str, Any]) -> bool:
+    """Whether an indexed parameter is logged as the keccak hash of its value rather than the value."""
+    return param['type'] in ('string', 'bytes') or param['type'].startswith('tuple') or '[' in param['type']
+
+def _integer_bounds(abi_type: str) -> Tuple[int, int]:
+    """The smallest and largest value of an ``intN`` or ``uintN``."""
+    unsigned = abi_type.startswith('u')
+    bits = int(abi_type[len('uint' if unsigned else 'int'):] or 256)
+    if unsigned:
+        return 0, 2 ** bits - 1
+    return -2 ** (bits - 1), 2 ** (bits - 1) - 1
+
+def _topic_encoder(param: Dict[str, Any]) -> Callable[[Any, str], bytes]:
+    """
+    Build the converter from a filter value (as given in a query string) to
+    the 32-byte topic an indexed parameter is logged as.
+    """
+    abi_type = param['type']
+    if abi_type == 'string':
+        return lambda value, path: keccak(string(value, path).encode())
+    if abi_type == 'bytes':
+        return lambda value, path: keccak(bytes.fromhex(dynamic_bytes(value, path)[2:]))
+    if _is_hashed(param):
+        def unsupported(value, path):
+            raise ParamError(f"{path}: filtering on indexed {canonical_type(param)} values is not supported")
+        return unsupported
+    encoder = registry.get_encoder(abi_type)
+    if abi_type == 'address':
+        return lambda value, path: encoder(address(value, path))
+    if abi_type == 'bool':
+        def encode_bool(value, path):
+            if value not in (True, False, 'true', 'false'):
+                raise ParamError(f"{path}: expected true or false")
+            return encoder(value in (True, 'true'))
+        return encode_bool
+    if abi_type.startswith(('uint', 'int')):
+        low, high = _integer_bounds(abi_type)
+        return lambda value, path: encoder(integer(value, low, high, abi_type, path))
+    if abi_type.startswith('bytes'):
+        size = int(abi_type[len('bytes'):])
+        return lambda value, path: encoder(bytes.fromhex(fixed_bytes(value, size, path)[2:]))
+    # Fixed point numbers, which eth_abi encodes from Decimals
+    def encode_fixed(value, path):
+        try:
+            return encoder(Decimal(str(number(value, path))))
+        except (ArithmeticError, ValueError) as e:
+            raise ParamError(f"{path}: {e}")
+    return encode_fixed
+
+class EventDecoder:
+    """
+    Decoder for one event's logs, and encoder of filter values for its indexed parameters.
+
+    Like ``MethodCodec``, generated servers build one per event at import
+    time, so the topic, the eth_abi decoders and the value converters are
+    resolved once. Indexed strings, bytes, arrays and structs are only
+    logged as a hash, so they decode to that 32-byte hash.
+    """
+
+    def __init__(self, signature: str, topic: str, inputs: Sequence[Dict[str, Any]]):
+        self.signature = signature
+        self.name = signature.split('(')[0]
+        self.topic = topic
+        self.inputs = list(inputs)
+        self.names = [p.get('name') or f'arg{i}' for i, p in enumerate(inputs)]
+        indexed = [p for p in inputs if p.get('indexed')]
+        data = [p for p in inputs if not p.get('indexed')]
+        # Name of each indexed parameter, in topic order (topic1, topic2, topic3)
+        self.indexed = [name for name, p in zip(self.names, inputs) if p.get('indexed')]
+        self._indexed_positions = [i for i, p in enumerate(inputs) if p.get('indexed')]
+        self._data_positions = [i for i, p in enumerate(inputs) if not p.get('indexed')]
+        self._topic_decoders = [None if _is_hashed(p) else registry.get_decoder(canonical_type(p)) for p in indexed]
+        self._topic_normalizers = [None if _is_hashed(p) else _output_normalizer(p) for p in indexed]
+        self._data_decoder = TupleDecoder(decoders=[registry.get_decoder(canonical_type(p)) for p in data])
+        self._data_normalizers = [_output_normalizer(p) for p in data]
+        self._topic_encoders = {name: _topic_encoder(p) for name, p in zip(self.indexed, indexed)}
+
+    def decode(self, topics: Sequence[str], data: str) -> Dict[str, Any]:
+        """Decode a log's hex topics and data into its arguments, by parameter name in ABI order."""
+        if len(topics) != len(self.indexed) + 1:
+            raise ValueError(f"{self.signature} logs {len(self.indexed)} indexed values, got {len(topics) - 1}")
+        values: List[Any] = [None] * len(self.inputs)
+        for position, topic, decoder, normalize in zip(
+                self._indexed_positions, topics[1:], self._topic_decoders, self._topic_normalizers):
+            value = bytes.fromhex(topic[2:])
+            if decoder is not None:
+                value = decoder(ContextFramesBytesIO(value))
+                if normalize is not None:
+                    value = normalize(value)
+            values[position] = value
+        decoded = self._data_decoder(ContextFramesBytesIO(bytes.fromhex(data[2:])))
+        for position, value, normalize in zip(self._data_positions, decoded, self._data_normalizers):
+            values[position] = value if normalize is None else normalize(value)
+        return dict(zip(self.names, values))
+
+    def topic_filter(self, name: str, value: Any) -> bytes:
+        """The topic an indexed parameter with this value is logged as; ParamError if invalid."""
+        encode = self._topic_encoders.get(name)
+        if encode is None:
+            raise ParamError(f"{name} is not an indexed parameter of {self.signature}")
+        return encode(value, name)
@@ -0,0 +1,276 @@
+import json
+import asyncio
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import aiohttp
+from .events import EventDecoder
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error codes and message fragments nodes and providers use to
+# refuse an eth_getLogs range as returning too many results
+_RANGE_ERROR_CODES = {-32005}
+_RANGE_ERROR_HINTS = ("more than", "too many", "limit exceeded", "too large", "response size", "block range",
+                     "limited to")
+
+class LogRangeTooLarge(Exception):
+    """The node refused an eth_getLogs block range; a smaller one may succeed."""
+
+def _is_range_error(error: Dict[str, Any]) -> bool:
+    message = str(error.get("message", "")).lower()
+    return error.get("code") in _RANGE_ERROR_CODES or any(hint in message for hint in _RANGE_ERROR_HINTS)
+
+async def fetch_logs(session: aiohttp.ClientSession, node_url: str, address: str, topics: Sequence[str],
+                     from_block: int, to_block: int) -> List[Dict[str, Any]]:
+    """
+    Fetch a contract's logs with any of ``topics`` as their event topic, as raw JSON-RPC log objects.
+
+    Raises ``LogRangeTooLarge`` when the node refuses the block range, or
+    times out on it.
+    """
+    payload = {"jsonrpc": "2.0", "id": 0, "method": "eth_getLogs", "params": [{
+        "address": address, "fromBlock": hex(from_block), "toBlock": hex(to_block), "topics": [list(topics)],
+    }]}
+    try:
+        async with session.post(node_url, json=payload) as response:
+            if response.status == 413:
+                raise LogRangeTooLarge(f"Response for blocks {from_block}-{to_block} is too large")
+            response.raise_for_status()
+            body = await response.json(content_type=None)
+    except asyncio.TimeoutError:
+        raise LogRangeTooLarge(f"eth_getLogs for blocks {from_block}-{to_block} timed out")
+    if "error" in body:
+        error = body["error"]
+        if _is_range_error(error):
+            raise LogRangeTooLarge(error.get("message", "block range too large"))
+        raise RuntimeError(f"eth_getLogs failed: {error.get('message', error)}")
+    return body["result"]
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    # Decimals, from fixed point parameters
+    return str(value)
+
+# One row of the logs table
+LogRow = Tuple[int, int, bytes, bytes, Optional[bytes], Optional[bytes], Optional[bytes], str]
+
+class LogStore:
+    """
+    SQLite store of a contract's decoded logs.
+
+    Logs are keyed by block and log index and indexed by event topic and by
+    the topic of each indexed argument, so filtered history queries are
+    index range scans. Decoded arguments are stored as JSON, with bytes as
+    hex. The checkpoint, the last block whose logs are all stored, is
+    committed in the same transaction as the logs, so an interrupted
+    indexer resumes exactly where it stopped. A store belongs to one
+    contract and set of event topics; opening it for others starts it over.
+    """
+
+    def __init__(self, path: Path, address: str, topics: Iterable[str]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Several server workers may index into, and read from, one database. Servers open the
+        # store on import and then use it from their event loop, which may run in another thread.
+        self._db = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                transaction_hash BLOB NOT NULL,
+                topic0 BLOB NOT NULL,
+                topic1 BLOB,
+                topic2 BLOB,
+                topic3 BLOB,
+                args TEXT NOT NULL,
+                PRIMARY KEY (block_number, log_index)
+            ) WITHOUT ROWID
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS logs_topic0 ON logs (topic0, block_number, log_index)")
+        for position in (1, 2, 3):
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS logs_topic{position} "
+                f"ON logs (topic{position}, topic0, block_number, log_index)"
+            )
+        identity = json.dumps({"address": address.lower(), "topics": sorted(t.lower() for t in topics)})
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'identity'").fetchone()
+        if row is None or row[0] != identity:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM logs")
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("INSERT INTO meta VALUES ('identity', ?)", (identity,))
+            self._db.execute("COMMIT")
+
+    @property
+    def checkpoint(self) -> Optional[int]:
+        """The last block whose logs are all stored, or None before the first sync."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        return None if row is None else row[0]
+
+    def add(self, rows: Sequence[LogRow], checkpoint: int):
+        """Store logs and advance the checkpoint to ``checkpoint``, atomically."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Another worker may already have indexed further
+            self._db.execute(
+                "INSERT INTO meta VALUES ('checkpoint', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (checkpoint,)
+            )
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def query(self, topic: bytes, filters: Optional[Mapping[int, Sequence[bytes]]] = None,
+              from_block: Optional[int] = None, to_block: Optional[int] = None,
+              after: Optional[Tuple[int, int]] = None, limit: int = 100,
+              descending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return stored logs of one event, in block order.
+
+        ``filters`` maps a topic position (1-3) to the topics it may hold.
+        ``after`` is the (block, log index) of the last log of the previous
+        page, in the requested order.
+        """
+        clauses, args = ["topic0 = ?"], [topic]
+        for position, values in sorted((filters or {}).items()):
+            clauses.append(f"topic{position} IN ({', '.join('?' * len(values))})")
+            args.extend(values)
+        if from_block is not None:
+            clauses.append("block_number >= ?")
+            args.append(from_block)
+        if to_block is not None:
+            clauses.append("block_number <= ?")
+            args.append(to_block)
+        if after is not None:
+            clauses.append(f"(block_number, log_index) {'<' if descending else '>'} (?, ?)")
+            args.extend(after)
+        order = "DESC" if descending else "ASC"
+        cursor = self._db.execute(
+            f"SELECT block_number, log_index, transaction_hash, args FROM logs WHERE {' AND '.join(clauses)} "
+            f"ORDER BY block_number {order}, log_index {order} LIMIT ?",
+            (*args, limit)
+        )
+        return [
+            {"block_number": block_number, "log_index": log_index,
+             "transaction_hash": "0x" + transaction_hash.hex(), "args": json.loads(log_args)}
+            for block_number, log_index, transaction_hash, log_args in cursor
+        ]
+
+    def close(self):
+        self._db.close()
+
+class LogIndexer:
+    """
+    Backfills a contract's logs into a ``LogStore`` and keeps following the chain.
+
+    ``get_logs(from_block, to_block)`` returns raw JSON-RPC logs for the
+    decoders' topics (see ``fetch_logs``). Block ranges are fetched in
+    chunks that adapt to the node: a range it refuses is halved and
+    retried, and after each accepted range the chunk grows by a quarter, up
+    to ``max_chunk_size``. Only blocks ``confirmations`` behind the head are
+    indexed, so stored logs are not rolled back by reorgs.
+    """
+
+    def __init__(self, store: LogStore, decoders: Mapping[str, EventDecoder],
+                 get_logs: Callable[[int, int], Awaitable[List[Dict[str, Any]]]],
+                 fetch_block_number: Callable[[], Awaitable[int]], start_block: int = 0,
+                 confirmations: int = 12, chunk_size: int = 2000, max_chunk_size: int = 100000):
+        if chunk_size < 1 or max_chunk_size < chunk_size:
+            raise ValueError("chunk_size must be at least 1 and at most max_chunk_size")
+        self.store = store
+        # Event topic (lowercase hex) -> decoder
+        self.decoders = {topic.lower(): decoder for topic, decoder in decoders.items()}
+        self.get_logs = get_logs
+        self.fetch_block_number = fetch_block_number
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.logs_indexed = 0
+        self.logs_skipped = 0
+        self.requests = 0
+        self.last_error: Optional[str] = None
+        # Created lazily so the lock binds to the loop that uses it (Python < 3.10)
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _rows(self, logs: Iterable[Dict[str, Any]]) -> List[LogRow]:
+        """Decode raw logs into store rows, skipping logs that don't match their event's ABI."""
+        rows = []
+        for log in logs:
+            topics = log.get("topics") or []
+            decoder = self.decoders.get(topics[0].lower()) if topics else None
+            if decoder is None or log.get("removed"):
+                self.logs_skipped += 1
+                continue
+            try:
+                args = decoder.decode(topics, log["data"])
+            except Exception as e:
+                # e.g. another contract's event with the same signature but different indexing
+                logger.debug("Skipping undecodable %s log: %s", decoder.signature, e)
+                self.logs_skipped += 1
+                continue
+            topic_bytes = [bytes.fromhex(topic[2:]) for topic in topics] + [None] * (4 - len(topics))
+            rows.append((
+                int(log["blockNumber"], 16), int(log["logIndex"], 16), bytes.fromhex(log["transactionHash"][2:]),
+                *topic_bytes, json.dumps(args, separators=(",", ":"), default=_json_default)
+            ))
+        return rows
+
+    async def sync(self) -> int:
+        """Index every block up to the head minus ``confirmations``; return the number of logs stored."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            head = await self.fetch_block_number() - self.confirmations
+            checkpoint = self.store.checkpoint
+            start = self.start_block if checkpoint is None else max(checkpoint + 1, self.start_block)
+            stored = 0
+            while start <= head:
+                end = min(start + self.chunk_size - 1, head)
+                self.requests += 1
+                try:
+                    logs = await self.get_logs(start, end)
+                except LogRangeTooLarge:
+                    if end == start:
+                        raise
+                    self.chunk_size = max(1, (end - start + 1) // 2)
+                    logger.debug("Block range %d-%d refused, retrying %d blocks at a time", start, end, self.chunk_size)
+                    continue
+                rows = self._rows(logs)
+                self.store.add(rows, end)
+                stored += len(rows)
+                start = end + 1
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size + max(1, self.chunk_size // 4))
+            self.logs_indexed += stored
+            return stored
+
+    async def run(self, poll_interval: float = 2.0):
+        """Sync every ``poll_interval`` seconds until cancelled; errors are logged and retried."""
+        while True:
+            try:
+                await self.sync()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event indexing failed: %s", e)
+                self.last_error = str(e)
+            await asyncio.sleep(poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checkpoint": self.store.checkpoint,
+            "chunk_size": self.chunk_size,
+            "logs_indexed": self.logs_indexed,
+            "logs_skipped": self.logs_skipped,
+            "requests": self.requests,
+            "last_error": self.last_error,
+        }
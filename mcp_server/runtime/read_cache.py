@@ -0,0 +1,145 @@
+import re
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_ADDRESS_PATTERN = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+def _normalize_value(value: Any) -> Any:
+    """Normalize a parameter so equivalent requests produce the same key."""
+    if isinstance(value, str) and _ADDRESS_PATTERN.match(value):
+        # Checksummed and lowercase addresses refer to the same account
+        return value.lower()
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    return value
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """Return a canonical string form of request parameters."""
+    return json.dumps(_normalize_value(params), sort_keys=True, separators=(",", ":"), default=str)
+
+def request_key(method_name: str, params: Dict[str, Any], block_number: Optional[int] = None) -> Tuple:
+    """
+    Build the cache/coalescing key for a read request.
+
+    ``block_number`` is None for immutable methods, whose results don't
+    depend on the block.
+    """
+    return (method_name, normalize_params(params), block_number)
+
+class BlockTracker:
+    """
+    Tracks the latest block number without a node round trip per request.
+
+    The block number is refreshed at most once every ``poll_interval``
+    seconds; concurrent callers share a single refresh.
+    """
+
+    def __init__(self, fetch_block_number: Callable[[], Awaitable[int]], poll_interval: float = 1.0):
+        self.fetch_block_number = fetch_block_number
+        self.poll_interval = poll_interval
+        self._block_number: Optional[int] = None
+        self._fetched_at = 0.0
+        # Created lazily so the lock binds to the loop that uses it (Python < 3.10)
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def current(self) -> int:
+        """Return the latest known block number."""
+        if self._block_number is not None and time.monotonic() - self._fetched_at < self.poll_interval:
+            return self._block_number
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._block_number is None or time.monotonic() - self._fetched_at >= self.poll_interval:
+                self._block_number = await self.fetch_block_number()
+                self._fetched_at = time.monotonic()
+        return self._block_number
+
+class ReadCache:
+    """
+    LRU + TTL cache for view/pure method results.
+
+    Entries are keyed by ``request_key`` (method name, normalized parameters
+    and block number), so a new block naturally invalidates them. Methods
+    marked immutable (e.g. ``name``, ``symbol``, ``decimals``) are keyed
+    without a block number and never expire, in a separate LRU store with
+    the same ``max_size``, so immutable views taking arguments can't grow
+    it without bound. A ``max_size`` of 0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 12.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._immutable: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) for a key."""
+        if key in self._immutable:
+            self._immutable.move_to_end(key)
+            self.hits += 1
+            return True, self._immutable[key]
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any, immutable: bool = False):
+        """Store a value, evicting the least recently used entries if full."""
+        if immutable:
+            self._immutable[key] = value
+            self._immutable.move_to_end(key)
+            while len(self._immutable) > self.max_size:
+                self._immutable.popitem(last=False)
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_call(self, key: Hashable, call: Callable[[], Awaitable[Any]],
+                          immutable: bool = False) -> Any:
+        """Serve a call from the cache, calling through on a miss."""
+        if not self.enabled:
+            return await call()
+        found, value = self.get(key)
+        if found:
+            return value
+        # Errors propagate and are never cached
+        value = await call()
+        self.set(key, value, immutable=immutable)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._immutable.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and sizes."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "immutable_size": len(self._immutable),
+            "max_size": self.max_size,
+            "ttl": self.ttl
+        }
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Set
+from .events import EventDecoder
+from .indexer import LogRangeTooLarge
+
+logger = logging.getLogger(__name__)
+
+class TooManySubscribers(Exception):
+    """The hub is at its subscriber limit."""
+
+class Subscription:
+    """
+    One subscriber's filter and bounded buffer of pending events.
+
+    Events are pushed without ever waiting on the subscriber. When the
+    buffer is full the oldest event is dropped, and the subscriber is told
+    how many it missed before the next event it receives.
+    """
+
+    def __init__(self, topic: str, filters: Mapping[int, Sequence[bytes]], buffer_size: int):
+        self.topic = topic
+        # Topic position (1-3) -> topics it may hold, as lowercase hex
+        self.filters = {position: {"0x" + value.hex() for value in values} for position, values in filters.items()}
+        self.dropped = 0
+        self.delivered = 0
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+
+    def matches(self, topics: Sequence[str]) -> bool:
+        return all(
+            position < len(topics) and topics[position].lower() in values
+            for position, values in self.filters.items()
+        )
+
+    def push(self, event: Any):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        self._ready.set()
+
+    async def events(self, keepalive: float) -> AsyncIterator[Any]:
+        """
+        Yield pending events as they arrive, forever.
+
+        Yields None after ``keepalive`` seconds without events, and an int,
+        the number of events dropped, before the first event after a drop.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            self._ready.clear()
+            while self._buffer:
+                if self.dropped:
+                    dropped, self.dropped = self.dropped, 0
+                    yield dropped
+                    # The buffer may have filled up again while the drop notice was sent
+                    continue
+                self.delivered += 1
+                yield self._buffer.popleft()
+
+class EventHub:
+    """
+    Fans one upstream log poller out to any number of subscribers.
+
+    While anyone is subscribed, a single task polls ``get_logs(from_block,
+    to_block)`` for every new block (``confirmations`` behind the head), so
+    upstream load does not depend on the number of subscribers; with no
+    subscribers it stops. Each log is decoded and encoded once, by
+    ``encode(decoder, log, args)``, and the result pushed to the bounded
+    buffer of every matching subscriber, so a slow consumer only ever
+    loses its own oldest events and never delays the others.
+
+    Like ``LogIndexer``, the poller halves a block range the node refuses
+    and grows it again by a quarter after each accepted one, up to
+    ``max_range``. A refused single block, or any other error, is retried
+    after ``poll_interval`` seconds, doubling on each consecutive failure.
+    """
+
+    def __init__(self, decoders: Mapping[str, EventDecoder],
+                 get_logs: Callable[[int, int], Awaitable[List[Dict[str, Any]]]],
+                 fetch_block_number: Callable[[], Awaitable[int]],
+                 encode: Callable[[EventDecoder, Dict[str, Any], Dict[str, Any]], Any],
+                 poll_interval: float = 1.0, confirmations: int = 0, buffer_size: int = 1000,
+                 max_subscribers: int = 1000, max_range: int = 1000):
+        self.decoders = {topic.lower(): decoder for topic, decoder in decoders.items()}
+        self.get_logs = get_logs
+        self.fetch_block_number = fetch_block_number
+        self.encode = encode
+        self.poll_interval = poll_interval
+        self.confirmations = confirmations
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.max_range = max_range
+        self.range_size = max_range
+        # Event topic -> its subscriptions
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # First block the poller has yet to fetch; None until its first poll
+        self.next_block: Optional[int] = None
+        self.polls = 0
+        self.published = 0
+        self.last_error: Optional[str] = None
+        self.failures = 0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def subscribe(self, topic: str, filters: Optional[Mapping[int, Sequence[bytes]]] = None) -> Subscription:
+        """Subscribe to new logs of one event, optionally filtered on indexed topics; starts the poller."""
+        if topic.lower() not in self.decoders:
+            raise ValueError(f"Unknown event topic {topic}")
+        if self.subscribers >= self.max_subscribers:
+            raise TooManySubscribers(f"At most {self.max_subscribers} subscribers are allowed")
+        subscription = Subscription(topic.lower(), filters or {}, self.buffer_size)
+        self._subscriptions.setdefault(subscription.topic, set()).add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription; the poller stops with the last one."""
+        subscriptions = self._subscriptions.get(subscription.topic, set())
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            self._subscriptions.pop(subscription.topic, None)
+        if not self._subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.next_block = None
+
+    async def close(self):
+        """Stop the poller; subscribers are left to their streams' own shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.next_block = None
+
+    def publish(self, logs: Sequence[Dict[str, Any]]):
+        """Decode each log with subscribers once and push it to every matching subscriber."""
+        for log in logs:
+            topics = log.get("topics") or []
+            if not topics or log.get("removed"):
+                continue
+            subscriptions = self._subscriptions.get(topics[0].lower())
+            if not subscriptions:
+                continue
+            matching = [s for s in subscriptions if s.matches(topics)]
+            if not matching:
+                continue
+            decoder = self.decoders[topics[0].lower()]
+            try:
+                event = self.encode(decoder, log, decoder.decode(topics, log["data"]))
+            except Exception as e:
+                logger.debug("Skipping undecodable %s log: %s", decoder.signature, e)
+                continue
+            self.published += 1
+            for subscription in matching:
+                subscription.push(event)
+
+    async def _poll(self):
+        while True:
+            caught_up = True
+            try:
+                head = await self.fetch_block_number() - self.confirmations
+                if self.next_block is None:
+                    # Subscribers only see logs from blocks after they subscribed
+                    self.next_block = head + 1
+                if head >= self.next_block:
+                    end = min(head, self.next_block + self.range_size - 1)
+                    self.polls += 1
+                    try:
+                        logs = await self.get_logs(self.next_block, end)
+                    except LogRangeTooLarge:
+                        if end == self.next_block:
+                            raise
+                        self.range_size = max(1, (end - self.next_block + 1) // 2)
+                        logger.debug("Block range %d-%d refused, retrying %d blocks at a time",
+                                     self.next_block, end, self.range_size)
+                        continue
+                    self.publish(logs)
+                    self.next_block = end + 1
+                    self.range_size = min(self.max_range, self.range_size + max(1, self.range_size // 4))
+                    caught_up = end == head
+                self.last_error = None
+                self.failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event subscription poll failed: %s", e)
+                self.last_error = str(e)
+                self.failures += 1
+                await asyncio.sleep(self.poll_interval * 2 ** min(self.failures - 1, 6))
+                continue
+            if caught_up:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "polling": self._task is not None,
+            "next_block": self.next_block,
+            "polls": self.polls,
+            "range_size": self.range_size,
+            "published": self.published,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,113 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .codec import checksum_address
+
+# Coercers called by the generated request validators (state/validators.py).
+# Each checks one value against its Solidity type and returns the form the
+# methods and codecs expect; ``path`` names the value in error messages.
+
+_ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+_HEX = re.compile(r"^0x(?:[0-9a-fA-F]{2})*$")
+_DECIMAL = re.compile(r"^-?[0-9]+$")
+_HEX_INTEGER = re.compile(r"^-?0x[0-9a-fA-F]+$")
+
+class ParamError(ValueError):
+    """A request parameter does not match its Solidity type."""
+
+def bind(params: Dict[str, Any], names: Tuple[str, ...]) -> List[Any]:
+    """
+    Return the values of ``params`` in ABI order.
+
+    Parameters named after Python keywords may also be passed with a
+    trailing underscore (``from_``), matching the method signatures.
+    """
+    values = []
+    for name in names:
+        if name in params:
+            values.append(params[name])
+        elif name + "_" in params:
+            values.append(params[name + "_"])
+        else:
+            raise ParamError(f"Missing parameter: {name}")
+    if len(params) != len(names):
+        unexpected = set(params) - set(names) - {name + "_" for name in names}
+        if not unexpected:
+            raise ParamError("Parameters may not be passed both with and without a trailing underscore")
+        raise ParamError(f"Unexpected parameters: {', '.join(sorted(unexpected))}")
+    return values
+
+def address(value: Any, path: str) -> str:
+    """A 20-byte address, returned checksummed; mixed-case input must carry a valid checksum."""
+    if not isinstance(value, str) or not _ADDRESS.match(value):
+        raise ParamError(f"{path}: expected a 0x-prefixed 20-byte hex address")
+    checksummed = checksum_address(value)
+    body = value[2:]
+    if value != checksummed and body != body.lower() and body != body.upper():
+        raise ParamError(f"{path}: invalid address checksum")
+    return checksummed
+
+def integer(value: Any, low: int, high: int, type_name: str, path: str) -> int:
+    """An integer in ``[low, high]``, given as a JSON number or a decimal or 0x-hex string."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        number = value
+    elif isinstance(value, str) and _DECIMAL.match(value):
+        number = int(value)
+    elif isinstance(value, str) and _HEX_INTEGER.match(value):
+        number = -int(value[3:], 16) if value[0] == "-" else int(value[2:], 16)
+    else:
+        raise ParamError(f"{path}: expected an integer (number, decimal or 0x-hex string) for {type_name}")
+    if not low <= number <= high:
+        raise ParamError(f"{path}: {number} is out of range for {type_name}")
+    return number
+
+def boolean(value: Any, path: str) -> bool:
+    if not isinstance(value, bool):
+        raise ParamError(f"{path}: expected true or false")
+    return value
+
+def string(value: Any, path: str) -> str:
+    if not isinstance(value, str):
+        raise ParamError(f"{path}: expected a string")
+    return value
+
+def number(value: Any, path: str) -> Any:
+    """A fixed point number, given as a JSON number or a string."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ParamError(f"{path}: expected a number")
+    return value
+
+def dynamic_bytes(value: Any, path: str) -> str:
+    """Bytes as 0x-prefixed hex, returned lowercase."""
+    if not isinstance(value, str) or not _HEX.match(value):
+        raise ParamError(f"{path}: expected 0x-prefixed hex bytes")
+    return value.lower()
+
+def fixed_bytes(value: Any, size: int, path: str) -> str:
+    """Exactly ``size`` bytes as 0x-prefixed hex, returned lowercase."""
+    if not isinstance(value, str) or not _HEX.match(value) or len(value) != 2 + 2 * size:
+        raise ParamError(f"{path}: expected {size} bytes as 0x-prefixed hex")
+    return value.lower()
+
+def array(value: Any, length: Optional[int], path: str) -> Sequence[Any]:
+    """A list, of exactly ``length`` items for fixed-size arrays."""
+    if not isinstance(value, (list, tuple)):
+        raise ParamError(f"{path}: expected an array")
+    if length is not None and len(value) != length:
+        raise ParamError(f"{path}: expected {length} items, got {len(value)}")
+    return value
+
+def struct(value: Any, names: Tuple[str, ...], path: str) -> Sequence[Any]:
+    """The components of a struct, given as an object keyed by component name or as an array."""
+    if isinstance(value, dict):
+        missing = [name for name in names if name not in value]
+        if missing:
+            raise ParamError(f"{path}: missing components: {', '.join(missing)}")
+        if len(value) != len(names):
+            unexpected = sorted(set(value) - set(names))
+            raise ParamError(f"{path}: unexpected components: {', '.join(unexpected)}")
+        return [value[name] for name in names]
+    if isinstance(value, (list, tuple)):
+        if len(value) != len(names):
+            raise ParamError(f"{path}: expected {len(names)} components, got {len(value)}")
+        return value
+    raise ParamError(f"{path}: expected an object or array of {len(names)} components")
@@ -0,0 +1,179 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+from .abi_analyzer import FunctionDefinition, FunctionParameter
+from .template_engine import python_identifier
+
+_ARRAY = re.compile(r"^(.+)\[([0-9]*)\]$")
+_INTEGER = re.compile(r"^(u?int)([0-9]*)$")
+_FIXED_BYTES = re.compile(r"^bytes([0-9]+)$")
+_FIXED_POINT = re.compile(r"^(u?fixed)(?:([0-9]+)x([0-9]+))?$")
+
+@dataclass(frozen=True)
+class ElementaryType:
+    """
+    A value type: ``uint``/``int`` (``size`` in bits), ``bytes`` (``size``
+    in bytes, None for dynamic bytes), ``fixed``/``ufixed`` (``size`` in
+    bits, ``precision`` decimals), ``address``, ``bool`` or ``string``.
+    """
+    base: str
+    size: Optional[int] = None
+    precision: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        if self.base in ("uint", "int") or (self.base == "bytes" and self.size is not None):
+            return f"{self.base}{self.size}"
+        if self.base in ("fixed", "ufixed"):
+            return f"{self.base}{self.size}x{self.precision}"
+        return self.base
+
+@dataclass(frozen=True)
+class ArrayType:
+    """``element[length]``, or a dynamic array when ``length`` is None."""
+    element: "SolidityType"
+    length: Optional[int] = None
+
+@dataclass(frozen=True)
+class TupleType:
+    """A struct: (component name, type) pairs in ABI order."""
+    components: Tuple[Tuple[str, "SolidityType"], ...]
+
+SolidityType = Union[ElementaryType, ArrayType, TupleType]
+
+def parse_type(type_str: str, components: Optional[List[FunctionParameter]] = None) -> SolidityType:
+    """Parse an ABI type (with its tuple components) into the type model; ValueError if invalid."""
+    match = _ARRAY.match(type_str)
+    if match:
+        length = int(match.group(2)) if match.group(2) else None
+        return ArrayType(parse_type(match.group(1), components), length)
+    if type_str == "tuple":
+        if components is None:
+            raise ValueError("tuple type without components")
+        return TupleType(tuple((c.name, parse_type(c.type, c.components)) for c in components))
+    if type_str in ("address", "bool", "string", "bytes"):
+        return ElementaryType(type_str)
+    match = _INTEGER.match(type_str)
+    if match:
+        bits = int(match.group(2) or 256)
+        if not 8 <= bits <= 256 or bits % 8:
+            raise ValueError(f"Invalid integer type {type_str!r}")
+        return ElementaryType(match.group(1), bits)
+    match = _FIXED_BYTES.match(type_str)
+    if match:
+        size = int(match.group(1))
+        if not 1 <= size <= 32:
+            raise ValueError(f"Invalid bytes type {type_str!r}")
+        return ElementaryType("bytes", size)
+    match = _FIXED_POINT.match(type_str)
+    if match:
+        bits, precision = int(match.group(2) or 128), int(match.group(3) or 18)
+        if not 8 <= bits <= 256 or bits % 8 or precision > 80:
+            raise ValueError(f"Invalid fixed point type {type_str!r}")
+        return ElementaryType(match.group(1), bits, precision)
+    raise ValueError(f"Unknown Solidity type {type_str!r}")
+
+def parse_parameter(param: FunctionParameter) -> SolidityType:
+    return parse_type(param.type, param.components)
+
+def integer_bounds(solidity_type: ElementaryType) -> Tuple[int, int]:
+    """The smallest and largest value of an ``intN`` or ``uintN``."""
+    if solidity_type.base == "uint":
+        return 0, 2 ** solidity_type.size - 1
+    return -2 ** (solidity_type.size - 1), 2 ** (solidity_type.size - 1) - 1
+
+def python_type(solidity_type: SolidityType) -> str:
+    """The Python type hint for values of a Solidity type, as web3 returns them."""
+    if isinstance(solidity_type, ArrayType):
+        return f"List[{python_type(solidity_type.element)}]"
+    if isinstance(solidity_type, TupleType):
+        if not solidity_type.components:
+            return "Tuple[()]"
+        return f"Tuple[{', '.join(python_type(t) for _, t in solidity_type.components)}]"
+    if solidity_type.base in ("uint", "int"):
+        return "int"
+    if solidity_type.base in ("address", "string"):
+        return "str"
+    if solidity_type.base == "bytes":
+        return "bytes"
+    if solidity_type.base == "bool":
+        return "bool"
+    return "Any"
+
+class _ValidatorEmitter:
+    """Emits the source of one method's validator, with a helper function per struct."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.helpers: List[str] = []
+
+    def expression(self, solidity_type: SolidityType, value: str, path: str, depth: int = 0) -> str:
+        """Python expression coercing ``value``; ``path`` is an expression naming it in errors."""
+        if isinstance(solidity_type, ArrayType):
+            item, index = f"item{depth}", f"index{depth}"
+            element = self.expression(solidity_type.element, item, f'{path} + f"[{{{index}}}]"', depth + 1)
+            return (f"[{element} for {index}, {item} in "
+                    f"enumerate(array({value}, {solidity_type.length!r}, {path}))]")
+        if isinstance(solidity_type, TupleType):
+            return f"{self._struct_helper(solidity_type)}({value}, {path})"
+        base = solidity_type.base
+        if base in ("uint", "int"):
+            low, high = integer_bounds(solidity_type)
+            return f"integer({value}, {low}, {high}, {solidity_type.name!r}, {path})"
+        if base == "bytes":
+            if solidity_type.size is None:
+                return f"dynamic_bytes({value}, {path})"
+            return f"fixed_bytes({value}, {solidity_type.size}, {path})"
+        if base in ("fixed", "ufixed"):
+            return f"number({value}, {path})"
+        return f"{'boolean' if base == 'bool' else base}({value}, {path})"
+
+    def _struct_helper(self, solidity_type: TupleType) -> str:
+        index = len(self.helpers)
+        # Reserve the slot first, so nested structs are numbered after this one
+        self.helpers.append("")
+        name = f"_{self.prefix}_struct{index}"
+        names = tuple(component for component, _ in solidity_type.components)
+        parts = [self.expression(t, f"c{i}", f"path + {'.' + component!r}")
+                 for i, (component, t) in enumerate(solidity_type.components)]
+        unpack = "".join(f"c{i}, " for i in range(len(names)))
+        self.helpers[index] = (
+            f"def {name}(value, path):\n"
+            f"    {unpack + '= ' if unpack else ''}struct(value, {names!r}, path)\n"
+            f"    return ({''.join(part + ', ' for part in parts)})\n"
+        )
+        return name
+
+def validator_source(function: FunctionDefinition, name: str) -> Optional[str]:
+    """
+    Source of a function ``name(params)`` that checks and coerces a request's params.
+
+    Returns the params keyed by method parameter name (``from`` becomes
+    ``from_``) or raises ``runtime.validation.ParamError``. Returns None
+    when the function's parameters can't be named in Python or have invalid
+    types, in which case requests are passed through unchecked.
+    """
+    identifiers = []
+    for param in function.inputs:
+        identifier = python_identifier(param.name)
+        if not identifier.isidentifier() or identifier == "state" or identifier in identifiers:
+            return None
+        identifiers.append(identifier)
+    try:
+        types = [parse_parameter(param) for param in function.inputs]
+    except ValueError:
+        return None
+
+    emitter = _ValidatorEmitter(name.lstrip("_"))
+    names = tuple(param.name for param in function.inputs)
+    unpack = "".join(f"p{i}, " for i in range(len(names)))
+    entries = "".join(
+        f"        {identifier!r}: {emitter.expression(t, f'p{i}', repr(param.name))},\n"
+        for i, (identifier, param, t) in enumerate(zip(identifiers, function.inputs, types))
+    )
+    body = (
+        f"def {name}(params):\n"
+        f"    {unpack + '= ' if unpack else ''}bind(params, {names!r})\n"
+        f"    return {{\n{entries}    }}\n"
+    )
+    return "\n".join(emitter.helpers + [body])
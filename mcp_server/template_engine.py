@@ -0,0 +1,142 @@
+import re
+import keyword
+import logging
+from collections import Counter
+from typing import List, Optional
+from .abi_analyzer import FunctionDefinition, FunctionParameter
+
+# Structs and arrays of structs, which only codec-based view methods accept
+_TUPLE_TYPE = re.compile(r"^tuple(\[[0-9]*\])*$")
+# Solidity elementary types, and arrays of them, that the template can pass straight through to web3
+_ELEMENTARY_TYPE = re.compile(r"^(address|bool|string|bytes([1-9]|[12][0-9]|3[0-2])?|u?int(8|16|24|32|40|48|56|64|72|80|88|96|104|112|120|128|136|144|152|160|168|176|184|192|200|208|216|224|232|240|248|256)?)(\[[0-9]*\])*$")
+
+def python_identifier(name: str) -> str:
+    """Map a Solidity parameter name to a Python identifier (``from`` -> ``from_``)."""
+    if keyword.iskeyword(name):
+        return f"{name}_"
+    return name
+
+def python_annotation(solidity_type: str) -> str:
+    """
+    Annotation for a parameter in a method signature.
+
+    Elementary Solidity types are kept as is (method files don't evaluate
+    annotations); arrays become ``List[...]`` so the signature stays valid
+    Python.
+    """
+    if solidity_type.endswith(']'):
+        return f"List[{python_annotation(solidity_type[:solidity_type.rindex('[')])}]"
+    return solidity_type
+
+def build_method_template(function: FunctionDefinition) -> str:
+    """
+    Build the method template for a function.
+
+    The template contains the placeholders ``<function_name>``, ``<params>``
+    and ``<str(e)>``, which are filled in either by the LLM or by
+    ``TemplateMethodGenerator``. Views call their precompiled codec
+    (``CODECS``, imported by the method module header, maps canonical
+    signatures to codecs built once when the server starts), skipping web3's
+    per-request function lookup and ABI processing.
+    """
+    # Create parameter string
+    params = ["state: State"]
+    for param in function.inputs:
+        params.append(f"{python_identifier(param.name)}: {python_annotation(param.type)}")
+    param_str = ", ".join(params)
+
+    # Create return type annotation
+    return_type = "Dict"  # All functions return Dict
+
+    # Create template based on function type
+    if function.state_mutability.value in ("view", "pure"):
+        args = "state, <params>" if function.inputs else "state"
+        return f"""async def {function.name}({param_str}) -> {return_type}:
+    try:
+        result = await CODECS[{function.signature!r}].call({args})
+        return {{"result": result}}
+    except Exception as e:
+        raise ValueError(f"Failed to execute {function.name}: <str(e)>")"""
+    return f"""async def {function.name}({param_str}) -> {return_type}:
+    try:
+        tx = await state.contract.functions.<function_name>(<params>).build_transaction({{
+            "from": state.account,
+            "gas": await state.contract.functions.<function_name>(<params>).estimate_gas({{"from": state.account}})
+        }})
+        return {{
+            "type": "transaction_to_sign",
+            "transaction": tx
+        }}
+    except Exception as e:
+        raise ValueError(f"Failed to build {function.name} transaction: <str(e)>")"""
+
+class TemplateMethodGenerator:
+    """
+    Deterministic, offline method generator.
+
+    View functions are rendered to call their precompiled codec, which
+    encodes tuples and picks overloads by selector. Transactions fill the
+    method template directly from the ``FunctionDefinition``.
+    Parameters named after Python keywords get a trailing underscore.
+    Functions it cannot express (tuples in transactions, overloads web3
+    can't tell apart by argument count, unusual types or identifiers) are
+    reported by ``supports`` so the caller can fall back to the LLM.
+    """
+
+    def __init__(self, functions: List[FunctionDefinition]):
+        # web3 resolves overloads by argument count before trying to encode
+        counts = Counter((function.name, len(function.inputs)) for function in functions)
+        self.ambiguous = {key for key, count in counts.items() if count > 1}
+        self.logger = logging.getLogger(__name__)
+
+    def supports(self, function: FunctionDefinition) -> bool:
+        """Return whether the function can be rendered without the LLM."""
+        return self.unsupported_reason(function) is None
+
+    def unsupported_reason(self, function: FunctionDefinition) -> Optional[str]:
+        """Explain why a function can't be rendered, or return None if it can."""
+        is_view = self._is_view(function)
+        if not is_view and (function.name, len(function.inputs)) in self.ambiguous:
+            return "overloaded function with the same number of arguments"
+        if not self._is_valid_identifier(function.name):
+            return f"function name {function.name!r} is not a valid identifier"
+        names = set()
+        for param in function.inputs:
+            name = python_identifier(param.name)
+            if not self._is_valid_identifier(name) or name == "state":
+                return f"parameter name {param.name!r} is not usable"
+            if name in names:
+                return f"duplicate parameter name {param.name!r}"
+            names.add(name)
+            if not self._is_supported_type(param, is_view):
+                return f"unsupported parameter type {param.type}"
+        return None
+
+    def render(self, function: FunctionDefinition) -> str:
+        """Fill in the method template for a supported function."""
+        reason = self.unsupported_reason(function)
+        if reason:
+            raise ValueError(f"Cannot render {function.name} from template: {reason}")
+
+        params = ", ".join(python_identifier(param.name) for param in function.inputs)
+        return (build_method_template(function)
+                .replace("<function_name>", function.name)
+                .replace("<params>", params)
+                .replace("<str(e)>", "{str(e)}"))
+
+    @staticmethod
+    def _is_valid_identifier(name: str) -> bool:
+        return name.isidentifier() and not keyword.iskeyword(name)
+
+    @staticmethod
+    def _is_view(function: FunctionDefinition) -> bool:
+        return function.state_mutability.value in ("view", "pure")
+
+    @classmethod
+    def _is_supported_type(cls, param: FunctionParameter, is_view: bool = False) -> bool:
+        """Elementary types and arrays of them; codecs also take tuples (structs), for views."""
+        if param.components is None:
+            return bool(_ELEMENTARY_TYPE.match(param.type))
+        return (is_view and bool(_TUPLE_TYPE.match(param.type))
+                and all(cls._is_supported_type(c, is_view) for c in param.components))
+
@@ -12,6 +12,10 @@ setup(
         "click>=8.0.0",
         "openai>=1.0.0"
     ],
+    extras_require={
+        # uvloop, httptools and orjson for generated servers in production
+        "production": ["uvicorn[standard]>=0.15.0", "orjson>=3.9"],
+    },
     entry_points={
         "console_scripts": [
             "mcp-server=mcp_server.cli:cli",
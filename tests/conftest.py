@@ -0,0 +1,166 @@
+import pytest
+import sys
+import json
+import asyncio
+import threading
+import importlib.util
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.mcp_generator import MCPGenerator
+
+CONTRACTS_DIR = Path(__file__).parent.parent / "contracts"
+TEST_CONTRACT_ADDRESS = "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984"
+
+@pytest.fixture
+def uni_analysis():
+    """Analysis of the Uni token ABI."""
+    with open(CONTRACTS_DIR / "UniToken.json") as f:
+        return ABIAnalyzer(json.load(f)).analyze()
+
+@pytest.fixture
+def generate_server(uni_analysis, tmp_path):
+    """Generate a server for the Uni token offline and return its output directory."""
+    def generate(**options) -> Path:
+        generator = MCPGenerator(
+            analysis=uni_analysis,
+            output_dir=tmp_path,
+            contract_name="UniToken",
+            openai_api_key=None,
+            backend="template",
+            **options
+        )
+        asyncio.run(generator.generate())
+        return tmp_path
+    return generate
+
+@pytest.fixture
+def load_server(monkeypatch):
+    """Import a generated server.py (or another server module, e.g. bundle.py) as a fresh module."""
+    monkeypatch.setenv("CONTRACT_ADDRESS", TEST_CONTRACT_ADDRESS)
+    # Generated servers import their siblings as top-level packages
+    shared = ("state", "methods", "runtime", "generated_server")
+
+    def drop_shared_modules():
+        for name in list(sys.modules):
+            if name.split('.')[0] in shared:
+                del sys.modules[name]
+
+    def load(output_dir: Path, module: str = "server.py", **env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        drop_shared_modules()
+        monkeypatch.syspath_prepend(str(output_dir))
+        spec = importlib.util.spec_from_file_location("generated_server", output_dir / module)
+        server = importlib.util.module_from_spec(spec)
+        # Registered like a regular import, so postponed annotations resolve
+        sys.modules[spec.name] = server
+        spec.loader.exec_module(server)
+        return server
+
+    yield load
+    drop_shared_modules()
+
+# Minimal contract for local-chain tests: returns its first argument word for
+# any selector and reverts when that word is zero, so balanceOf(account) echoes
+# the account and argument-less calls such as totalSupply() revert.
+ECHO_CONTRACT_RUNTIME = "60043580600b57600080fd5b60005260206000f3"
+ECHO_CONTRACT_INIT = "6014600c60003960146000f3"
+
+# Emits Transfer(msg.sender, <first argument>, <second argument>) for any call,
+# so transfer(to, amount) logs a standard ERC-20 Transfer event.
+TRANSFER_TOPIC = "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TRANSFER_CONTRACT_RUNTIME = "602435600052600435337f" + TRANSFER_TOPIC + "60206000a300"
+TRANSFER_CONTRACT_INIT = "6031600c60003960316000f3"
+
+# eth-tester's log fields -> JSON-RPC names
+_LOG_FIELDS = {"log_index": "logIndex", "transaction_index": "transactionIndex",
+               "transaction_hash": "transactionHash", "block_hash": "blockHash", "block_number": "blockNumber"}
+
+def _rpc_log(log: dict) -> dict:
+    rpc_log = {_LOG_FIELDS.get(key, key): value for key, value in log.items()}
+    for key in ("logIndex", "transactionIndex", "blockNumber"):
+        rpc_log[key] = hex(rpc_log[key])
+    rpc_log["topics"] = list(rpc_log["topics"])
+    return rpc_log
+
+class EthTesterNode:
+    """An eth-tester chain served over HTTP JSON-RPC, like a local anvil node."""
+
+    def __init__(self):
+        from web3 import Web3
+        from web3.providers.eth_tester import EthereumTesterProvider
+        self.provider = EthereumTesterProvider()
+        self.web3 = Web3(self.provider)
+        self.account = self.web3.eth.accounts[0]
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def deploy(self, runtime: str = ECHO_CONTRACT_RUNTIME, init: str = ECHO_CONTRACT_INIT) -> str:
+        tx = self.web3.eth.send_transaction({"from": self.account, "data": "0x" + init + runtime})
+        return self.web3.eth.get_transaction_receipt(tx).contractAddress
+
+    def transfer(self, contract: str, to: str, amount: int, sender: str = None):
+        """Call transfer(to, amount) on a contract, mining a block."""
+        data = "0xa9059cbb" + to[2:].lower().rjust(64, "0") + f"{amount:064x}"
+        # The chain may be serving requests at the same time
+        with self._lock:
+            self.web3.eth.send_transaction({"from": sender or self.account, "to": contract, "data": data})
+
+    def handle(self, request: dict) -> dict:
+        method, params = request["method"], list(request.get("params", []))
+        if method in ("eth_call", "eth_estimateGas"):
+            params[0] = {"from": self.account, **params[0]}
+            if len(params) > 1 and isinstance(params[1], str) and params[1].startswith("0x"):
+                params[1] = int(params[1], 16)
+        elif method == "eth_getLogs":
+            log_filter = dict(params[0])
+            for key, tester_key in (("fromBlock", "from_block"), ("toBlock", "to_block")):
+                if key in log_filter:
+                    block = log_filter.pop(key)
+                    log_filter[tester_key] = int(block, 16) if block.startswith("0x") else block
+            params[0] = log_filter
+        try:
+            with self._lock:
+                response = self.provider.make_request(method, params)
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": 3, "message": str(e)}}
+        if isinstance(response.get("result"), int) and not isinstance(response["result"], bool):
+            response["result"] = hex(response["result"])
+        if method == "eth_getLogs" and "result" in response:
+            response["result"] = [_rpc_log(log) for log in response["result"]]
+        return {**response, "id": request.get("id")}
+
+    def serve(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.requests.append(body)
+                if isinstance(body, list):
+                    response = [node.handle(item) for item in body]
+                else:
+                    response = node.handle(body)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+@pytest.fixture
+def eth_tester_node():
+    """A local eth-tester chain reachable over HTTP."""
+    node = EthTesterNode().serve()
+    yield node
+    node.server.shutdown()
+    node.server.server_close()
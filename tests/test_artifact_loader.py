@@ -0,0 +1,108 @@
+import json
+import tracemalloc
+import pytest
+from mcp_server import abi_analyzer
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.artifact_loader import read_contracts, select_contract
+from mcp_server.generate_all import plan_jobs
+
+TOKEN_ABI = [
+    {"type": "constructor", "inputs": [], "stateMutability": "nonpayable"},
+    {"type": "function", "name": "totalSupply", "inputs": [], "stateMutability": "view",
+     "outputs": [{"name": "", "type": "uint256"}]},
+    {"type": "event", "name": "Transfer", "anonymous": False,
+     "inputs": [{"name": "note", "type": "string", "indexed": False}]},
+]
+VAULT_ABI = [{"type": "function", "name": "deposit", "stateMutability": "payable", "outputs": [],
+              "inputs": [{"name": "amount", "type": "uint256"}]}]
+
+def build_info(bytecode_size=64):
+    """A solc build-info file: sources, ASTs and bytecode next to the ABIs."""
+    return {
+        "id": "abc",
+        "input": {"language": "Solidity", "sources": {
+            "src/Token.sol": {"content": 'contract Token { string s = "{\\"abi\\": [}"; }\n'}
+        }},
+        "output": {
+            "contracts": {
+                "src/Token.sol": {
+                    "Token": {"abi": TOKEN_ABI, "evm": {"bytecode": {"object": "60" * bytecode_size}},
+                              "storageLayout": {"storage": [{"label": "s", "slot": "0"}], "types": {}}},
+                    "Math": {"abi": [], "evm": {"bytecode": {"object": "00"}}},
+                },
+                "src/Vault.sol": {"Vault": {"abi": VAULT_ABI, "metadata": "{\"compiler\":{}}"}},
+            },
+            "sources": {"src/Token.sol": {"id": 0, "ast": {"nodes": [[], {}, "}"]}}},
+        },
+    }
+
+def write(path, data):
+    path.write_text(json.dumps(data, indent=1))
+    return path
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_build_info_contracts(tmp_path, chunk_size):
+    path = write(tmp_path / "build-info.json", build_info())
+    contracts = read_contracts(path, storage_layout=True, chunk_size=chunk_size)
+    assert [(c.qualified_name, c.abi) for c in contracts] == [
+        ("src/Token.sol:Token", TOKEN_ABI), ("src/Token.sol:Math", []), ("src/Vault.sol:Vault", VAULT_ABI)
+    ]
+    assert contracts[0].storage_layout["storage"][0]["label"] == "s"
+    assert contracts[2].storage_layout is None
+
+def test_single_contract_artifacts(tmp_path):
+    hardhat = write(tmp_path / "Token.json", {"_format": "hh-sol-artifact-1", "contractName": "Token",
+                                              "sourceName": "contracts/Token.sol", "abi": TOKEN_ABI,
+                                              "bytecode": "0x6080", "linkReferences": {}})
+    [contract] = read_contracts(hardhat)
+    assert (contract.qualified_name, contract.abi) == ("contracts/Token.sol:Token", TOKEN_ABI)
+    [contract] = read_contracts(write(tmp_path / "abi.json", VAULT_ABI))
+    assert contract.name is None and contract.abi == VAULT_ABI
+
+    with pytest.raises(ValueError, match="does not contain an ABI"):
+        select_contract(read_contracts(write(tmp_path / "other.json", {"bytecode": "0x"})))
+    (tmp_path / "broken.json").write_text('{"abi": [{"type": "function"')
+    with pytest.raises(ValueError, match="Unexpected end"):
+        read_contracts(tmp_path / "broken.json")
+
+def test_select_contract(tmp_path):
+    contracts = read_contracts(write(tmp_path / "build-info.json", build_info()))
+    assert select_contract(contracts, "Vault").abi == VAULT_ABI
+    assert select_contract(contracts, "src/Token.sol:Token").abi == TOKEN_ABI
+    with pytest.raises(ValueError, match="contains 3 contracts"):
+        select_contract(contracts)
+
+def test_analysis_in_one_pass_cached_by_hash(tmp_path):
+    path = write(tmp_path / "build-info.json", build_info())
+    analysis = ABIAnalyzer(path, contract="Token").analyze()
+    assert [f.name for f in analysis["functions"]] == ["totalSupply"]
+    assert analysis["state_variables"] == [{"name": "totalSupply", "type": "uint256"}]
+    assert [e["name"] for e in analysis["events"]] == ["Transfer"]
+    assert analysis["constructor"] == TOKEN_ABI[0]
+
+    # Same content under another name: served from the cache
+    copy = write(tmp_path / "copy.json", build_info())
+    assert ABIAnalyzer(copy, contract="Token").analyze() is analysis
+    vault = ABIAnalyzer(copy, contract="Vault")
+    assert vault.analyze()["abi"] == VAULT_ABI
+    assert (vault.artifact_hash, "Vault") in abi_analyzer._analysis_cache
+
+def test_large_build_info_is_memory_flat(tmp_path):
+    path = write(tmp_path / "build-info.json", build_info(bytecode_size=4 << 20))
+    size = path.stat().st_size
+    tracemalloc.start()
+    try:
+        contracts = read_contracts(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert contracts[0].abi == TOKEN_ABI
+    assert peak < size / 8
+
+def test_plan_jobs_splits_build_info(tmp_path):
+    artifacts = [write(tmp_path / "build-info.json", build_info()),
+                 write(tmp_path / "Token.json", {"contractName": "Token", "abi": TOKEN_ABI})]
+    jobs = plan_jobs(artifacts, tmp_path / "out")
+    assert [(j.contract_name, j.contract) for j in jobs] == [
+        ("Token", "src/Token.sol:Token"), ("Vault", "src/Vault.sol:Vault"), ("Token_2", None)
+    ]
@@ -0,0 +1,125 @@
+import pytest
+import json
+from eth_abi import decode, encode
+from fastapi.testclient import TestClient
+from web3 import Web3
+from conftest import CONTRACTS_DIR
+from mcp_server.runtime.batch import (
+    AGGREGATE3_SELECTOR, BatchCallError, bind_args, decode_revert_reason, encode_view_call, execute_multicall
+)
+
+ACCOUNTS = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 201)]
+
+@pytest.fixture
+def batch_server(generate_server, load_server, eth_tester_node):
+    address = eth_tester_node.deploy()
+    server = load_server(generate_server(), CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url)
+    with TestClient(server.app) as client:
+        yield server, client, eth_tester_node
+
+def test_batch_of_view_calls_uses_one_node_request(batch_server):
+    server, client, node = batch_server
+    requests = [{"method": "balanceOf", "params": {"account": a}, "context": {"i": i}}
+                for i, a in enumerate(ACCOUNTS)]
+
+    node.requests.clear()
+    response = client.post("/mcp/batch", json=requests)
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["result"]["result"] for r in results] == [int(a, 16) for a in ACCOUNTS]
+    assert [r["context"]["i"] for r in results] == list(range(len(ACCOUNTS)))
+    eth_calls = [r for r in node.requests if isinstance(r, list)]
+    assert len(eth_calls) == 1 and len(eth_calls[0]) == len(ACCOUNTS)
+
+def test_batch_reports_errors_per_item(batch_server):
+    server, client, node = batch_server
+    response = client.post("/mcp/batch", json=[
+        {"method": "balanceOf", "params": {"account": ACCOUNTS[0]}},
+        {"method": "totalSupply", "params": {}},
+        {"method": "doesNotExist", "params": {}},
+        {"method": "balanceOf", "params": {}},
+        {"method": "allowance", "params": {"owner": ACCOUNTS[1], "spender": ACCOUNTS[2]}},
+    ])
+    results = response.json()["results"]
+
+    assert results[0]["result"] == {"result": 1}
+    assert results[1]["error"]["status_code"] == 500
+    assert "reverted" in results[1]["error"]["detail"]
+    assert results[2]["error"]["status_code"] == 404
+    assert results[3]["error"] == {"status_code": 422, "detail": "Missing parameter: account"}
+    assert results[4]["result"] == {"result": 2}
+
+def test_batch_chunks_large_requests(batch_server, monkeypatch):
+    server, client, node = batch_server
+    monkeypatch.setattr(server, "BATCH_MAX_CALLS", 64)
+    node.requests.clear()
+    response = client.post("/mcp/batch", json=[
+        {"method": "balanceOf", "params": {"account": a}} for a in ACCOUNTS
+    ])
+    assert all(r["error"] is None for r in response.json()["results"])
+    assert [len(r) for r in node.requests if isinstance(r, list)] == [64, 64, 64, 8]
+
+class MulticallEmulator:
+    """Executes aggregate3 calls against the local chain, like a deployed Multicall3."""
+
+    def __init__(self, node):
+        self.node = node
+        self.calls = 0
+
+    async def call(self, transaction, block_identifier):
+        self.calls += 1
+        data = bytes.fromhex(transaction["data"][2:])
+        assert data[:4] == AGGREGATE3_SELECTOR
+        results = []
+        for target, _, calldata in decode(['(address,bool,bytes)[]'], data[4:])[0]:
+            try:
+                results.append((True, bytes(self.node.web3.eth.call({"to": Web3.to_checksum_address(target), "data": calldata}))))
+            except Exception:
+                results.append((False, b""))
+        return encode(['(bool,bytes)[]'], [results])
+
+@pytest.mark.asyncio
+async def test_multicall_aggregates_calls(eth_tester_node):
+    address = eth_tester_node.deploy()
+    with open(CONTRACTS_DIR / "UniToken.json") as f:
+        contract = Web3().eth.contract(address=address, abi=json.load(f)["abi"])
+    calls = [encode_view_call(contract, "balanceOf", {"account": a}) for a in ACCOUNTS[:5]]
+    calls.append(encode_view_call(contract, "totalSupply", {}))
+
+    emulator = MulticallEmulator(eth_tester_node)
+
+    class FakeWeb3:
+        eth = emulator
+
+    results = await execute_multicall(FakeWeb3(), ACCOUNTS[-1], address, calls, "latest", max_batch_size=4)
+    assert results[:5] == [1, 2, 3, 4, 5]
+    assert isinstance(results[5], BatchCallError)
+    assert emulator.calls == 2
+
+def test_bind_args_orders_params_and_accepts_keyword_aliases():
+    abi = {"inputs": [{"name": "from", "type": "address"}, {"name": "to", "type": "address"}]}
+    assert bind_args(abi, {"to": "b", "from_": "a"}) == ["a", "b"]
+    with pytest.raises(BatchCallError) as exc_info:
+        bind_args(abi, {"from": "a", "to": "b", "extra": 1})
+    assert exc_info.value.status_code == 422
+
+def test_decode_revert_reason():
+    data = bytes.fromhex("08c379a0") + encode(["string"], ["insufficient balance"])
+    assert decode_revert_reason(data) == "execution reverted: insufficient balance"
+    assert decode_revert_reason(b"") == "execution reverted"
+
+def test_batch_results_match_single_calls(batch_server):
+    server, client, node = batch_server
+    single = client.post("/mcp", json={"method": "balanceOf", "params": {"account": ACCOUNTS[4]}}).json()
+    batch = client.post("/mcp/batch", json=[{"method": "balanceOf", "params": {"account": ACCOUNTS[4]}}]).json()
+    assert single["result"] == batch["results"][0]["result"] == {"result": 5}
+
+def test_single_reads_are_pinned_to_their_cache_block(batch_server):
+    server, client, node = batch_server
+    node.requests.clear()
+    client.post("/mcp", json={"method": "balanceOf", "params": {"account": ACCOUNTS[5]}})
+    client.post("/mcp", json={"method": "symbol", "params": {}})
+    eth_calls = [r for r in node.requests if isinstance(r, dict) and r["method"] == "eth_call"]
+    # The result is cached under the tracked block, so it must be read at that block, not "latest"
+    assert [call["params"][1] for call in eth_calls] == [hex(node.web3.eth.block_number)] * 2
@@ -0,0 +1,38 @@
+import sys
+import json
+import importlib.util
+from pathlib import Path
+from fastapi.testclient import TestClient
+from web3 import Web3
+
+def test_bundle_contains_every_method(generate_server, load_server, uni_analysis, eth_tester_node):
+    output_dir = generate_server(bundle=True)
+    bundle = output_dir / "bundle.py"
+    assert Path(importlib.util.cache_from_source(str(bundle))).exists()
+
+    address = eth_tester_node.deploy()
+    server = load_server(output_dir, "bundle.py", CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url)
+    assert set(server.METHODS) == {f.name for f in uni_analysis["functions"]}
+    # Methods are compiled in rather than loaded from the methods directory
+    assert server.METHODS["balanceOf"].__module__ == "generated_server"
+    assert not hasattr(server, "build_dispatch_table")
+
+    account = Web3.to_checksum_address("0x" + "00" * 19 + "2a")
+    with TestClient(server.app) as client:
+        response = client.post("/mcp", json={"method": "balanceOf", "params": {"account": account}})
+        assert response.status_code == 200
+        assert response.json()["result"] == {"result": 42}
+        assert client.post("/mcp", json={"method": "state", "params": {}}).status_code == 404
+
+def test_abi_is_a_json_sidecar(generate_server, load_server, uni_analysis):
+    output_dir = generate_server()
+    assert json.loads((output_dir / "state" / "abi.json").read_text()) == uni_analysis["abi"]
+    load_server(output_dir)
+    # Parsed once, when the state module is imported
+    assert sys.modules["state"].ABI == uni_analysis["abi"]
+
+def test_bundle_is_removed_when_no_longer_requested(generate_server):
+    output_dir = generate_server(bundle=True)
+    assert (output_dir / "bundle.py").exists()
+    generate_server()
+    assert not (output_dir / "bundle.py").exists()
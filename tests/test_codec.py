@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+from eth_abi import decode, encode
+from fastapi.testclient import TestClient
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.mcp_generator import MCPGenerator
+from mcp_server.runtime.codec import MethodCodec
+
+OWNER = Web3.to_checksum_address("0x" + "ab" * 20)
+
+ORDER = {"name": "order", "type": "tuple", "components": [
+    {"name": "maker", "type": "address"}, {"name": "salt", "type": "bytes32"}, {"name": "amounts", "type": "uint256[]"},
+]}
+# A view taking a struct and an array and returning an array of structs
+QUOTE = {
+    "type": "function", "name": "quote", "stateMutability": "view",
+    "inputs": [ORDER, {"name": "ids", "type": "uint256[2]"}],
+    "outputs": [{"name": "", "type": "tuple[]", "components": [
+        {"name": "owner", "type": "address"}, {"name": "data", "type": "bytes"},
+    ]}, {"name": "", "type": "bool"}],
+}
+
+def codec_for(abi):
+    function = next(f for f in ABIAnalyzer([abi]).analyze()["functions"])
+    return MethodCodec(function.signature, function.selector, abi["inputs"], abi["outputs"])
+
+def test_encoding_matches_web3():
+    contract = Web3().eth.contract(abi=[QUOTE])
+    codec = codec_for(QUOTE)
+    order = {"maker": OWNER, "salt": "0x" + "01" * 32, "amounts": [1, 2, 3]}
+
+    calldata = codec.encode([order, [4, 5]])
+    expected = contract.encodeABI(fn_name="quote", args=[(OWNER, b"\x01" * 32, [1, 2, 3]), [4, 5]])
+    assert "0x" + calldata.hex() == expected
+    # Structs may also be passed positionally
+    assert codec.encode([[OWNER, "0x" + "01" * 32, [1, 2, 3]], [4, 5]]) == calldata
+
+def test_decoding_matches_web3():
+    codec = codec_for(QUOTE)
+    data = encode(["(address,bytes)[]", "bool"], [[(OWNER.lower(), b"\x12"), (OWNER.lower(), b"")], True])
+    output_types = get_abi_output_types(QUOTE)
+
+    assert codec.decode(data) == list(map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decode(output_types, data)))
+    assert codec.decode(data) == [[(OWNER, b"\x12"), (OWNER, b"")], True]
+
+def test_invalid_arguments_are_rejected():
+    codec = codec_for(QUOTE)
+    with pytest.raises(ValueError, match="takes 2 arguments"):
+        codec.encode([{}])
+    with pytest.raises(Exception):
+        codec.encode([{"maker": "not an address", "salt": b"", "amounts": []}, [1, 2]])
+
+def test_struct_view_through_generated_server(tmp_path, load_server, eth_tester_node):
+    # A static struct, so the echo contract's first argument word is its maker
+    order = {**ORDER, "components": ORDER["components"][:2]}
+    abi = [{**QUOTE, "inputs": [order, QUOTE["inputs"][1]], "outputs": [{"name": "", "type": "address"}]}]
+    generator = MCPGenerator(analysis=ABIAnalyzer(abi).analyze(), output_dir=tmp_path, contract_name="Quotes",
+                             openai_api_key=None, backend="template")
+    asyncio.run(generator.generate())
+    assert "CODECS['quote((address,bytes32),uint256[2])'].call(state, order, ids)" in (
+        tmp_path / "methods" / "quote.py").read_text()
+
+    server = load_server(tmp_path, CONTRACT_ADDRESS=eth_tester_node.deploy(), ETH_NODE_URL=eth_tester_node.url)
+    params = {"order": {"maker": OWNER, "salt": "0x" + "00" * 32}, "ids": [1, 2]}
+    with TestClient(server.app) as client:
+        single = client.post("/mcp", json={"method": "quote", "params": params})
+        batch = client.post("/mcp/batch", json=[{"method": "quote", "params": params}])
+    assert single.json()["result"] == {"result": OWNER}
+    assert batch.json()["results"][0]["result"] == {"result": OWNER}
@@ -0,0 +1,147 @@
+import time
+import asyncio
+import pytest
+from eth_abi import encode
+from eth_hash.auto import keccak
+from fastapi.testclient import TestClient
+from web3 import Web3
+from conftest import TRANSFER_CONTRACT_INIT, TRANSFER_CONTRACT_RUNTIME
+from mcp_server.runtime.events import EventDecoder
+from mcp_server.runtime.indexer import LogIndexer, LogRangeTooLarge, LogStore
+from mcp_server.runtime.validation import ParamError
+
+ACCOUNTS = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 5)]
+TRANSFER_SIGNATURE = "Transfer(address,address,uint256)"
+TRANSFER_TOPIC = "0x" + keccak(TRANSFER_SIGNATURE.encode()).hex()
+TRANSFER = EventDecoder(TRANSFER_SIGNATURE, TRANSFER_TOPIC, [
+    {"name": "from", "type": "address", "indexed": True},
+    {"name": "to", "type": "address", "indexed": True},
+    {"name": "value", "type": "uint256", "indexed": False},
+])
+
+def address_topic(address: str) -> str:
+    return "0x" + encode(["address"], [address]).hex()
+
+def transfer_log(block_number: int, log_index: int, sender: str, to: str, value: int) -> dict:
+    return {
+        "blockNumber": hex(block_number), "logIndex": hex(log_index), "transactionHash": "0x" + "00" * 32,
+        "topics": [TRANSFER_TOPIC, address_topic(sender), address_topic(to)],
+        "data": "0x" + encode(["uint256"], [value]).hex(),
+    }
+
+def test_event_decoder():
+    log = transfer_log(1, 0, ACCOUNTS[0], ACCOUNTS[1], 10**30)
+    assert TRANSFER.decode(log["topics"], log["data"]) == {"from": ACCOUNTS[0], "to": ACCOUNTS[1], "value": 10**30}
+    assert TRANSFER.topic_filter("to", ACCOUNTS[1].lower()).hex() == address_topic(ACCOUNTS[1])[2:]
+    with pytest.raises(ParamError, match="value is not an indexed parameter"):
+        TRANSFER.topic_filter("value", 1)
+    with pytest.raises(ParamError, match="to: expected a 0x-prefixed 20-byte hex address"):
+        TRANSFER.topic_filter("to", "0x12")
+
+    # Indexed strings are only logged as their hash
+    named = EventDecoder("Named(string,uint8)", "0x" + "11" * 32, [
+        {"name": "label", "type": "string", "indexed": True}, {"name": "", "type": "uint8", "indexed": True},
+    ])
+    topics = ["0x" + "11" * 32, "0x" + keccak(b"alice").hex(), "0x" + encode(["uint8"], [7]).hex()]
+    assert named.decode(topics, "0x") == {"label": keccak(b"alice"), "arg1": 7}
+    assert named.topic_filter("label", "alice") == keccak(b"alice")
+    assert named.topic_filter("arg1", "0x07") == bytes.fromhex(topics[2][2:])
+
+def test_indexer_adapts_chunk_size_and_resumes(tmp_path):
+    # Block n holds n % 3 transfers; the node refuses ranges with more than 8 logs
+    chain = [transfer_log(block, index, ACCOUNTS[index], ACCOUNTS[3], block)
+             for block in range(100) for index in range(block % 3)]
+    requests = []
+
+    async def get_logs(from_block, to_block):
+        requests.append((from_block, to_block))
+        logs = [log for log in chain if from_block <= int(log["blockNumber"], 16) <= to_block]
+        if len(logs) > 8:
+            raise LogRangeTooLarge("query returned more than 8 results")
+        return logs
+
+    async def head():
+        return 79
+
+    store = LogStore(tmp_path / "events.sqlite3", ACCOUNTS[3], [TRANSFER_TOPIC])
+    indexer = LogIndexer(store, {TRANSFER_TOPIC: TRANSFER}, get_logs, head, confirmations=10, chunk_size=64)
+    stored = asyncio.run(indexer.sync())
+
+    assert store.checkpoint == 69
+    assert stored == sum(block % 3 for block in range(70))
+    assert requests[0] == (0, 63) and indexer.chunk_size < 64
+    # Every block was indexed exactly once, in order
+    accepted = [r for r in requests if r not in requests[:1]]
+    assert sorted(set(b for start, end in accepted for b in range(start, end + 1))) == list(range(70))
+
+    topic = bytes.fromhex(TRANSFER_TOPIC[2:])
+    logs = store.query(topic, {1: [bytes.fromhex(address_topic(ACCOUNTS[1])[2:])]}, from_block=60, limit=3)
+    assert [(log["block_number"], log["args"]["from"]) for log in logs] == [(62, ACCOUNTS[1]), (65, ACCOUNTS[1]),
+                                                                            (68, ACCOUNTS[1])]
+    newest = store.query(topic, descending=True, limit=2)
+    assert [(log["block_number"], log["log_index"]) for log in newest] == [(68, 1), (68, 0)]
+    assert store.query(topic, descending=True, after=(68, 0), limit=1)[0]["block_number"] == 67
+
+    # A new indexer on the same store picks up after the checkpoint
+    store.close()
+    requests.clear()
+    resumed = LogIndexer(LogStore(tmp_path / "events.sqlite3", ACCOUNTS[3], [TRANSFER_TOPIC]),
+                         {TRANSFER_TOPIC: TRANSFER}, get_logs, head, confirmations=0, chunk_size=4)
+    asyncio.run(resumed.sync())
+    assert requests[0][0] == 70 and resumed.store.checkpoint == 79
+    # Opening the store for another contract starts over
+    assert LogStore(tmp_path / "events.sqlite3", ACCOUNTS[2], [TRANSFER_TOPIC]).checkpoint is None
+
+def test_events_endpoint_against_local_chain(generate_server, load_server, eth_tester_node, tmp_path):
+    contract = eth_tester_node.deploy(TRANSFER_CONTRACT_RUNTIME, TRANSFER_CONTRACT_INIT)
+    sender = eth_tester_node.account
+    for i in range(6):
+        eth_tester_node.transfer(contract, ACCOUNTS[i % 2], 100 + i)
+    head = eth_tester_node.web3.eth.block_number
+
+    # Like a hosted node, refuse ranges with more than two logs
+    handle = eth_tester_node.handle
+
+    def limited_handle(request):
+        response = handle(request)
+        if request["method"] == "eth_getLogs" and len(response.get("result", [])) > 2:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32005, "message": "query returned more than 2 results"}}
+        return response
+    eth_tester_node.handle = limited_handle
+
+    server = load_server(
+        generate_server(), CONTRACT_ADDRESS=contract, ETH_NODE_URL=eth_tester_node.url, MCP_INDEXER="1",
+        MCP_INDEXER_DB=str(tmp_path / "index" / "events.sqlite3"), MCP_INDEXER_CONFIRMATIONS="0",
+        MCP_INDEXER_POLL_INTERVAL="0.05", MCP_BLOCK_POLL_INTERVAL="0"
+    )
+    with TestClient(server.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/events").json()["indexer"]["checkpoint"] != head and time.monotonic() < deadline:
+            time.sleep(0.05)
+        listing = client.get("/events").json()
+        assert listing["events"][TRANSFER_SIGNATURE] == {"topic": TRANSFER_TOPIC, "indexed": ["from", "to"]}
+        assert listing["indexer"]["checkpoint"] == head and listing["indexer"]["logs_indexed"] == 6
+
+        page = client.get("/events/Transfer", params={"to": ACCOUNTS[1].lower(), "limit": 2}).json()
+        assert page["event"] == TRANSFER_SIGNATURE and page["indexed_to"] == head
+        assert [e["args"] for e in page["events"]] == [
+            {"from": sender, "to": ACCOUNTS[1], "value": 101}, {"from": sender, "to": ACCOUNTS[1], "value": 103},
+        ]
+        rest = client.get("/events/Transfer", params={"to": ACCOUNTS[1], "after": page["next"]}).json()
+        assert [e["args"]["value"] for e in rest["events"]] == [105] and rest["next"] is None
+
+        by_topic = client.get(f"/events/{TRANSFER_TOPIC}", params=[("to", ACCOUNTS[0]), ("to", ACCOUNTS[1]),
+                                                                   ("order", "desc"), ("from_block", head - 1)])
+        assert [e["args"]["value"] for e in by_topic.json()["events"]] == [105, 104]
+
+        assert client.get("/events/Transfer", params={"value": 1}).status_code == 422
+        assert client.get("/events/Transfer", params={"from": "0x12"}).status_code == 422
+        assert client.get("/events/Transfer", params={"after": "x"}).status_code == 422
+        assert client.get("/events/Mint").status_code == 404
+
+def test_events_endpoint_requires_the_indexer(generate_server, load_server):
+    server = load_server(generate_server())
+    with TestClient(server.app) as client:
+        assert client.get("/events/Transfer").status_code == 503
+        assert client.get("/events").json()["indexer"] is None
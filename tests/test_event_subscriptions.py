@@ -0,0 +1,197 @@
+import json
+import time
+import socket
+import asyncio
+import aiohttp
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from conftest import TRANSFER_CONTRACT_INIT, TRANSFER_CONTRACT_RUNTIME
+from mcp_server.runtime.indexer import LogRangeTooLarge
+from mcp_server.runtime.subscriptions import EventHub, TooManySubscribers
+from test_event_indexer import ACCOUNTS, TRANSFER, TRANSFER_TOPIC, address_topic, transfer_log
+
+class FakeChain:
+    """Logs by block, with a head that tests advance, counting eth_getLogs calls."""
+
+    def __init__(self):
+        self.head = 10
+        self.logs = []
+        self.requests = []
+
+    async def block_number(self):
+        return self.head
+
+    async def get_logs(self, from_block, to_block):
+        self.requests.append((from_block, to_block))
+        return [log for log in self.logs if from_block <= int(log["blockNumber"], 16) <= to_block]
+
+    def mine(self, *transfers):
+        self.head += 1
+        for index, (sender, to, value) in enumerate(transfers):
+            self.logs.append(transfer_log(self.head, index, sender, to, value))
+
+def make_hub(chain, encoded=None, **options):
+    def encode(decoder, log, args):
+        if encoded is not None:
+            encoded.append(args["value"])
+        return args["value"]
+    return EventHub({TRANSFER_TOPIC: TRANSFER}, chain.get_logs, chain.block_number, encode,
+                    poll_interval=0.01, **options)
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def test_one_poller_serves_every_subscriber():
+    async def scenario():
+        chain, encoded = FakeChain(), []
+        hub = make_hub(chain, encoded)
+        everyone = [hub.subscribe(TRANSFER_TOPIC) for _ in range(50)]
+        to_second = hub.subscribe(TRANSFER_TOPIC, {2: [bytes.fromhex(address_topic(ACCOUNTS[1])[2:])]})
+        await wait_for(lambda: hub.next_block == 11)
+
+        chain.mine((ACCOUNTS[0], ACCOUNTS[1], 1), (ACCOUNTS[0], ACCOUNTS[2], 2))
+        chain.mine((ACCOUNTS[2], ACCOUNTS[1], 3))
+        await wait_for(lambda: hub.next_block == 13)
+        streams = [s.events(keepalive=1) for s in everyone + [to_second]]
+        received = [[await stream.__anext__() for _ in range(2 if s is to_second else 3)]
+                    for stream, s in zip(streams, everyone + [to_second])]
+        assert received[:-1] == [[1, 2, 3]] * 50 and received[-1] == [1, 3]
+        # Each log was decoded and encoded once, whatever the number of subscribers
+        assert encoded == [1, 2, 3]
+        # Polls only fetch new blocks; a chain with no new block costs no eth_getLogs
+        assert all(start > 10 for start, _ in chain.requests) and len(chain.requests) <= 2
+
+        for subscription in everyone + [to_second]:
+            hub.unsubscribe(subscription)
+        assert hub.stats()["polling"] is False
+        chain.mine((ACCOUNTS[0], ACCOUNTS[1], 4))
+        requests = len(chain.requests)
+        await asyncio.sleep(0.05)
+        assert len(chain.requests) == requests
+
+        with pytest.raises(TooManySubscribers):
+            limited = make_hub(chain, max_subscribers=1)
+            limited.subscribe(TRANSFER_TOPIC)
+            limited.subscribe(TRANSFER_TOPIC)
+        await limited.close()
+    asyncio.run(scenario())
+
+def test_slow_subscriber_only_loses_its_own_oldest_events():
+    async def scenario():
+        chain = FakeChain()
+        hub = make_hub(chain, buffer_size=3)
+        slow, fast = hub.subscribe(TRANSFER_TOPIC), hub.subscribe(TRANSFER_TOPIC)
+        fast_events = fast.events(keepalive=1)
+        await wait_for(lambda: hub.next_block is not None)
+
+        received = []
+        for value in range(1, 6):
+            chain.mine((ACCOUNTS[0], ACCOUNTS[1], value))
+            await wait_for(lambda: hub.next_block == chain.head + 1)
+            received.append(await fast_events.__anext__())
+        assert received == [1, 2, 3, 4, 5]
+
+        # The slow subscriber hears how many events it missed, then gets the newest ones
+        slow_events = slow.events(keepalive=1)
+        assert [await slow_events.__anext__() for _ in range(4)] == [2, 3, 4, 5]
+        assert slow.delivered == 3
+        await hub.close()
+    asyncio.run(scenario())
+
+def test_refused_ranges_shrink_grow_back_and_back_off():
+    async def scenario():
+        chain = FakeChain()
+        hub = make_hub(chain, max_range=8)
+        refusing = True
+
+        async def get_logs(from_block, to_block):
+            # Like a throttling provider, refuse everything for a while
+            if refusing:
+                chain.requests.append((from_block, to_block))
+                raise LogRangeTooLarge("limit exceeded")
+            return await chain.get_logs(from_block, to_block)
+        hub.get_logs = get_logs
+        subscription = hub.subscribe(TRANSFER_TOPIC)
+        await wait_for(lambda: hub.next_block == 11)
+        for _ in range(8):
+            chain.mine((ACCOUNTS[0], ACCOUNTS[1], chain.head))
+
+        await asyncio.sleep(0.2)
+        # Halved down to a single block, then retried with a doubling delay, not in a tight loop
+        assert [end - start + 1 for start, end in chain.requests[:4]] == [8, 4, 2, 1]
+        assert len(chain.requests) < 10 and hub.range_size == 1 and hub.last_error == "limit exceeded"
+
+        refusing = False
+        hub.failures = 0
+        await wait_for(lambda: hub.next_block == chain.head + 1)
+        assert hub.last_error is None and hub.range_size > 1
+        events = subscription.events(keepalive=1)
+        assert [await events.__anext__() for _ in range(8)] == list(range(10, 18))
+        await hub.close()
+    asyncio.run(scenario())
+
+@pytest.fixture
+def transfer_server(generate_server, load_server, eth_tester_node):
+    contract = eth_tester_node.deploy(TRANSFER_CONTRACT_RUNTIME, TRANSFER_CONTRACT_INIT)
+    server = load_server(
+        generate_server(), CONTRACT_ADDRESS=contract, ETH_NODE_URL=eth_tester_node.url,
+        MCP_SUBSCRIBE_POLL_INTERVAL="0.02", MCP_BLOCK_POLL_INTERVAL="0"
+    )
+    return server, contract, eth_tester_node
+
+def test_websocket_subscriptions_share_one_poller(transfer_server):
+    server, contract, node = transfer_server
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/events/Transfer/ws") as everything, \
+                client.websocket_connect(f"/events/Transfer/ws?to={ACCOUNTS[1]}") as filtered:
+            while server.event_hub.subscribers < 2 or server.event_hub.next_block is None:
+                time.sleep(0.01)
+            for i in range(4):
+                node.transfer(contract, ACCOUNTS[i % 2], 100 + i)
+            events = [everything.receive_json() for _ in range(4)]
+            assert [e["args"] for e in events] == [
+                {"from": node.account, "to": ACCOUNTS[i % 2], "value": 100 + i} for i in range(4)
+            ]
+            assert events[0]["event"] == "Transfer(address,address,uint256)"
+            assert [filtered.receive_json()["args"]["value"] for _ in range(2)] == [101, 103]
+
+            get_logs = [r for r in node.requests if isinstance(r, dict) and r["method"] == "eth_getLogs"]
+            assert len(get_logs) == server.event_hub.stats()["polls"] <= 4
+
+        with pytest.raises(Exception):
+            with client.websocket_connect("/events/Transfer/ws?value=1") as invalid:
+                invalid.receive_json()
+    assert server.event_hub.subscribers == 0
+
+def test_server_sent_events(transfer_server):
+    server, contract, node = transfer_server
+
+    async def scenario():
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, log_level="warning"))
+        serving = asyncio.create_task(uvicorn_server.serve(sockets=[sock]))
+        await wait_for(lambda: uvicorn_server.started)
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}/events/Transfer/stream"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params={"from": node.account}) as response:
+                assert response.headers["Content-Type"].startswith("text/event-stream")
+                assert await response.content.readline() == b": subscribed\n"
+                await wait_for(lambda: server.event_hub.next_block is not None)
+                await asyncio.to_thread(node.transfer, contract, ACCOUNTS[2], 7)
+                lines = [await response.content.readline() for _ in range(3)]
+            assert lines[1] == b"event: Transfer\n"
+            assert json.loads(lines[2][len(b"data: "):])["args"] == {
+                "from": node.account, "to": ACCOUNTS[2], "value": 7
+            }
+            async with session.get(url, params={"from": "0x12"}) as response:
+                assert response.status == 422
+        # The hub notices the client leaving and stops polling
+        await wait_for(lambda: server.event_hub.subscribers == 0)
+        uvicorn_server.should_exit = True
+        await serving
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+import json
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from click.testing import CliRunner
+from mcp_server.cli import cli
+from mcp_server.generate_all import SUMMARY_NAME, discover_artifacts, plan_jobs
+from mcp_server.rate_limiter import SharedTokenBucket
+from conftest import CONTRACTS_DIR
+
+def write_artifacts(directory):
+    abi = json.loads((CONTRACTS_DIR / "UniToken.json").read_text())["abi"]
+    (directory / "tokens").mkdir(parents=True)
+    (directory / "tokens" / "TokenA.json").write_text(json.dumps({"contractName": "TokenA", "abi": abi}))
+    views = [item for item in abi if item.get("stateMutability") == "view"]
+    (directory / "tokens" / "TokenB.json").write_text(json.dumps({"abi": views}))
+    (directory / "tokens" / "TokenB.dbg.json").write_text(json.dumps({"buildInfo": "x"}))
+    (directory / "Broken.json").write_text(json.dumps({"bytecode": "0x"}))
+
+def test_discover_and_plan(tmp_path):
+    write_artifacts(tmp_path)
+    artifacts = discover_artifacts(str(tmp_path))
+    assert [a.name for a in artifacts] == ["Broken.json", "TokenA.json", "TokenB.json"]
+    assert discover_artifacts(str(tmp_path / "tokens" / "Token*.json")) == artifacts[1:]
+
+    jobs = plan_jobs(artifacts + artifacts[1:2], tmp_path / "out")
+    assert [j.contract_name for j in jobs] == ["Broken", "TokenA", "TokenB", "TokenA_2"]
+
+def test_generate_all_command(tmp_path):
+    write_artifacts(tmp_path / "artifacts")
+    output_root = tmp_path / "servers"
+    result = CliRunner().invoke(cli, [
+        "generate-all", str(tmp_path / "artifacts"), str(output_root),
+        "--backend", "template", "--processes", "2"
+    ])
+
+    # The artifact without an ABI fails, the others are generated
+    assert result.exit_code == 1
+    assert (output_root / "TokenA" / "methods" / "transferFrom.py").exists()
+    assert (output_root / "TokenB" / "server.py").exists()
+    summary = {r["contract_name"]: r for r in json.loads((output_root / SUMMARY_NAME).read_text())}
+    assert summary["TokenA"]["status"] == "ok"
+    assert summary["TokenA"]["methods_generated"] == 11
+    assert summary["TokenB"]["methods_generated"] == 6
+    assert summary["Broken"]["status"] == "failed"
+    assert "TokenA" in result.output
+
+def _acquire_twice(bucket):
+    async def run():
+        start = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        return time.monotonic() - start
+    return asyncio.run(run())
+
+def _init(bucket):
+    global _bucket
+    _bucket = bucket
+
+def _acquire_shared(_):
+    return _acquire_twice(_bucket)
+
+def test_shared_token_bucket_spans_processes():
+    # 2 tokens of burst, then 20 per second: 4 acquisitions across two processes
+    # need at least one refill interval of waiting in total
+    bucket = SharedTokenBucket(rate=20, capacity=2)
+    with ProcessPoolExecutor(max_workers=2, initializer=_init, initargs=(bucket,)) as pool:
+        durations = list(pool.map(_acquire_shared, range(2)))
+    assert max(durations) >= 0.09
+
+def test_shared_token_bucket_pause():
+    bucket = SharedTokenBucket(capacity=4)
+    bucket.pause(0.1)
+    assert _acquire_twice(bucket) >= 0.09
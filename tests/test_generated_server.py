@@ -0,0 +1,106 @@
+import os
+import sys
+import runpy
+from fastapi.testclient import TestClient
+
+ECHO_METHOD = '''async def echo(state, **params):
+    return {"result": %r, "params": params}
+'''
+
+def test_dispatch_table_built_at_startup(generate_server, load_server):
+    output_dir = generate_server()
+    (output_dir / 'methods' / 'echo.py').write_text(ECHO_METHOD % "v1")
+    server = load_server(output_dir)
+
+    assert "balanceOf" in server.METHODS
+    assert "echo" in server.METHODS
+    # Methods are never re-executed or registered per request
+    assert server.get_method("echo") is server.get_method("echo")
+    assert "echo" not in sys.modules
+
+    client = TestClient(server.app)
+    response = client.post("/mcp", json={"method": "echo", "params": {"x": 1}, "context": {"id": 7}})
+    assert response.status_code == 200
+    assert response.json() == {"result": {"result": "v1", "params": {"x": 1}}, "context": {"id": 7}}
+
+    # Editing the file has no effect outside reload mode
+    (output_dir / 'methods' / 'echo.py').write_text(ECHO_METHOD % "v2")
+    response = client.post("/mcp", json={"method": "echo", "params": {}})
+    assert response.json()["result"]["result"] == "v1"
+
+def test_unknown_method_returns_404(generate_server, load_server):
+    server = load_server(generate_server())
+    client = TestClient(server.app)
+    for method in ("doesNotExist", "../server"):
+        response = client.post("/mcp", json={"method": method, "params": {}})
+        assert response.status_code == 404
+
+def test_broken_method_reports_load_error(generate_server, load_server):
+    output_dir = generate_server()
+    (output_dir / 'methods' / 'broken.py').write_text("raise RuntimeError('bad method')\n")
+    server = load_server(output_dir)
+
+    assert "broken" in server.METHOD_LOAD_ERRORS
+    response = TestClient(server.app).post("/mcp", json={"method": "broken", "params": {}})
+    assert response.status_code == 500
+    assert "bad method" in response.json()["detail"]
+
+def test_reload_mode_picks_up_changed_files(generate_server, load_server):
+    output_dir = generate_server()
+    method_path = output_dir / 'methods' / 'echo.py'
+    method_path.write_text(ECHO_METHOD % "v1")
+    server = load_server(output_dir, MCP_RELOAD_METHODS="1")
+    client = TestClient(server.app)
+
+    assert client.post("/mcp", json={"method": "echo", "params": {}}).json()["result"]["result"] == "v1"
+    first = server.get_method("echo")
+    assert server.get_method("echo") is first
+
+    method_path.write_text(ECHO_METHOD % "v2")
+    stat = method_path.stat()
+    os.utime(method_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert client.post("/mcp", json={"method": "echo", "params": {}}).json()["result"]["result"] == "v2"
+
+    method_path.unlink()
+    assert client.post("/mcp", json={"method": "echo", "params": {}}).status_code == 404
+
+def test_state_shares_one_provider_and_contract(generate_server, load_server):
+    server = load_server(generate_server(), ETH_NODE_URL="http://node.invalid:8545", ETH_HTTP_POOL_SIZE="7")
+    state = server.state
+    assert state.node_url == "http://node.invalid:8545"
+    assert state.contract is state.contract
+    assert state.contract.address == "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984"
+
+    # The pooled session is opened on startup and closed on shutdown
+    with TestClient(server.app):
+        assert state._session.connector.limit == 7
+        assert not state._session.closed
+    assert state._session is None
+
+def test_production_profile(generate_server, load_server, monkeypatch):
+    output_dir = generate_server(profile="production")
+    monkeypatch.delenv("MCP_LOG_LEVEL", raising=False)
+    server = load_server(output_dir)
+    assert server.LOG_LEVEL == "WARNING"
+    assert not server.LOG_REQUESTS
+    assert "Setting ABI" not in (output_dir / "state" / "__init__.py").read_text()
+
+    # The __main__ block serves the app from every available core
+    runs = []
+    monkeypatch.setitem(sys.modules, "uvicorn", type(sys)("uvicorn"))
+    sys.modules["uvicorn"].run = lambda app, **options: runs.append((app, options))
+    monkeypatch.setenv("MCP_WORKERS", "3")
+    runpy.run_path(str(output_dir / "server.py"), run_name="__main__")
+    app, options = runs[0]
+    assert app == "server:app"
+    assert options["workers"] == 3
+    assert options["loop"] == options["http"] == "auto"
+    assert options["access_log"] is False
+
+def test_log_level_from_environment(generate_server, load_server, monkeypatch):
+    output_dir = generate_server()
+    server = load_server(output_dir, MCP_LOG_LEVEL="info")
+    assert server.LOG_LEVEL == "INFO"
+    assert not server.LOG_REQUESTS
+    monkeypatch.delenv("MCP_LOG_LEVEL")
+    assert load_server(output_dir).LOG_REQUESTS
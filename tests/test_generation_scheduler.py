@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+import time
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.mcp_generator import MCPGenerator, MethodGenerationError
+from mcp_server.rate_limiter import TokenBucket, parse_retry_after
+from mcp_server.template_engine import TemplateMethodGenerator
+
+ABI = [
+    {"type": "function", "name": f"fn{i}", "inputs": [], "outputs": [{"name": "", "type": "uint256"}],
+     "stateMutability": "view"}
+    for i in range(6)
+]
+
+def make_generator(tmp_path, max_workers):
+    generator = MCPGenerator(
+        analysis=ABIAnalyzer({"abi": ABI}).analyze(),
+        output_dir=tmp_path,
+        contract_name="Test",
+        openai_api_key="test",
+        max_workers=max_workers
+    )
+    generator._create_directory_structure()
+    return generator
+
+@pytest.mark.asyncio
+async def test_methods_generated_concurrently(tmp_path):
+    generator = make_generator(tmp_path, max_workers=6)
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(function, abi):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return TemplateMethodGenerator([function]).render(function)
+
+    generator.llm_generator.generate_method = fake_generate
+    start = time.monotonic()
+    await generator._generate_methods()
+
+    assert peak == 6
+    assert time.monotonic() - start < 0.2
+    assert len(list((tmp_path / 'methods').glob('fn*.py'))) == 6
+
+@pytest.mark.asyncio
+async def test_worker_count_is_bounded(tmp_path):
+    generator = make_generator(tmp_path, max_workers=2)
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(function, abi):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return TemplateMethodGenerator([function]).render(function)
+
+    generator.llm_generator.generate_method = fake_generate
+    await generator._generate_methods()
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_failure_does_not_abort_other_methods(tmp_path):
+    generator = make_generator(tmp_path, max_workers=3)
+
+    async def fake_generate(function, abi):
+        if function.name == "fn1":
+            raise ValueError("boom")
+        await asyncio.sleep(0.01)
+        return TemplateMethodGenerator([function]).render(function)
+
+    generator.llm_generator.generate_method = fake_generate
+    with pytest.raises(MethodGenerationError) as exc_info:
+        await generator._generate_methods()
+
+    assert list(exc_info.value.failures) == ["fn1"]
+    written = sorted(p.stem for p in (tmp_path / 'methods').glob('fn*.py'))
+    assert written == ["fn0", "fn2", "fn3", "fn4", "fn5"]
+
+def test_parse_retry_after():
+    assert parse_retry_after(Exception("Rate limit reached. Please try again in 6.5s.")) == 6.5
+    assert parse_retry_after(Exception("Please try again in 200ms.")) == 0.2
+    assert parse_retry_after(Exception("Rate limit reached")) is None
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_blocks_all_workers():
+    bucket = TokenBucket(capacity=4)
+    bucket.pause(0.1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+    assert time.monotonic() - start >= 0.1
+
+@pytest.mark.asyncio
+async def test_token_bucket_steady_state_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # First token is free, the remaining five are paced at 50/s
+    assert time.monotonic() - start >= 0.09
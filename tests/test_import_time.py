@@ -0,0 +1,24 @@
+import sys
+import subprocess
+import pytest
+
+HEAVY_MODULES = ("openai", "web3", "fastapi", "pydantic", "aiohttp")
+
+@pytest.mark.parametrize("statement", [
+    "import mcp_server",
+    "import mcp_server.abi_analyzer",
+    "import mcp_server.cli",
+    "from mcp_server import MCPGenerator",
+])
+def test_heavy_dependencies_are_imported_lazily(statement):
+    code = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == ""
+
+def test_lazy_package_attributes():
+    code = ("import click, mcp_server; from mcp_server import cli, MCPGenerator; "
+            "assert isinstance(cli, click.Group) and MCPGenerator.__name__ == 'MCPGenerator'")
+    subprocess.run([sys.executable, "-c", code], check=True)
+    import mcp_server
+    with pytest.raises(AttributeError):
+        mcp_server.missing
@@ -0,0 +1,77 @@
+import copy
+import json
+import time
+import asyncio
+import pytest
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.mcp_generator import MCPGenerator, MANIFEST_NAME
+from conftest import CONTRACTS_DIR
+
+def load_abi():
+    with open(CONTRACTS_DIR / "UniToken.json") as f:
+        return json.load(f)["abi"]
+
+def generate(abi, output_dir, **options) -> MCPGenerator:
+    generator = MCPGenerator(
+        analysis=ABIAnalyzer({"abi": abi}).analyze(),
+        output_dir=output_dir,
+        contract_name="UniToken",
+        openai_api_key=None,
+        backend="template",
+        **options
+    )
+    asyncio.run(generator.generate())
+    return generator
+
+def snapshot(output_dir):
+    return {p.relative_to(output_dir): p.stat().st_mtime_ns
+            for p in output_dir.rglob('*') if p.is_file() and p.name != MANIFEST_NAME}
+
+@pytest.mark.parametrize("bundle", [False, True])
+def test_noop_regeneration_writes_nothing(tmp_path, bundle):
+    abi = load_abi()
+    first = generate(abi, tmp_path, bundle=bundle)
+    assert first.build_stats['methods_generated'] == len(first.analysis['functions'])
+    assert (tmp_path / MANIFEST_NAME).exists()
+    before = snapshot(tmp_path)
+
+    start = time.monotonic()
+    second = generate(abi, tmp_path, bundle=bundle)
+    assert time.monotonic() - start < 1
+
+    assert second.build_stats['methods_generated'] == 0
+    assert second.build_stats['methods_skipped'] == len(second.analysis['functions'])
+    assert second.build_stats['written'] == 0
+    assert snapshot(tmp_path) == before
+
+def test_only_changed_functions_are_regenerated(tmp_path):
+    abi = load_abi()
+    generate(abi, tmp_path)
+    before = snapshot(tmp_path)
+
+    changed = copy.deepcopy(abi)
+    changed = [item for item in changed if item.get("name") != "decimals"]
+    for item in changed:
+        if item.get("name") == "balanceOf":
+            item["inputs"][0]["name"] = "owner"
+    generator = generate(changed, tmp_path)
+
+    assert generator.build_stats['methods_generated'] == 1
+    assert not (tmp_path / 'methods' / 'decimals.py').exists()
+    assert not list((tmp_path / 'methods' / '__pycache__').glob('decimals.*.pyc'))
+    assert list((tmp_path / 'methods' / '__pycache__').glob('approve.*.pyc'))
+    assert "owner" in (tmp_path / 'methods' / 'balanceOf.py').read_text()
+    after = snapshot(tmp_path)
+    assert after[(tmp_path / 'methods' / 'approve.py').relative_to(tmp_path)] == \
+        before[(tmp_path / 'methods' / 'approve.py').relative_to(tmp_path)]
+
+def test_edited_output_is_restored(tmp_path):
+    abi = load_abi()
+    generate(abi, tmp_path)
+    method = tmp_path / 'methods' / 'approve.py'
+    original = method.read_text()
+    method.write_text("# edited\n")
+
+    generator = generate(abi, tmp_path)
+    assert generator.build_stats['methods_generated'] == 1
+    assert method.read_text() == original
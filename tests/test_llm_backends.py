@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from mcp_server.llm_backends import (Completion, OpenAIBackend, RateLimitError, ReplayBackend, StubBackend,
+                                     create_backend)
+from mcp_server.llm_generator import LLMMethodGenerator
+from mcp_server.mcp_generator import MCPGenerator
+from mcp_server.template_engine import TemplateMethodGenerator
+
+@pytest.fixture
+def openai_endpoint():
+    """A local OpenAI-compatible chat completions endpoint."""
+    requests = []
+    responses = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests.append((self.path, self.headers.get("Authorization"),
+                             json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            status, body = responses.pop(0)
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", requests, responses
+    server.shutdown()
+    server.server_close()
+
+def test_openai_backend_uses_base_url(openai_endpoint):
+    base_url, requests, responses = openai_endpoint
+    responses.append((200, {
+        "id": "1", "object": "chat.completion", "created": 0, "model": "local",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "hi"}}],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4}
+    }))
+    responses.append((429, {"error": {"message": "Rate limit reached. Please try again in 250ms.",
+                                      "type": "requests", "code": "rate_limit_exceeded"}}))
+    backend = OpenAIBackend(api_key="key", model="local", base_url=base_url)
+
+    async def run():
+        completion = await backend.complete([{"role": "user", "content": "hello"}], temperature=0.1)
+        with pytest.raises(RateLimitError) as exc_info:
+            await backend.complete([{"role": "user", "content": "again"}], temperature=0.1)
+        await backend.close()
+        return completion, exc_info.value
+
+    completion, error = asyncio.run(run())
+    assert completion == Completion(content="hi", total_tokens=4)
+    assert error.retry_after == 0.25
+    path, authorization, body = requests[0]
+    assert path == "/v1/chat/completions"
+    assert authorization == "Bearer key"
+    assert body["model"] == "local"
+
+def test_stub_backend_matches_template_engine(uni_analysis, tmp_path):
+    generator = MCPGenerator(
+        analysis=uni_analysis,
+        output_dir=tmp_path,
+        contract_name="UniToken",
+        openai_api_key=None,
+        llm_backend=StubBackend(),
+        batch_size=5
+    )
+    asyncio.run(generator.generate())
+
+    engine = TemplateMethodGenerator(uni_analysis["functions"])
+    for function in uni_analysis["functions"]:
+        assert (tmp_path / "methods" / f"{function.name}.py").read_text().endswith(engine.render(function) + "\n")
+    assert generator.llm_generator.model == "stub"
+
+def test_record_and_replay(tmp_path):
+    recording = tmp_path / "recording.jsonl"
+    messages = [{"role": "user", "content": "Template:\nasync def f(state: State) -> Dict:\n    return <params>\n\nFunction details:"}]
+    recorder = create_backend("stub", model="gpt-4", recording=recording)
+
+    first = asyncio.run(recorder.complete(messages, temperature=0.1))
+    assert first.content == "async def f(state: State) -> Dict:\n    return "
+    assert len(recording.read_text().splitlines()) == 1
+
+    replay = create_backend("replay", recording=recording)
+    assert replay.model == "gpt-4"
+    assert asyncio.run(replay.complete(messages, temperature=0.1)) == first
+    with pytest.raises(ValueError, match="No recorded completion"):
+        asyncio.run(replay.complete([{"role": "user", "content": "other"}], temperature=0.1))
+
+class SlowBackend(StubBackend):
+    def __init__(self, latency, max_concurrency, timeout):
+        super().__init__(latency=latency, max_concurrency=max_concurrency, timeout=timeout)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def complete(self, messages, temperature):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().complete(messages, temperature)
+        finally:
+            self.in_flight -= 1
+
+def test_backend_concurrency_and_timeout(uni_analysis, tmp_path):
+    functions = uni_analysis["functions"][:6]
+    backend = SlowBackend(latency=0.02, max_concurrency=2, timeout=1)
+    generator = LLMMethodGenerator(cache_dir=str(tmp_path / "a"), openai_api_key=None, backend=backend)
+
+    async def generate_all():
+        return await asyncio.gather(*(generator.generate_method(f, uni_analysis["abi"]) for f in functions))
+
+    assert len(asyncio.run(generate_all())) == 6
+    assert backend.peak == 2
+
+    slow = LLMMethodGenerator(cache_dir=str(tmp_path / "b"), openai_api_key=None,
+                              backend=SlowBackend(latency=1, max_concurrency=1, timeout=0.05))
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(slow.generate_method(functions[0], uni_analysis["abi"]))
+    assert time.monotonic() - start < 0.5
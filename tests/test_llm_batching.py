@@ -0,0 +1,83 @@
+import re
+import json
+import asyncio
+from mcp_server import llm_generator
+from mcp_server.llm_backends import StubBackend
+from mcp_server.mcp_generator import MCPGenerator
+from mcp_server.method_library import parse_signature
+
+class FakeBackend(StubBackend):
+    """A stub model that leaves some functions out of batch answers or gets them wrong."""
+
+    def __init__(self, drop=(), corrupt=()):
+        super().__init__(model="gpt-4")
+        self.drop = set(drop)
+        self.corrupt = set(corrupt)
+        self.prompts = []
+
+    async def complete(self, messages, temperature):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        completion = await super().complete(messages, temperature)
+        batch = dict(re.findall(r"^Function (f\d+): (\S+)$", prompt, re.MULTILINE))
+        if batch:
+            answers = json.loads(completion.content)
+            for key, signature in batch.items():
+                if signature in self.drop:
+                    del answers[key]
+                elif signature in self.corrupt:
+                    answers[key] = "pass"
+            completion.content = "```json\n" + json.dumps(answers) + "\n```"
+        return completion
+
+def make_generator(uni_analysis, tmp_path, batch_size, backend):
+    return MCPGenerator(
+        analysis=uni_analysis,
+        output_dir=tmp_path,
+        contract_name="UniToken",
+        openai_api_key=None,
+        batch_size=batch_size,
+        llm_backend=backend
+    )
+
+def test_abi_slice_only_contains_the_function():
+    abi = [
+        {"type": "event", "name": "Transfer", "inputs": []},
+        {"type": "function", "name": "safeTransferFrom", "stateMutability": "nonpayable", "outputs": [],
+         "inputs": [{"name": "from", "type": "address"}, {"name": "to", "type": "address"},
+                    {"name": "tokenId", "type": "uint256"}]},
+        {"type": "function", "name": "safeTransferFrom", "stateMutability": "nonpayable", "outputs": [],
+         "inputs": [{"name": "from", "type": "address"}, {"name": "to", "type": "address"},
+                    {"name": "tokenId", "type": "uint256"}, {"name": "data", "type": "bytes"}]},
+    ]
+    function = parse_signature("function safeTransferFrom(address from, address to, uint256 tokenId, bytes data)")
+    assert llm_generator.abi_slice(function, abi) == [abi[2]]
+
+def test_batched_generation(uni_analysis, tmp_path):
+    fake = FakeBackend()
+    generator = make_generator(uni_analysis, tmp_path, batch_size=4, backend=fake)
+    asyncio.run(generator.generate())
+
+    count = len(uni_analysis["functions"])
+    meter = generator.llm_generator.meter
+    assert meter.total_requests == -(-count // 4)
+    assert meter.tokens_saved > meter.total_tokens
+    assert generator.build_stats["methods_generated"] == count
+    assert generator.llm_generator.cache.stats()["entries"] == count
+    # Prompts carry per-function ABI slices, never the events
+    assert all('"type":"event"' not in prompt for prompt in fake.prompts)
+
+    # Each function was cached individually, so single requests hit the cache
+    (tmp_path / "mcp_manifest.json").unlink()
+    single = make_generator(uni_analysis, tmp_path, batch_size=1, backend=fake)
+    asyncio.run(single.generate())
+    assert single.llm_generator.meter.total_requests == 0
+
+def test_missing_or_invalid_batch_answers_fall_back_to_single_requests(uni_analysis, tmp_path):
+    fake = FakeBackend(drop={"transfer(address,uint256)"}, corrupt={"approve(address,uint256)"})
+    generator = make_generator(uni_analysis, tmp_path, batch_size=100, backend=fake)
+    asyncio.run(generator.generate())
+
+    assert generator.llm_generator.meter.total_requests == 3
+    assert sorted(re.search(r"template for the (\w+)", p).group(1) for p in fake.prompts[1:]) == ["approve", "transfer"]
+    assert (tmp_path / "methods" / "approve.py").read_text().count("build_transaction") == 1
@@ -0,0 +1,124 @@
+import time
+from click.testing import CliRunner
+from mcp_server.abi_analyzer import FunctionDefinition, FunctionParameter, FunctionType
+from mcp_server.cli import cli
+from mcp_server.method_cache import MethodCache
+
+def function(name: str) -> FunctionDefinition:
+    return FunctionDefinition(
+        name=name,
+        inputs=[FunctionParameter(name="account", type="address")],
+        outputs=[FunctionParameter(name="", type="uint256")],
+        state_mutability=FunctionType.VIEW
+    )
+
+def test_round_trip_and_stats(tmp_path):
+    cache = MethodCache(tmp_path)
+    assert cache.get_cached_implementation(function("balanceOf")) is None
+
+    cache.cache_implementation(function("balanceOf"), "async def balanceOf(): ...")
+    assert cache.get_cached_implementation(function("balanceOf")) == "async def balanceOf(): ..."
+    cache.get_cached_implementation(function("balanceOf"))
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["total_hits"] == 2
+    assert stats["total_bytes"] == len("async def balanceOf(): ...")
+    # Everything lives in the index; no per-method files
+    assert list(tmp_path.glob("*.py")) == []
+
+    # Entries persist across instances
+    cache.close()
+    assert MethodCache(tmp_path).get_cached_implementation(function("balanceOf")) is not None
+
+def test_lru_eviction_by_entries_and_bytes(tmp_path):
+    cache = MethodCache(tmp_path, max_entries=2)
+    cache.cache_implementation(function("a"), "a" * 10)
+    time.sleep(0.01)
+    cache.cache_implementation(function("b"), "b" * 10)
+    time.sleep(0.01)
+    cache.get_cached_implementation(function("a"))
+    cache.cache_implementation(function("c"), "c" * 10)
+
+    assert cache.get_cached_implementation(function("b")) is None
+    assert cache.get_cached_implementation(function("a")) is not None
+    assert cache.get_cached_implementation(function("c")) is not None
+
+    assert cache.prune(max_bytes=15) == 1
+    assert cache.stats()["entries"] == 1
+
+def test_prune_by_age(tmp_path):
+    cache = MethodCache(tmp_path)
+    cache.cache_implementation(function("a"), "a")
+    assert cache.prune(max_age=3600) == 0
+    assert cache.prune(max_age=0) == 1
+
+def test_legacy_files_are_discarded(tmp_path):
+    # Named after a cache key in the old format, which no lookup can produce
+    legacy = tmp_path / f"{'ab' * 32}.py"
+    legacy.write_text("async def balanceOf(state: State): ...")
+    unrelated = tmp_path / "helpers.py"
+    unrelated.write_text("")
+
+    cache = MethodCache(tmp_path)
+    assert not legacy.exists() and unrelated.exists()
+    assert cache.stats()["entries"] == 0
+
+def test_cache_cli_commands(tmp_path):
+    cache = MethodCache(tmp_path)
+    for name in ("a", "b", "c"):
+        cache.cache_implementation(function(name), name * 100)
+    cache.close()
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cache", "stats", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "Entries:     3" in result.output
+    assert "300 bytes" in result.output
+
+    result = runner.invoke(cli, ["cache", "prune", str(tmp_path), "--max-entries", "1"])
+    assert result.exit_code == 0
+    assert "Removed 2 entries" in result.output
+
+    result = runner.invoke(cli, ["cache", "prune", str(tmp_path)])
+    assert result.exit_code != 0
+
+    result = runner.invoke(cli, ["clear-cache", str(tmp_path)])
+    assert "1 entries removed" in result.output
+
+def tuple_function(component_type: str) -> FunctionDefinition:
+    order = FunctionParameter(name="order", type="tuple", components=[
+        FunctionParameter(name="amount", type=component_type),
+        FunctionParameter(name="maker", type="address")
+    ])
+    return FunctionDefinition(name="fill", inputs=[order], outputs=[], state_mutability=FunctionType.NONPAYABLE)
+
+def test_keys_cover_tuple_components_and_fingerprint(tmp_path):
+    cache = MethodCache(tmp_path)
+    assert tuple_function("uint256").signature == "fill((uint256,address))"
+    assert cache._get_cache_key(tuple_function("uint256")) != cache._get_cache_key(tuple_function("uint128"))
+
+    cache.cache_implementation(function("balanceOf"), "v1", fingerprint="template-a")
+    assert cache.get_cached_implementation(function("balanceOf"), fingerprint="template-a") == "v1"
+    assert cache.get_cached_implementation(function("balanceOf"), fingerprint="template-b") is None
+
+def test_template_change_only_invalidates_affected_functions(tmp_path, monkeypatch):
+    from mcp_server import llm_generator
+    from mcp_server.template_engine import build_method_template
+
+    generator = llm_generator.LLMMethodGenerator(cache_dir=str(tmp_path), openai_api_key=None)
+    view = function("balanceOf")
+    nonpayable = FunctionDefinition(name="approve", inputs=[], outputs=[], state_mutability=FunctionType.NONPAYABLE)
+    before = {f.name: generator._codegen_fingerprint(f) for f in (view, nonpayable)}
+
+    def changed_template(fn):
+        template = build_method_template(fn)
+        return template + "  # changed" if fn.state_mutability == FunctionType.NONPAYABLE else template
+
+    monkeypatch.setattr(llm_generator, "build_method_template", changed_template)
+    assert generator._codegen_fingerprint(view) == before["balanceOf"]
+    assert generator._codegen_fingerprint(nonpayable) != before["approve"]
+
+    # The model id is part of the fingerprint too
+    generator.model = "another-model"
+    assert generator._codegen_fingerprint(view) != before["balanceOf"]
@@ -0,0 +1,89 @@
+import json
+import asyncio
+import pytest
+from click.testing import CliRunner
+from mcp_server.abi_analyzer import ABIAnalyzer, FunctionType
+from mcp_server.cli import cli
+from mcp_server.llm_generator import LLMMethodGenerator
+from mcp_server.mcp_generator import MCPGenerator, MethodGenerationError
+from mcp_server.method_library import STANDARD_SIGNATURES, parse_signature, prewarm_library, standard_functions
+
+def to_abi(signatures):
+    """Build a compiler-style ABI from human readable signatures."""
+    abi = []
+    for signature in signatures:
+        function = parse_signature(signature)
+        abi.append({
+            "type": "function",
+            "name": function.name,
+            "inputs": [{"name": p.name, "type": p.type, "internalType": p.type} for p in function.inputs],
+            "outputs": [{"name": "", "type": p.type, "internalType": p.type} for p in function.outputs],
+            "stateMutability": function.state_mutability.value
+        })
+    return abi
+
+# OpenZeppelin 4.x ERC20 functions
+OZ_ERC20 = [s for s in STANDARD_SIGNATURES['ERC20'] if "_" not in s and "value" not in s]
+
+def test_parse_signature():
+    function = parse_signature("function safeTransferFrom(address _from, address _to, uint256 _tokenId) payable")
+    assert function.signature == "safeTransferFrom(address,address,uint256)"
+    assert [p.name for p in function.inputs] == ["_from", "_to", "_tokenId"]
+    assert function.outputs == []
+    assert function.state_mutability == FunctionType.PAYABLE
+
+    function = parse_signature("function balanceOf(address _owner) view returns (uint256 balance)")
+    assert function.state_mutability == FunctionType.VIEW
+    assert [(p.name, p.type) for p in function.outputs] == [("balance", "uint256")]
+
+    with pytest.raises(ValueError):
+        parse_signature("event Transfer(address indexed from, address indexed to, uint256 value)")
+
+def test_prewarm_is_idempotent(tmp_path):
+    generator = LLMMethodGenerator(cache_dir=str(tmp_path), openai_api_key=None)
+    added = prewarm_library(generator)
+    assert added == generator.cache.stats()["entries"]
+    assert added >= len(standard_functions()) // 2
+    assert prewarm_library(generator) == 0
+
+def test_standard_contracts_generate_without_llm(tmp_path):
+    library = tmp_path / "library"
+    abi = to_abi(OZ_ERC20 + STANDARD_SIGNATURES['ERC4626'])
+
+    generator = MCPGenerator(
+        analysis=ABIAnalyzer({"abi": abi}).analyze(),
+        output_dir=tmp_path / "vault",
+        contract_name="Vault",
+        openai_api_key=None,
+        library_dir=library
+    )
+    asyncio.run(generator.generate())
+
+    assert generator.build_stats["methods_generated"] == len(abi)
+    assert generator.llm_generator.meter.total_requests == 0
+    assert generator.llm_generator.cache.misses == 0
+    assert (tmp_path / "vault" / "methods" / "redeem.py").exists()
+
+def test_non_standard_functions_still_need_the_llm(tmp_path):
+    abi = to_abi(["function mint(address to, uint256 amount)"])
+    generator = MCPGenerator(
+        analysis=ABIAnalyzer({"abi": abi}).analyze(),
+        output_dir=tmp_path / "out",
+        contract_name="Token",
+        openai_api_key=None,
+        library_dir=tmp_path / "library"
+    )
+    with pytest.raises(MethodGenerationError):
+        asyncio.run(generator.generate())
+
+def test_library_from_environment(tmp_path, monkeypatch):
+    abi_file = tmp_path / "Token.json"
+    abi_file.write_text(json.dumps({"abi": to_abi(OZ_ERC20)}))
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("MCP_METHOD_LIBRARY", str(tmp_path / "library"))
+
+    result = CliRunner().invoke(cli, ["generate", str(abi_file), str(tmp_path / "out"), "Token"])
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "library" / "methods.sqlite3").exists()
+    assert (tmp_path / "out" / "methods" / "increaseAllowance.py").exists()
@@ -0,0 +1,75 @@
+import importlib.util
+import pytest
+from mcp_server import method_cache
+from mcp_server.method_cache import MethodValidator, validate_implementations
+from mcp_server.method_library import parse_signature
+from mcp_server.template_engine import TemplateMethodGenerator
+
+BALANCE_OF = parse_signature("function balanceOf(address account) view returns (uint256)")
+TRANSFER = parse_signature("function transfer(address to, uint256 amount) returns (bool)")
+
+def render(function):
+    return TemplateMethodGenerator([function]).render(function)
+
+def test_template_output_is_valid():
+    validator = MethodValidator()
+    assert validator.validate_implementation(BALANCE_OF, render(BALANCE_OF)) == (True, "")
+    assert validator.validate_implementation(TRANSFER, render(TRANSFER)) == (True, "")
+
+@pytest.mark.parametrize("original, broken, error", [
+    # Each of these would break the server at import or call time
+    ("        return {\"result\": result}", "        return {\"result\": result", "Syntax error on line 4"),
+    ("account: address", "account: address, extra: int", "Parameters must be state, account"),
+    ("'balanceOf(address)'", "'balanceOf(uint256)'", "Missing required component: state.contract.functions"),
+    ("call(state, account)", "call(state, acount)", "must be called with state, account"),
+    ("{\"result\": result}", "{\"result\": reslt}", "Undefined name on line 4: reslt"),
+    ("except Exception as e:", "except ValueError as e:", "except Exception as e"),
+    ("async def", "def", "'await' outside async function"),
+])
+def test_broken_view_implementations(original, broken, error):
+    implementation = render(BALANCE_OF).replace(original, broken, 1)
+    is_valid, message = MethodValidator().validate_implementation(BALANCE_OF, implementation)
+    assert not is_valid
+    assert error in message
+
+# Views written against web3 directly, as LLMs may still answer, remain valid
+WEB3_BALANCE_OF = """async def balanceOf(state: State, account: address) -> Dict:
+    try:
+        result = await state.contract.functions.balanceOf(account).call()
+        return {"result": result}
+    except Exception as e:
+        raise ValueError(f"Failed to execute balanceOf: {str(e)}")"""
+
+@pytest.mark.parametrize("original, broken, error", [
+    (None, None, ""),
+    ("call()", "call", "Missing required component: call()"),
+    ("balanceOf(account)", "balanceOf(acount)", "must be called with account"),
+])
+def test_web3_view_implementations(original, broken, error):
+    implementation = WEB3_BALANCE_OF if original is None else WEB3_BALANCE_OF.replace(original, broken, 1)
+    is_valid, message = MethodValidator().validate_implementation(BALANCE_OF, implementation)
+    assert is_valid == (not error)
+    assert error in message
+
+def test_transaction_return_shape():
+    implementation = render(TRANSFER).replace('"transaction_to_sign"', '"transaction"')
+    assert MethodValidator().validate_implementation(TRANSFER, implementation) == (
+        False, "State-changing function must return transaction_to_sign"
+    )
+
+def test_bulk_validation_in_parallel(monkeypatch):
+    monkeypatch.setattr(method_cache, "PARALLEL_VALIDATION_THRESHOLD", 2)
+    items = [(BALANCE_OF, render(BALANCE_OF)), (TRANSFER, "pass"), (TRANSFER, render(TRANSFER))]
+    results = validate_implementations(items, processes=2)
+    assert [valid for valid, _ in results] == [True, False, True]
+    assert validate_implementations(items, processes=1) == results
+
+def test_generated_methods_are_precompiled(generate_server):
+    output_dir = generate_server()
+    method = output_dir / "methods" / "transfer.py"
+    cached = importlib.util.cache_from_source(str(method))
+    with open(cached, "rb") as f:
+        header = f.read(8)
+    # Hash-based, checked bytecode (PEP 552)
+    assert header[:4] == importlib.util.MAGIC_NUMBER
+    assert int.from_bytes(header[4:8], "little") == 0b11
@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+from eth_abi import encode
+from fastapi.testclient import TestClient
+from web3 import Web3
+from mcp_server.abi_analyzer import ABIAnalyzer
+from mcp_server.mcp_generator import MCPGenerator
+
+OWNER = Web3.to_checksum_address("0x" + "11" * 20)
+
+def _function(name, inputs, mutability="view", outputs=("uint256",)):
+    return {
+        "type": "function", "name": name, "stateMutability": mutability,
+        "inputs": [{"name": n, "type": t} for n, t in inputs],
+        "outputs": [{"name": "", "type": t} for t in outputs],
+    }
+
+# ERC-721 style transfers plus a view overloaded on its parameters. The local
+# echo contract returns the first argument word, so the overloads of
+# balanceOf are told apart by their results.
+OVERLOADED_ABI = [
+    _function("balanceOf", [("owner", "address")]),
+    _function("balanceOf", [("id", "uint256"), ("owner", "address")]),
+    _function("safeTransferFrom", [("from", "address"), ("to", "address"), ("tokenId", "uint256")],
+              "nonpayable", ()),
+    _function("safeTransferFrom", [("from", "address"), ("to", "address"), ("tokenId", "uint256"),
+                                   ("data", "bytes")], "nonpayable", ()),
+]
+
+@pytest.fixture
+def overloaded_server(tmp_path):
+    def generate(**options):
+        generator = MCPGenerator(
+            analysis=ABIAnalyzer(OVERLOADED_ABI).analyze(), output_dir=tmp_path,
+            contract_name="Overloaded", openai_api_key=None, backend="template", **options
+        )
+        asyncio.run(generator.generate())
+        return tmp_path
+    return generate
+
+@pytest.fixture
+def overloaded_client(overloaded_server, load_server, eth_tester_node):
+    address = eth_tester_node.deploy()
+    server = load_server(overloaded_server(), CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url)
+    with TestClient(server.app) as client:
+        yield client
+
+def test_analyzer_indexes_functions_by_selector():
+    analysis = ABIAnalyzer(OVERLOADED_ABI).analyze()
+    selectors = analysis["selectors"]
+
+    assert selectors["0x42842e0e"].signature == "safeTransferFrom(address,address,uint256)"
+    assert selectors["0xb88d4fde"].signature == "safeTransferFrom(address,address,uint256,bytes)"
+    assert selectors["0x70a08231"].method_name == "balanceOf_70a08231"
+    assert len(selectors) == len(OVERLOADED_ABI)
+
+def test_overloads_are_generated_separately(overloaded_server):
+    output_dir = overloaded_server()
+    written = {p.stem for p in (output_dir / "methods").glob("*.py")} - {"__init__"}
+    assert written == {f.method_name for f in ABIAnalyzer(OVERLOADED_ABI).analyze()["functions"]}
+    assert len(written) == 4
+
+def test_dispatch_by_name_signature_and_selector(overloaded_client):
+    def call(method, **params):
+        return overloaded_client.post("/mcp", json={"method": method, "params": params})
+
+    def result(method, **params):
+        return call(method, **params).json()["result"]["result"]
+
+    assert result("balanceOf", owner=OWNER) == int(OWNER, 16)
+    assert result("balanceOf", id=7, owner=OWNER) == 7
+    assert result("balanceOf(uint256,address)", id=7, owner=OWNER) == 7
+    assert result("0x70a08231", owner=OWNER) == int(OWNER, 16)
+
+    response = call("balanceOf")
+    assert response.status_code == 400
+    assert "balanceOf(address)" in response.json()["detail"]
+
+def test_batch_resolves_overloads(overloaded_client):
+    response = overloaded_client.post("/mcp/batch", json=[
+        {"method": "balanceOf", "params": {"owner": OWNER}},
+        {"method": "balanceOf", "params": {"id": 7, "owner": OWNER}},
+        {"method": "balanceOf", "params": {"spender": OWNER, "amount": 1, "extra": 2}},
+    ])
+    results = response.json()["results"]
+    assert [r["result"] for r in results[:2]] == [{"result": int(OWNER, 16)}, {"result": 7}]
+    assert results[2]["error"]["status_code"] == 400
+
+def test_raw_calldata_is_forwarded_without_decoding(overloaded_client):
+    calldata = "0x70a08231" + encode(["address"], [OWNER]).hex()
+    response = overloaded_client.post("/mcp/raw", json={"data": calldata, "context": {"i": 1}})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "result": "0x" + encode(["address"], [OWNER]).hex(),
+        "method": "balanceOf(address)",
+        "context": {"i": 1},
+    }
+
+def test_raw_calldata_is_validated(overloaded_client):
+    def status(data):
+        return overloaded_client.post("/mcp/raw", json={"data": data}).status_code
+
+    assert status("0xdeadbeef") == 404
+    assert status("0x42842e0e" + "00" * 96) == 422  # not a view function
+    assert status("0x70a0823") == 422
+    assert status("70a08231" + "00" * 32) == 422
+
+def test_bundle_dispatches_overloads(overloaded_server, load_server, eth_tester_node):
+    address = eth_tester_node.deploy()
+    output_dir = overloaded_server(bundle=True)
+    server = load_server(output_dir, module="bundle.py", CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url)
+    with TestClient(server.app) as client:
+        response = client.post("/mcp", json={"method": "balanceOf", "params": {"id": 7, "owner": OWNER}})
+    assert response.json()["result"] == {"result": 7}
@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+from web3 import Web3
+from mcp_server.abi_analyzer import FunctionDefinition, FunctionParameter, FunctionType
+from mcp_server.runtime import validation
+from mcp_server.runtime.validation import ParamError
+from mcp_server.solidity_types import (ArrayType, ElementaryType, TupleType, parse_type, python_type,
+                                       validator_source)
+
+ADDRESS = Web3.to_checksum_address("0x" + "ab" * 20)
+
+def build_validator(*inputs):
+    function = FunctionDefinition(name="f", inputs=list(inputs), outputs=[], state_mutability=FunctionType.VIEW)
+    namespace = dict(vars(validation))
+    exec(validator_source(function, "_validate_f"), namespace)
+    return namespace["_validate_f"]
+
+def test_type_model():
+    order = [FunctionParameter(name="maker", type="address"), FunctionParameter(name="amounts", type="uint96[]")]
+    assert parse_type("tuple[2][]", order) == ArrayType(ArrayType(TupleType((
+        ("maker", ElementaryType("address")), ("amounts", ArrayType(ElementaryType("uint", 96))),
+    )), 2))
+    assert parse_type("int") == ElementaryType("int", 256)
+    assert parse_type("bytes4") == ElementaryType("bytes", 4)
+    assert parse_type("ufixed") == ElementaryType("ufixed", 128, 18)
+    for invalid in ("uint7", "bytes33", "uint264", "tuple", "money"):
+        with pytest.raises(ValueError):
+            parse_type(invalid)
+    assert python_type(parse_type("tuple[2][]", order)) == "List[List[Tuple[str, List[int]]]]"
+
+def test_elementary_values_are_checked_and_coerced():
+    validate = build_validator(
+        FunctionParameter(name="to", type="address"), FunctionParameter(name="small", type="uint8"),
+        FunctionParameter(name="delta", type="int8"), FunctionParameter(name="salt", type="bytes4"),
+        FunctionParameter(name="from", type="bool"),
+    )
+    assert validate({"to": ADDRESS.lower(), "small": "0xff", "delta": "-128", "salt": "0xDEADBEEF", "from": True}) == {
+        "to": ADDRESS, "small": 255, "delta": -128, "salt": "0xdeadbeef", "from_": True,
+    }
+    valid = {"to": ADDRESS, "small": 1, "delta": 1, "salt": "0x00000000", "from_": False}
+    assert validate(valid)["from_"] is False
+    for name, value, error in [
+        ("to", "0x" + "ab" * 19, "to: expected a 0x-prefixed 20-byte hex address"),
+        ("to", ADDRESS[:-1] + ADDRESS[-1].swapcase(), "to: invalid address checksum"),
+        ("small", 256, "small: 256 is out of range for uint8"),
+        ("small", -1, "small: -1 is out of range for uint8"),
+        ("small", 1.5, "small: expected an integer"),
+        ("small", True, "small: expected an integer"),
+        ("delta", "-0x81", "delta: -129 is out of range for int8"),
+        ("salt", "0x00", "salt: expected 4 bytes"),
+        ("from_", "true", "from: expected true or false"),
+    ]:
+        with pytest.raises(ParamError, match=error.replace("(", r"\(")):
+            validate({**valid, name: value})
+    with pytest.raises(ParamError, match="Missing parameter: to"):
+        validate({k: v for k, v in valid.items() if k != "to"})
+    with pytest.raises(ParamError, match="Unexpected parameters: extra"):
+        validate({**valid, "extra": 1})
+
+def test_arrays_and_structs():
+    order = FunctionParameter(name="orders", type="tuple[]", components=[
+        FunctionParameter(name="maker", type="address"),
+        FunctionParameter(name="fees", type="uint16[2]"),
+    ])
+    validate = build_validator(order)
+    orders = [{"maker": ADDRESS.lower(), "fees": [1, "2"]}, [ADDRESS, [3, 4]]]
+    assert validate({"orders": orders}) == {"orders": [(ADDRESS, [1, 2]), (ADDRESS, [3, 4])]}
+    for bad, error in [
+        ([{"maker": ADDRESS}], r"orders\[0\]: missing components: fees"),
+        ([{"maker": ADDRESS, "fees": [1, 2], "tip": 1}], r"orders\[0\]: unexpected components: tip"),
+        ([{"maker": ADDRESS, "fees": [1]}], r"orders\[0\]\.fees: expected 2 items, got 1"),
+        ([{"maker": ADDRESS, "fees": [1, 70000]}], r"orders\[0\]\.fees\[1\]: 70000 is out of range for uint16"),
+        ([[ADDRESS]], r"orders\[0\]: expected 2 components, got 1"),
+        ("0x", r"orders: expected an array"),
+    ]:
+        with pytest.raises(ParamError, match=error):
+            validate({"orders": bad})
+
+def test_unnameable_parameters_are_not_validated():
+    function = FunctionDefinition(name="f", inputs=[FunctionParameter(name="", type="uint256")], outputs=[],
+                                  state_mutability=FunctionType.VIEW)
+    assert validator_source(function, "_validate_f") is None
+
+def test_bad_params_fail_before_any_node_call(generate_server, load_server, eth_tester_node):
+    address = eth_tester_node.deploy()
+    server = load_server(generate_server(), CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url)
+    with TestClient(server.app) as client:
+        eth_tester_node.requests.clear()
+        single = client.post("/mcp", json={"method": "balanceOf", "params": {"account": "0x1234"}})
+        batch = client.post("/mcp/batch", json=[
+            {"method": "allowance", "params": {"owner": ADDRESS, "spender": ADDRESS, "extra": 1}},
+            {"method": "approve", "params": {"spender": ADDRESS, "amount": 2**256}},
+        ])
+        assert eth_tester_node.requests == []
+
+        assert single.status_code == 422
+        assert single.json()["detail"] == "account: expected a 0x-prefixed 20-byte hex address"
+        assert [r["error"]["status_code"] for r in batch.json()["results"]] == [422, 422]
+        assert "out of range for uint256" in batch.json()["results"][1]["error"]["detail"]
+
+        # Hex and lowercase input is coerced rather than rejected
+        response = client.post("/mcp", json={"method": "balanceOf", "params": {"account": ADDRESS.lower()}})
+        assert response.json()["result"] == {"result": int(ADDRESS, 16)}
@@ -0,0 +1,153 @@
+import pytest
+import time
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+from conftest import CONTRACTS_DIR
+from mcp_server.cli import cli
+from mcp_server.runtime.read_cache import BlockTracker, ReadCache, normalize_params, request_key
+
+COUNTING_METHOD = '''calls = 0
+
+async def {name}(state, **params):
+    global calls
+    calls += 1
+    return {{"result": calls}}
+'''
+
+def test_normalize_params_ignores_order_and_address_case():
+    a = normalize_params({"account": "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984", "n": 1})
+    b = normalize_params({"n": 1, "account": "0x1f9840a85d5af5bf1d1762f925bdaddc4201f984"})
+    assert a == b
+    assert normalize_params({"n": 1}) != normalize_params({"n": 2})
+
+@pytest.mark.asyncio
+async def test_entries_are_keyed_by_block():
+    cache = ReadCache()
+    block = 1
+    calls = []
+
+    async def call():
+        calls.append(block)
+        return block * 10
+
+    def key():
+        return request_key("balanceOf", {"a": 1}, block)
+
+    assert await cache.get_or_call(key(), call) == 10
+    assert await cache.get_or_call(key(), call) == 10
+    block = 2
+    assert await cache.get_or_call(key(), call) == 20
+    assert calls == [1, 2]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+@pytest.mark.asyncio
+async def test_immutable_entries_survive_new_blocks():
+    cache = ReadCache(max_size=1, ttl=0)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return "UNI"
+
+    await cache.get_or_call(request_key("symbol", {}), call, immutable=True)
+    await cache.get_or_call(request_key("other", {}, 2), call)
+    await cache.get_or_call(request_key("symbol", {}), call, immutable=True)
+    assert calls == 2
+
+def test_immutable_entries_are_bounded():
+    # An immutable view with arguments must not grow the cache with every argument set
+    cache = ReadCache(max_size=2, ttl=60)
+    for owner in ("a", "b", "c"):
+        cache.set(request_key("ownerOf", {"id": owner}), owner, immutable=True)
+    assert cache.stats()["immutable_size"] == 2
+    assert cache.get(request_key("ownerOf", {"id": "a"})) == (False, None)
+    # Lookups refresh an entry, so the least recently used one goes first
+    assert cache.get(request_key("ownerOf", {"id": "b"})) == (True, "b")
+    cache.set(request_key("ownerOf", {"id": "d"}), "d", immutable=True)
+    assert cache.get(request_key("ownerOf", {"id": "b"})) == (True, "b")
+    assert cache.get(request_key("ownerOf", {"id": "c"})) == (False, None)
+
+def test_lru_eviction_and_ttl():
+    cache = ReadCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+    expiring = ReadCache(ttl=0.01)
+    expiring.set("a", 1)
+    time.sleep(0.02)
+    assert expiring.get("a") == (False, None)
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    cache = ReadCache()
+
+    async def failing():
+        raise ValueError("node down")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await cache.get_or_call(request_key("balanceOf", {}, 1), failing)
+    assert cache.stats()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_block_tracker_polls_at_most_once_per_interval():
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        return fetches
+
+    tracker = BlockTracker(fetch, poll_interval=60)
+    assert [await tracker.current() for _ in range(5)] == [1] * 5
+    assert fetches == 1
+
+def test_server_serves_views_from_cache(generate_server, load_server):
+    output_dir = generate_server(immutable_methods=["symbol"])
+    for name in ("balanceOf", "symbol", "approve"):
+        (output_dir / 'methods' / f'{name}.py').write_text(COUNTING_METHOD.format(name=name))
+    server = load_server(output_dir)
+    block = 100
+
+    async def block_number():
+        return block
+
+    server.block_tracker.fetch_block_number = block_number
+    server.block_tracker.poll_interval = 0
+    client = TestClient(server.app)
+
+    def call(method, **params):
+        return client.post("/mcp", json={"method": method, "params": params}).json()["result"]["result"]
+
+    a, b = "0x" + "0a" * 20, "0x" + "0b" * 20
+    assert call("balanceOf", account=a) == 1
+    assert call("balanceOf", account=a) == 1
+    assert call("balanceOf", account=b) == 2
+    block = 101
+    assert call("balanceOf", account=a) == 3
+    assert call("symbol") == 1
+    assert call("symbol") == 1
+    # State-changing methods are never cached
+    assert call("approve", spender=a, amount=1) == 1
+    assert call("approve", spender=a, amount=1) == 2
+
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["immutable_size"] == 1
+
+def test_immutable_option_must_name_view_methods(tmp_path):
+    def generate(*options):
+        return CliRunner().invoke(cli, ["generate", str(CONTRACTS_DIR / "UniToken.json"), str(tmp_path), "UniToken",
+                                        "--backend", "template", "--llm-backend", "stub", *options])
+
+    result = generate("--immutable", "symbol", "--immutable", "approve")
+    assert result.exit_code == 2
+    assert "Invalid value for '--immutable': Immutable methods must be view functions: approve" in result.output
+    assert generate("--immutable", "symbol").exit_code == 0
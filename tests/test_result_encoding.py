@@ -0,0 +1,63 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from hexbytes import HexBytes
+from mcp_server.runtime import encoding
+from mcp_server.runtime.encoding import ResultEncoder
+
+UINT256_MAX = 2**256 - 1
+RESULT = (UINT256_MAX, True, [HexBytes("0x00ff"), None], AttributeDict({"n": 7}))
+
+def encode(encoder):
+    return json.loads(encoder.encode({"result": encoder.convert(RESULT), "context": {"id": 1}}))
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_integer_and_bytes_encodings(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(encoding, "orjson", None)
+    assert encode(ResultEncoder()) == {
+        "result": [UINT256_MAX, True, ["0x00ff", None], {"n": 7}], "context": {"id": 1}
+    }
+    # Only the result is converted, never the client's context
+    assert encode(ResultEncoder(integers="string", bytes_encoding="base64")) == {
+        "result": [str(UINT256_MAX), True, ["AP8=", None], {"n": "7"}], "context": {"id": 1}
+    }
+    assert encode(ResultEncoder(integers="hex"))["result"][0] == hex(UINT256_MAX)
+
+@pytest.mark.skipif(not hasattr(encoding.orjson, "Fragment"), reason="needs orjson 3.9 or later")
+def test_large_integers_stay_on_orjson(monkeypatch):
+    def stdlib_dumps(*args, **kwargs):
+        raise AssertionError("fell back to the standard library encoder")
+    monkeypatch.setattr(encoding.json, "dumps", stdlib_dumps)
+    balances = [(18 * 10**18 + i, -2**70, b"\x01", [2**64, 2**64 - 1]) for i in range(3)]
+    encoded = ResultEncoder().encode({"result": balances, "context": {"id": 2**80}})
+    assert json.loads(encoded) == {
+        "result": [[18 * 10**18 + i, -2**70, "0x01", [2**64, 2**64 - 1]] for i in range(3)], "context": {"id": 2**80}
+    }
+
+def test_unknown_encodings_and_types():
+    with pytest.raises(ValueError):
+        ResultEncoder(integers="float")
+    with pytest.raises(TypeError):
+        ResultEncoder().encode({"result": object()})
+
+def test_server_responses_bypass_response_models(generate_server, load_server, eth_tester_node):
+    address = eth_tester_node.deploy()
+    server = load_server(generate_server(), CONTRACT_ADDRESS=address, ETH_NODE_URL=eth_tester_node.url,
+                         MCP_INTEGER_ENCODING="string")
+    account = Web3.to_checksum_address("0x" + "ff" * 20)
+    request = {"method": "balanceOf", "params": {"account": account}, "context": {"id": 1}}
+    with TestClient(server.app) as client:
+        response = client.post("/mcp", json=request)
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"result": {"result": str(2**160 - 1)}, "context": {"id": 1}}
+
+        batch = client.post("/mcp/batch", json=[request, {"method": "missing", "params": {}}]).json()
+        assert batch["results"][0] == {"result": {"result": str(2**160 - 1)}, "error": None, "context": {"id": 1}}
+        assert batch["results"][1]["error"]["status_code"] == 404
+
+        # The models still document the API
+        schema = client.get("/openapi.json").json()
+        assert {"MCPResponse", "MCPBatchResponse"} <= set(schema["components"]["schemas"])
@@ -0,0 +1,113 @@
+import pytest
+import asyncio
+from fastapi.testclient import TestClient
+from mcp_server.runtime.single_flight import SingleFlight
+
+SLOW_METHOD = '''import asyncio
+
+calls = 0
+
+async def balanceOf(state, account):
+    global calls
+    calls += 1
+    await asyncio.sleep(0.05)
+    return {"result": calls}
+'''
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.do("key", call) for _ in range(10)))
+    assert results == ["value"] * 10
+    assert calls == 1
+    assert flight.stats() == {"executions": 1, "coalesced": 9, "in_flight": 0}
+
+    # Completed calls are not remembered
+    await flight.do("key", call)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_exceptions_reach_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("node down")
+
+    results = await asyncio.gather(*(flight.do("key", call) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(0.02)
+        return "value"
+
+    first = asyncio.ensure_future(flight.do("key", call))
+    second = asyncio.ensure_future(flight.do("key", call))
+    await started.wait()
+    first.cancel()
+
+    assert await second == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+@pytest.mark.asyncio
+async def test_upstream_call_cancelled_when_all_callers_leave():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.ensure_future(flight.do("key", call))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight == 0
+
+    async def fresh():
+        return "fresh"
+
+    # A new caller starts a new call rather than joining the cancelled one
+    assert await flight.do("key", fresh) == "fresh"
+
+def test_server_coalesces_without_cache(generate_server, load_server):
+    output_dir = generate_server()
+    (output_dir / 'methods' / 'balanceOf.py').write_text(SLOW_METHOD)
+    server = load_server(output_dir, MCP_CACHE_SIZE="0")
+
+    async def block_number():
+        return 1
+
+    server.block_tracker.fetch_block_number = block_number
+    method = server.get_method("balanceOf")
+
+    async def burst():
+        return await asyncio.gather(*(
+            server.call_view_method(method, "balanceOf", {"account": "0xA"}) for _ in range(20)
+        ))
+
+    results = asyncio.run(burst())
+    assert results == [{"result": 1}] * 20
+    stats = TestClient(server.app).get("/cache/stats").json()
+    assert stats["single_flight"]["executions"] == 1
+    assert stats["single_flight"]["coalesced"] == 19
+    assert stats["hits"] == 0
@@ -0,0 +1,91 @@
+import pytest
+from mcp_server.abi_analyzer import FunctionDefinition, FunctionParameter, FunctionType
+from mcp_server.mcp_generator import MCPGenerator
+from mcp_server.method_cache import MethodValidator
+from mcp_server.template_engine import TemplateMethodGenerator
+
+def test_renders_every_uni_function(uni_analysis):
+    engine = TemplateMethodGenerator(uni_analysis['functions'])
+    validator = MethodValidator()
+    for function in uni_analysis['functions']:
+        assert engine.supports(function), function.name
+        implementation = engine.render(function)
+        assert "<" + "params>" not in implementation
+        assert validator.validate_implementation(function, implementation) == (True, "")
+
+def test_render_is_deterministic(uni_analysis):
+    first = TemplateMethodGenerator(uni_analysis['functions'])
+    second = TemplateMethodGenerator(uni_analysis['functions'])
+    for function in uni_analysis['functions']:
+        assert first.render(function) == second.render(function)
+
+def test_keyword_parameters_are_renamed(uni_analysis):
+    engine = TemplateMethodGenerator(uni_analysis['functions'])
+    transfer_from = next(f for f in uni_analysis['functions'] if f.name == "transferFrom")
+    implementation = engine.render(transfer_from)
+    assert implementation.startswith("async def transferFrom(state: State, from_: address, to: address")
+    assert "contract.functions.transferFrom(from_, to, amount)" in implementation
+
+def test_unsupported_functions_fall_back():
+    def function(name, inputs):
+        return FunctionDefinition(name=name, inputs=inputs, outputs=[], state_mutability=FunctionType.NONPAYABLE)
+
+    order = FunctionParameter(name="order", type="tuple", components=[FunctionParameter(name="amount", type="uint256")])
+    overload_a = function("safeTransferFrom", [FunctionParameter(name="to", type="address")])
+    overload_b = function("safeTransferFrom", [FunctionParameter(name="to", type="address"),
+                                               FunctionParameter(name="data", type="bytes")])
+    overload_c = function("safeTransferFrom", [FunctionParameter(name="to", type="address"),
+                                               FunctionParameter(name="id", type="uint256")])
+    with_tuple = function("fill", [order])
+    with_fixed = function("batch", [FunctionParameter(name="ratio", type="fixed128x18")])
+    unnamed = function("set", [FunctionParameter(name="", type="uint256")])
+    engine = TemplateMethodGenerator([overload_a, overload_b, overload_c, with_tuple, with_fixed, unnamed])
+
+    # web3 tells overloads apart by argument count, so only overload_a can be rendered
+    assert engine.supports(overload_a)
+    for fn in (overload_b, overload_c, with_tuple, with_fixed, unnamed):
+        assert not engine.supports(fn)
+    with pytest.raises(ValueError):
+        engine.render(with_tuple)
+
+def test_views_with_structs_and_overloads_use_codecs():
+    def view(inputs):
+        return FunctionDefinition(name="quote", inputs=inputs, outputs=[], state_mutability=FunctionType.VIEW)
+
+    order = FunctionParameter(name="order", type="tuple[]", components=[FunctionParameter(name="amount", type="uint256")])
+    by_order = view([order])
+    # Same argument count: told apart by selector, not by web3
+    by_id = view([FunctionParameter(name="id", type="uint256")])
+    engine = TemplateMethodGenerator([by_order, by_id])
+
+    assert engine.supports(by_order) and engine.supports(by_id)
+    assert "CODECS['quote((uint256)[])'].call(state, order)" in engine.render(by_order)
+    validator = MethodValidator()
+    for function in (by_order, by_id):
+        assert validator.validate_implementation(function, engine.render(function)) == (True, "")
+
+@pytest.mark.asyncio
+async def test_template_backend_needs_no_api_key(uni_analysis, tmp_path):
+    generator = MCPGenerator(
+        analysis=uni_analysis,
+        output_dir=tmp_path,
+        contract_name="UniToken",
+        openai_api_key=None,
+        backend="template"
+    )
+    await generator.generate()
+    written = {p.stem for p in (tmp_path / 'methods').glob('*.py')} - {"__init__"}
+    assert written == {f.method_name for f in uni_analysis['functions']}
+
+def test_arrays_of_elementary_types_are_supported():
+    function = FunctionDefinition(
+        name="balanceOfBatch",
+        inputs=[FunctionParameter(name="accounts", type="address[]"), FunctionParameter(name="ids", type="uint256[2][]")],
+        outputs=[FunctionParameter(name="", type="uint256[]")],
+        state_mutability=FunctionType.VIEW
+    )
+    implementation = TemplateMethodGenerator([function]).render(function)
+    assert implementation.startswith(
+        "async def balanceOfBatch(state: State, accounts: List[address], ids: List[List[uint256]]) -> Dict:"
+    )
+    compile(implementation, "<method>", "exec")